@@ -0,0 +1,248 @@
+"""
+Measures GUI responsiveness offscreen against a generated launcher database.
+
+Drives the real widgets through their hot paths (library filtering per
+keystroke, playset loading, conflict icons, conflict report) and records
+per-operation latency, the longest event-loop stall seen during each
+operation, and the number of live widgets/QObjects afterwards. Exits with
+status 1 if any budget is exceeded.
+
+Usage:
+    python scripts/bench_gui.py                          # 3000 mods, 1500 in the playset
+    python scripts/bench_gui.py --mods 10000 --playset-size 4000
+    python scripts/bench_gui.py --budget keystroke=30 --budget stall=100
+    python scripts/bench_gui.py --budget-file budgets.json --json results.json
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEventLoop, QObject, Qt, QTimer
+from PySide6.QtWidgets import QApplication
+
+# Does not read the config, unlike the GUI (imported in main)
+from ck3_mod_manager.database.launcher_db import LAUNCHER_SCHEMA
+
+# Milliseconds, met by the default sizes; "stall" applies to the longest stall
+# of every operation. The playset editor builds a widget per row, so
+# playset_load (and its stall) grows linearly with --playset-size.
+DEFAULT_BUDGETS = {
+    "library_load": 500,
+    "keystroke": 50,
+    "playset_load": 2500,
+    "conflict_icons": 250,
+    "conflict_report": 250,
+    "stall": 2500,
+}
+
+WORDS = ["Better", "More", "Realistic", "Event", "Trait", "Culture", "Faith", "Map", "Interface",
+         "Bugfix", "Expanded", "Medieval", "Dynasty", "Battle", "Court", "Legacy"]
+
+
+def make_launcher_db(path: Path, mods: int, playset_size: int) -> Path:
+    conn = sqlite3.connect(path)
+    conn.executescript(LAUNCHER_SCHEMA)
+    conn.execute("INSERT INTO playsets VALUES ('bench', 'Benchmark', 1, 0)")
+    rows = []
+    for i in range(mods):
+        name = f"{WORDS[i % len(WORDS)]} {WORDS[(i // len(WORDS)) % len(WORDS)]} {i}"
+        # Content paths do not exist: the harness measures the GUI, not disk scans
+        rows.append((f"mod-{i:05d}", name, name, f"1.{i % 10}", str(path.parent / "missing" / str(i)),
+                     None, None, str(100000 + i)))
+    conn.executemany("INSERT INTO mods VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.executemany("INSERT INTO playsets_mods VALUES ('bench', ?, ?, ?)",
+                     [(f"mod-{i:05d}", int(i % 7 != 0), i) for i in range(min(playset_size, mods))])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def make_conflicts(mods, files: int, mods_per_file: int = 3):
+    """A synthetic analyzer result (by id): `files` paths, each overridden by a few of `mods`."""
+    mod_ids = [str(m.mod_id) for m in mods if m.enabled]
+    conflicts = {}
+    for i in range(files):
+        first = (i * 7) % max(1, len(mod_ids) - mods_per_file)
+        conflicts[f"common/dir_{i % 40:02d}/file_{i:06d}.txt"] = mod_ids[first:first + mods_per_file]
+    return conflicts
+
+
+class StallMonitor(QObject):
+    """A fast timer on the GUI thread: a late tick means the event loop was blocked."""
+
+    def __init__(self, interval_ms: int = 5):
+        super().__init__()
+        self.interval = interval_ms / 1000
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._tick)
+        self.last = time.perf_counter()
+        self.longest = 0.0
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.longest = max(self.longest, now - self.last - self.interval)
+        self.last = now
+
+    def start(self):
+        self.last = time.perf_counter()
+        self.timer.start()
+
+    def reset(self) -> float:
+        longest, self.longest = self.longest, 0.0
+        return longest
+
+
+def spin(ms: int):
+    """Runs the event loop for a while, so queued work and the stall monitor get to run."""
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def wait_for(signal, timeout_ms: int = 60000) -> bool:
+    loop = QEventLoop()
+    fired = []
+    def on_signal(*_):
+        fired.append(True)
+        loop.quit()
+    signal.connect(on_signal)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    if not fired:
+        loop.exec()
+    signal.disconnect(on_signal)
+    return bool(fired)
+
+
+class Bench:
+    def __init__(self, app: QApplication, root: QObject):
+        self.app = app
+        self.root = root
+        self.monitor = StallMonitor()
+        self.monitor.start()
+        self.results = {}
+
+    def record(self, name: str, func, repeat: int = 1):
+        self.record_steps(name, [func] * repeat)
+
+    def record_steps(self, name: str, steps):
+        """Times each step separately and records them as one operation."""
+        timings, stalls = [], []
+        for step in steps:
+            spin(20)
+            self.monitor.reset()
+            start = time.perf_counter()
+            step()
+            timings.append(time.perf_counter() - start)
+            spin(20)
+            stalls.append(self.monitor.reset())
+        self.results[name] = {
+            "runs": len(timings),
+            "median_ms": statistics.median(timings) * 1000,
+            "max_ms": max(timings) * 1000,
+            "stall_ms": max(stalls) * 1000,
+            "widgets": len(self.app.allWidgets()),
+            "objects": len(self.root.findChildren(QObject)),
+        }
+
+    def report(self, budgets) -> bool:
+        ok = True
+        print(f"{'operation':<18}{'runs':>5}{'median':>10}{'max':>10}{'stall':>10}{'widgets':>9}{'objects':>9}")
+        for name, r in self.results.items():
+            failures = []
+            if name in budgets and r["max_ms"] > budgets[name]:
+                failures.append(f"max > {budgets[name]} ms")
+            if "stall" in budgets and r["stall_ms"] > budgets["stall"]:
+                failures.append(f"stall > {budgets['stall']} ms")
+            ok = ok and not failures
+            print(f"{name:<18}{r['runs']:>5}{r['median_ms']:>8.1f}ms{r['max_ms']:>8.1f}ms{r['stall_ms']:>8.1f}ms"
+                  f"{r['widgets']:>9}{r['objects']:>9}  {'FAIL: ' + ', '.join(failures) if failures else 'ok'}")
+        return ok
+
+
+def parse_budgets(args):
+    budgets = dict(DEFAULT_BUDGETS)
+    if args.budget_file:
+        budgets.update(json.loads(args.budget_file.read_text()))
+    for item in args.budget:
+        name, _, value = item.partition("=")
+        budgets[name] = float(value)
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mods", type=int, default=3000, help="mods in the generated library")
+    parser.add_argument("--playset-size", type=int, default=1500, help="mods in the benchmark playset")
+    parser.add_argument("--conflict-files", type=int, default=20000, help="files in the synthetic conflict map")
+    parser.add_argument("--query", default="better event", help="typed into the library search, one key at a time")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget", action="append", default=[], metavar="NAME=MS", help="override a budget")
+    parser.add_argument("--budget-file", type=Path, help="JSON object of budgets in ms")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+    budgets = parse_budgets(args)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the memo/manifest caches out of the user's real cache dir and
+        # make sure no running service answers for the generated playset;
+        # config reads both at import, so set them before the GUI is imported
+        os.environ["CK3MM_CACHE_DIR"] = str(Path(tmp) / "cache")
+        os.environ["CK3MM_SOCKET"] = str(Path(tmp) / "service.sock")
+        from ck3_mod_manager.gui.main_window import MainWindow
+
+        db_path = make_launcher_db(Path(tmp) / "launcher-v2.sqlite", args.mods, args.playset_size)
+
+        window = MainWindow(db_path=db_path)
+        editor, library = window.editor_tab, window.library_tab
+        # Startup loads the library and the active playset in the background
+        if not library.all_mods:
+            wait_for(window.db.submit("get_all_mods").finished)
+        if editor.mod_list_widget.count() == 0:
+            wait_for(editor.mods_loaded)
+        spin(100)
+        bench = Bench(app, window)
+
+        mods = library.all_mods
+        bench.record("library_load", lambda: library.on_mods_loaded(mods), args.repeat)
+
+        library.search_input.clear()
+        keystrokes = [lambda text=args.query[:i]: library.search_input.setText(text)
+                      for i in range(1, len(args.query) + 1)]
+        bench.record_steps("keystroke", keystrokes)
+        library.search_input.clear()
+
+        bench.record("playset_load", lambda: (editor.load_mods("bench"), wait_for(editor.mods_loaded)), args.repeat)
+
+        playset_mods = [editor.mod_list_widget.item(i).data(Qt.UserRole) for i in range(editor.mod_list_widget.count())]
+        conflicts = make_conflicts(playset_mods, args.conflict_files)
+        if editor.worker:
+            editor.worker.wait()
+        bench.record("conflict_icons", lambda: editor.update_conflict_icons(conflicts), args.repeat)
+
+        report = window.conflict_tab
+        bench.record("conflict_report", lambda: report.on_check_finished(conflicts), args.repeat)
+
+        ok = bench.report(budgets)
+        if args.json:
+            args.json.write_text(json.dumps({"budgets": budgets, "results": bench.results}, indent=1))
+
+        if editor.worker:
+            editor.worker.wait()
+        window.close()
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmarks the central-directory zip reader against the zipfile-based path
+the analyzer used before (is_zipfile + ZipFile.namelist).
+
+Usage:
+    python scripts/bench_zip_reader.py                  # synthetic 50k-entry archive
+    python scripts/bench_zip_reader.py path/to/mod.zip  # real archive(s)
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+from ck3_mod_manager.utils.zip_reader import read_zip_entries
+
+
+def zipfile_names(path):
+    if not zipfile.is_zipfile(path):
+        return []
+    with zipfile.ZipFile(path, 'r') as zip_ref:
+        return zip_ref.namelist()
+
+
+def central_directory_names(path):
+    return [entry.name for entry in read_zip_entries(path)]
+
+
+def make_archive(path, entries):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as zf:
+        for i in range(entries):
+            zf.writestr(f"common/generated/{i // 1000:03d}/file_{i:06d}.txt", b"")
+    return path
+
+
+def measure(func, path, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archives", nargs="*", type=Path)
+    parser.add_argument("--entries", type=int, default=50_000, help="entries in the synthetic archive")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archives = args.archives or [make_archive(Path(tmp) / "synthetic.zip", args.entries)]
+
+        for path in archives:
+            count = len(central_directory_names(path))
+            print(f"{path.name}: {count} entries, {path.stat().st_size / 1e6:.1f} MB")
+            for label, func in (("zipfile", zipfile_names), ("central-dir", central_directory_names)):
+                seconds, peak = measure(func, path, args.repeat)
+                print(f"  {label:<12} {seconds * 1000:8.1f} ms   peak {peak / 1e6:7.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,26 @@
-import os
-import zipfile
-from pathlib import Path
-from typing import List, Dict, Set
+from typing import Callable, Iterable, List, Dict, Optional, Set
+
+from ck3_mod_manager.database.mod_record import mod_label
+from ck3_mod_manager.manifest import ManifestEntry, mod_stat_token, scan_mod
+from ck3_mod_manager.snapshots import ChangeReport, ConflictShift, ManifestStore, encode_token
 
 class ModAnalyzer:
-    def __init__(self):
+    def __init__(self, store: Optional[ManifestStore] = None):
         self._cache: Dict[str, Set[str]] = {}
+        self._manifests: Dict[str, Dict[str, ManifestEntry]] = {}
+        # Versioned snapshots for rescan(); optional, everything else works without
+        self.store = store
+
+    def get_mod_manifest(self, mod: Dict) -> Dict[str, ManifestEntry]:
+        """
+        Returns the file manifest (relative path -> size/CRC/mtime) of a mod.
+        Supports both directory and zip archive mods.
+        Uses in-memory caching to avoid re-reading files.
+        """
+        mod_id = str(mod.get('mod_id'))
+        if mod_id not in self._manifests:
+            self._manifests[mod_id] = scan_mod(mod)
+        return self._manifests[mod_id]
 
     def get_mod_files(self, mod: Dict) -> Set[str]:
         """
@@ -18,65 +33,115 @@ class ModAnalyzer:
         if mod_id in self._cache:
             return self._cache[mod_id]
 
-        files = set()
-        
-        # Check for archive path (Zip)
-        archive_path = mod.get('archivePath')
-        if archive_path:
-            path = Path(archive_path)
-            if path.exists() and zipfile.is_zipfile(path):
-                try:
-                    with zipfile.ZipFile(path, 'r') as zip_ref:
-                        # List all files in zip
-                        for name in zip_ref.namelist():
-                            # Normalize path separators
-                            normalized_name = name.replace('\\', '/')
-                            # Filter out directories and irrelevant files (e.g., descriptor.mod)
-                            if not normalized_name.endswith('/') and not normalized_name.endswith('.mod'):
-                                files.add(normalized_name)
-                except Exception as e:
-                    print(f"Error reading zip {path}: {e}")
-
-        # Check for directory path
-        dir_path = mod.get('dirPath')
-        if dir_path:
-            path = Path(dir_path)
-            if path.exists() and path.is_dir():
-                try:
-                    for root, _, filenames in os.walk(path):
-                        for filename in filenames:
-                            # Skip .mod files and hidden files
-                            if filename.endswith('.mod') or filename.startswith('.'):
-                                continue
-                                
-                            full_path = Path(root) / filename
-                            rel_path = full_path.relative_to(path).as_posix()
-                            files.add(rel_path)
-                except Exception as e:
-                    print(f"Error reading directory {path}: {e}")
-        
+        files = set(self.get_mod_manifest(mod))
+
         # Cache the result
         self._cache[mod_id] = files
         return files
 
+    def invalidate(self, mod_id=None):
+        """Drops cached data for one mod, or for all mods if no id is given."""
+        if mod_id is None:
+            self._cache.clear()
+            self._manifests.clear()
+        else:
+            self._cache.pop(str(mod_id), None)
+            self._manifests.pop(str(mod_id), None)
 
-    def analyze_conflicts(self, mods: List[Dict]) -> Dict[str, List[str]]:
+    def analyze_conflicts_by_id(self, mods: List[Dict]) -> Dict[str, List[str]]:
         """
         Analyzes a list of mods for file conflicts.
-        Returns a dictionary mapping relative file paths to a list of mod names that modify them.
+        Returns a dictionary mapping relative file paths to the ids (as strings)
+        of the mods that modify them, in load order. Unlike names, ids are
+        unambiguous when two mods share a display name.
         Only includes files modified by 2 or more mods.
         """
         file_map: Dict[str, List[str]] = {}
-        
+
         for mod in mods:
-            mod_name = mod.get('displayName') or mod.get('name') or "Unknown Mod"
-            mod_files = self.get_mod_files(mod)
-            
-            for file_path in mod_files:
+            mod_id = str(mod.get('mod_id'))
+            for file_path in self.get_mod_files(mod):
                 if file_path not in file_map:
                     file_map[file_path] = []
-                file_map[file_path].append(mod_name)
-        
+                file_map[file_path].append(mod_id)
+
         # Filter strictly for conflicts (files appearing in > 1 mod)
-        conflicts = {path: names for path, names in file_map.items() if len(names) > 1}
-        return conflicts
+        return {path: mod_ids for path, mod_ids in file_map.items() if len(mod_ids) > 1}
+
+    def analyze_conflicts(self, mods: List[Dict]) -> Dict[str, List[str]]:
+        """Like analyze_conflicts_by_id, but lists mod names instead of ids."""
+        names = {str(mod.get('mod_id')): mod_label(mod) for mod in mods}
+        return {path: [names[mod_id] for mod_id in mod_ids]
+                for path, mod_ids in self.analyze_conflicts_by_id(mods).items()}
+
+    def rescan(self, mods: List[Dict], force: bool = False,
+               cancelled: Optional[Callable[[], bool]] = None) -> List[ChangeReport]:
+        """
+        Compares each mod against its latest snapshot in the store and records
+        a new one where the contents changed. Mods whose stat token matches the
+        snapshot cost one stat walk and are not listed again; `force`
+        re-lists every mod. Returns one report per changed mod, in input order.
+        `cancelled` is checked between mods; the mods done so far are kept.
+        """
+        if self.store is None:
+            raise ValueError("rescan() needs a ManifestStore")
+
+        tokens = self.store.latest_tokens()
+        reports = []
+        for mod in mods:
+            if cancelled and cancelled():
+                break
+            mod_id = str(mod.get('mod_id'))
+            token = encode_token(mod_stat_token(mod))
+            if not force and tokens.get(mod_id) == token:
+                continue
+            self.invalidate(mod_id)
+            report = self.store.record(mod, token, self.get_mod_manifest(mod), mod_label(mod))
+            if report:
+                reports.append(report)
+        return reports
+
+    def update_conflicts(self, conflicts: Dict[str, List[str]], mods: List[Dict],
+                         paths: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Brings a previous analyze_conflicts_by_id() result for `mods` up to
+        date by re-evaluating only `paths`; every other entry is kept as is.
+        """
+        updated = dict(conflicts)
+        files = [(str(mod.get('mod_id')), self.get_mod_files(mod)) for mod in mods]
+        for path in set(paths):
+            mod_ids = [mod_id for mod_id, mod_files in files if path in mod_files]
+            if len(mod_ids) > 1:
+                updated[path] = mod_ids
+            else:
+                updated.pop(path, None)
+        return updated
+
+    def conflict_shifts(self, mods: List[Dict], reports: List[ChangeReport]) -> List[ConflictShift]:
+        """
+        The conflicts among `mods` that the changes in `reports` affect: files
+        that became or stopped being contested, changed hands, or were modified
+        by one of the contesting mods. Only the changed paths are looked at.
+        """
+        # First snapshots have no previous state to compare against
+        reports = {r.mod_id: r for r in reports if r.old_version is not None}
+        changed = {path for r in reports.values() for path in r.changed_paths}
+        files = [(str(mod.get('mod_id')), self.get_mod_files(mod)) for mod in mods]
+
+        shifts = []
+        for path in sorted(changed):
+            before, after, modified = [], [], False
+            for mod_id, mod_files in files:
+                report = reports.get(mod_id)
+                has_now = path in mod_files
+                if has_now:
+                    after.append(mod_id)
+                if report and path in report.added:
+                    continue
+                if has_now or (report and path in report.removed):
+                    before.append(mod_id)
+                if report and path in report.modified:
+                    modified = True
+            if (len(before) > 1 or len(after) > 1) and (before != after or modified):
+                shifts.append(ConflictShift(path, before, after, modified))
+        return shifts
@@ -0,0 +1,358 @@
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ck3_mod_manager.database.launcher_db import LauncherDB
+from ck3_mod_manager.database.mod_record import mod_label
+from ck3_mod_manager.utils.config import GAME_PATH, SERVICE_SOCKET_PATH
+
+
+def _open_db(args) -> LauncherDB:
+    db = LauncherDB(args.db)
+    db.connect()
+    return db
+
+
+def _resolve_playset(db: LauncherDB, key: Optional[str]) -> Dict:
+    """Finds a playset by id or name; defaults to the active playset."""
+    if not key:
+        playset = db.get_active_playset()
+        if not playset:
+            raise SystemExit("No active playset found.")
+        return playset
+    for playset in db.get_playsets():
+        if key in (playset['id'], playset['name']):
+            return playset
+    raise SystemExit(f"Playset not found: {key}")
+
+
+def _call(args, method: str, **params):
+    """Runs an operation on the background service if one is running, otherwise in-process."""
+    from ck3_mod_manager.service import ModService, ServiceClient
+
+    if not args.no_service:
+        client = ServiceClient.try_connect(args.socket)
+        if client:
+            with client:
+                return client.call(method, **params)
+
+    db = _open_db(args)
+    try:
+        return ModService(db).dispatch(method, params)
+    finally:
+        db.close()
+
+
+def cmd_serve(args):
+    from ck3_mod_manager.service import serve, ServiceError
+
+    try:
+        serve(args.db, args.socket)
+    except ServiceError as e:
+        raise SystemExit(str(e))
+
+
+def cmd_stop(args):
+    from ck3_mod_manager.service import ServiceClient
+
+    client = ServiceClient.try_connect(args.socket)
+    if not client:
+        raise SystemExit("No service running.")
+    with client:
+        client.call("shutdown")
+    print("Service stopped.")
+
+
+def cmd_list(args):
+    if args.what == "playsets":
+        for playset in _call(args, "list_playsets"):
+            marker = "*" if playset.get('isActive') else " "
+            print(f"{marker} {playset['id']}  {playset['name']}")
+    else:
+        for mod in _call(args, "list_mods", playset_id=args.playset):
+            state = "" if mod.get('enabled', 1) else " (disabled)"
+            print(f"{mod['mod_id']}  {mod_label(mod)}{state}")
+
+
+def cmd_analyze(args):
+    result = _call(args, "analyze", playset_id=args.playset, with_vanilla=True)
+    conflicts = result['conflicts']
+    for file_path, mod_names in sorted(conflicts.items()):
+        print(f"{file_path}: {' -> '.join(mod_names)}")
+    print(f"{len(conflicts)} conflicting files.")
+    vanilla = result['vanilla']
+    if vanilla['version']:
+        overrides = vanilla['overrides']
+        print(f"{sum(overrides.values())} vanilla files replaced by {len(overrides)} mods "
+              f"(game {vanilla['version']}); run `vanilla -v` to list them.")
+
+
+def cmd_query(args):
+    mod_ids = _call(args, "query_path", path=args.path)
+    if not mod_ids:
+        print(f"No mod in the library ships {args.path}.")
+    for mod_id in mod_ids:
+        print(mod_id)
+
+
+def cmd_flatten(args):
+    from ck3_mod_manager.flatten import flatten_playset
+
+    db = _open_db(args)
+    try:
+        playset = _resolve_playset(db, args.playset)
+        mods = [m for m in db.get_mods_for_playset(playset['id']) if m.get('enabled')]
+    finally:
+        db.close()
+
+    name = args.name or f"{playset['name']} (Flattened)"
+    print(f"Flattening {len(mods)} enabled mods of '{playset['name']}' into {args.output}...")
+    result = flatten_playset(mods, args.output, name=name, as_zip=args.zip,
+                             supported_version=args.supported_version)
+    print(f"Written {result.written} files ({result.bytes_written / 1e6:.1f} MB), "
+          f"unchanged {result.skipped}, removed {result.removed}.")
+
+
+def cmd_dedup(args):
+    from ck3_mod_manager.dedup import find_duplicates
+
+    db = _open_db(args)
+    try:
+        mods = db.get_all_mods()
+    finally:
+        db.close()
+
+    report = find_duplicates(mods, verify=not args.fast)
+    for group in report.groups:
+        names = [mod_label(m, m.get('mod_id')) for m in group.mods]
+        print(f"{len(group.mods)} copies, {group.file_count} files, "
+              f"{group.reclaimable / 1e6:.1f} MB reclaimable (confirmed by {group.confirmed_by}):")
+        for name, mod in zip(names, group.mods):
+            print(f"  - {name} [{mod.get('mod_id')}] {mod.get('dirPath') or mod.get('archivePath')}")
+    for mod in report.unreadable:
+        print(f"Could not read {mod_label(mod, mod.get('mod_id'))} [{mod.get('mod_id')}], skipped.")
+    print(f"Scanned {report.mods_scanned} mods: {len(report.groups)} duplicate groups, "
+          f"{report.reclaimable_bytes / 1e6:.1f} MB reclaimable, "
+          f"{report.redundant_files} files ({report.redundant_bytes / 1e6:.1f} MB) scanned redundantly.")
+
+
+def cmd_check(args):
+    import time
+    from ck3_mod_manager.health import HealthChecker, ERROR
+
+    db = _open_db(args)
+    try:
+        playset = _resolve_playset(db, args.playset)
+        mods = [m for m in db.get_mods_for_playset(playset['id']) if m.get('enabled')]
+    finally:
+        db.close()
+
+    start = time.perf_counter()
+    issues = HealthChecker(max_workers=args.workers).check(mods, verify_crc=args.crc)
+    elapsed = time.perf_counter() - start
+
+    for issue in issues:
+        name = mod_label(issue.mod, issue.mod.get('mod_id'))
+        print(f"[{issue.severity}] {name}: {issue.message}")
+    print(f"Checked {len(mods)} enabled mods of '{playset['name']}' in {elapsed:.2f}s: {len(issues)} problem(s).")
+    if any(issue.severity == ERROR for issue in issues):
+        sys.exit(1)
+
+
+def cmd_sync(args):
+    from ck3_mod_manager.loader.dlc_sync import DlcLoadSync
+
+    db = _open_db(args)
+    try:
+        playset = _resolve_playset(db, args.playset)
+        sync = DlcLoadSync(args.documents)
+        result = sync.sync(db, playset['id'], dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    for mod in result.unresolved:
+        name = mod_label(mod, mod.get('mod_id'))
+        print(f"No descriptor found for {name}; it is left out.")
+    for descriptor in result.added:
+        print(f"+ {descriptor}")
+    for descriptor in result.removed:
+        print(f"- {descriptor}")
+    if result.reordered:
+        print("Load order changed.")
+    if result.written:
+        print(f"Wrote {len(result.enabled_mods)} mods of '{playset['name']}' to {sync.dlc_load_path}.")
+    elif args.dry_run and (result.added or result.removed or result.reordered or not sync.dlc_load_path.exists()):
+        print(f"{sync.dlc_load_path} is out of date (dry run, nothing written).")
+    else:
+        print(f"{sync.dlc_load_path} is up to date.")
+
+
+def cmd_vanilla(args):
+    from ck3_mod_manager.analyzer import ModAnalyzer
+    from ck3_mod_manager.vanilla import GameNotFoundError, VanillaIndex, game_version
+
+    index = VanillaIndex()
+    try:
+        if args.rebuild:
+            print(f"Indexing {args.game}...")
+            version = index.build(args.game)
+        else:
+            version = game_version(args.game)
+            if version not in index.versions():
+                print(f"Indexing game files of version {version} (only needed once per game version)...")
+            index.ensure(args.game)
+    except GameNotFoundError as e:
+        raise SystemExit(str(e))
+
+    db = _open_db(args)
+    try:
+        playset = _resolve_playset(db, args.playset)
+        mods = [m for m in db.get_mods_for_playset(playset['id']) if m.get('enabled')]
+    finally:
+        db.close()
+
+    analyzer = ModAnalyzer()
+    total = 0
+    for mod in mods:
+        overrides = index.overrides(mod, version, analyzer, verify=args.verify)
+        total += len(overrides)
+        if overrides:
+            unchanged = sum(1 for o in overrides if o.identical)
+            note = f" ({unchanged} unchanged copies)" if unchanged else ""
+            print(f"{mod_label(mod)}: replaces {len(overrides)} vanilla files{note}")
+            if args.verbose:
+                for override in overrides:
+                    print(f"  {override.path}{' (unchanged)' if override.identical else ''}")
+    print(f"{total} vanilla files replaced by {len(mods)} enabled mods of '{playset['name']}' (game {version}).")
+
+
+def cmd_changes(args):
+    result = _call(args, "rescan", playset_id=args.playset, all_mods=args.all, force=args.force)
+    for report in result['reports']:
+        if report['old_version'] is None:
+            print(f"{report['name']}: first snapshot, {len(report['added'])} files")
+            continue
+        print(f"{report['name']}: v{report['old_version']} -> v{report['new_version']}, "
+              f"{len(report['added'])} added, {len(report['removed'])} removed, {len(report['modified'])} modified")
+        if args.verbose:
+            for mark, key in (("+", 'added'), ("-", 'removed'), ("~", 'modified')):
+                for path in report[key]:
+                    print(f"  {mark} {path}")
+    for shift in result['shifts']:
+        note = " (contents changed)" if shift['modified'] else ""
+        print(f"conflict {shift['path']}: {' -> '.join(shift['before']) or 'none'} "
+              f"=> {' -> '.join(shift['after']) or 'none'}{note}")
+    print(f"{len(result['reports'])} mod(s) changed, {len(result['shifts'])} conflict(s) affected.")
+
+
+def cmd_search(args):
+    import time
+    from ck3_mod_manager.content_index import ContentIndex
+
+    db = _open_db(args)
+    try:
+        mods = list(db.get_all_mods())
+    finally:
+        db.close()
+
+    index = ContentIndex()
+    # Incremental: unchanged mods cost a stat check
+    if args.update or index.is_empty():
+        print("Updating the content index (only changed mods are read)...")
+        stats = index.update(mods)
+        print(f"Read {stats.files} files of {stats.mods} mods, dropped {stats.removed}.")
+
+    start = time.perf_counter()
+    hits = index.search(args.query, limit=args.limit)
+    elapsed = time.perf_counter() - start
+
+    names = {str(mod.mod_id): mod.label for mod in mods}
+    for hit in hits:
+        print(f"{names.get(hit.mod_id, hit.mod_id)}: {hit.path}:{hit.line}: {hit.text}")
+    more = " (limit reached)" if len(hits) == args.limit else ""
+    print(f"{len(hits)} hits{more} in {elapsed * 1000:.1f} ms.")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="ck3-mod-cli", description="Command-line tools for CK3 Mod Manager.")
+    parser.add_argument("--db", type=Path, help="path to launcher-v2.sqlite (defaults to the launcher's own)")
+    parser.add_argument("--socket", type=Path, default=SERVICE_SOCKET_PATH, help="background service socket")
+    parser.add_argument("--no-service", action="store_true", help="never use a running background service")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the background service that keeps caches warm")
+    serve.set_defaults(func=cmd_serve)
+
+    stop = commands.add_parser("stop", help="stop the background service")
+    stop.set_defaults(func=cmd_stop)
+
+    list_cmd = commands.add_parser("list", help="list playsets, or the mods of the library or a playset")
+    list_cmd.add_argument("what", choices=["playsets", "mods"])
+    list_cmd.add_argument("--playset", help="playset id (mods: defaults to the whole library)")
+    list_cmd.set_defaults(func=cmd_list)
+
+    analyze = commands.add_parser("analyze", help="list file conflicts between the enabled mods of a playset")
+    analyze.add_argument("--playset", help="playset id (defaults to the active playset)")
+    analyze.set_defaults(func=cmd_analyze)
+
+    query = commands.add_parser("query", help="find which mods ship a given file")
+    query.add_argument("path", help="path relative to the mod root, e.g. common/traits/00_traits.txt")
+    query.set_defaults(func=cmd_query)
+
+    flatten = commands.add_parser("flatten", help="write a playset's effective files into one generated mod")
+    flatten.add_argument("output", type=Path, help="mod directory, or .zip file with --zip")
+    flatten.add_argument("--playset", help="playset name or id (defaults to the active playset)")
+    flatten.add_argument("--zip", action="store_true", help="write a stored zip archive instead of a directory")
+    flatten.add_argument("--name", help="display name of the generated mod")
+    flatten.add_argument("--supported-version", help='supported_version for the descriptor, e.g. "1.12.*"')
+    flatten.set_defaults(func=cmd_flatten)
+
+    dedup = commands.add_parser("dedup", help="find mods in the library with identical content")
+    dedup.add_argument("--fast", action="store_true", help="trust matching paths and sizes instead of hashing files without a zip CRC")
+    dedup.set_defaults(func=cmd_dedup)
+
+    check = commands.add_parser("check", help="validate the enabled mods of a playset before launching")
+    check.add_argument("--playset", help="playset name or id (defaults to the active playset)")
+    check.add_argument("--crc", action="store_true", help="also verify the CRC of every archive member")
+    check.add_argument("--workers", type=int, default=16, help="parallel stat/verify workers")
+    check.set_defaults(func=cmd_check)
+
+    sync = commands.add_parser("sync", help="write a playset's enabled mods to dlc_load.json")
+    sync.add_argument("--playset", help="playset name or id (defaults to the active playset)")
+    sync.add_argument("--documents", type=Path, help="CK3 documents folder (defaults to the usual location)")
+    sync.add_argument("--dry-run", action="store_true", help="only report what would change")
+    sync.set_defaults(func=cmd_sync)
+
+    vanilla = commands.add_parser("vanilla", help="list the vanilla game files the enabled mods replace")
+    vanilla.add_argument("--playset", help="playset name or id (defaults to the active playset)")
+    vanilla.add_argument("--game", type=Path, default=GAME_PATH, help="CK3 install folder")
+    vanilla.add_argument("--rebuild", action="store_true", help="re-index the game files even if the version is known")
+    vanilla.add_argument("--verify", action="store_true", help="hash same-size files to find unchanged copies")
+    vanilla.add_argument("-v", "--verbose", action="store_true", help="list every replaced file")
+    vanilla.set_defaults(func=cmd_vanilla)
+
+    changes = commands.add_parser("changes", help="report which mods changed on disk since the last rescan")
+    changes.add_argument("--playset", help="playset id (defaults to the active playset)")
+    changes.add_argument("--all", action="store_true", help="rescan the whole library instead of one playset")
+    changes.add_argument("--force", action="store_true", help="re-list mods even if their stat token is unchanged")
+    changes.add_argument("-v", "--verbose", action="store_true", help="list every changed file")
+    changes.set_defaults(func=cmd_changes)
+
+    search = commands.add_parser("search", help="find lines in the library's script and localization files")
+    search.add_argument("query", help="tokens that must all appear on the line; end one with * to match a prefix")
+    search.add_argument("--update", action=argparse.BooleanOptionalAction, default=True,
+                        help="update the index before searching (default; an empty index is always built)")
+    search.add_argument("--limit", type=int, default=200, help="maximum number of hits")
+    search.set_defaults(func=cmd_search)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,159 @@
+"""
+Memoized conflict analyses, keyed by a fingerprint of the enabled mods in load
+order and the manifest version of each mod (its latest snapshot in the
+ManifestStore). A lookup costs one query for the versions, so switching back
+to a playset comes back instantly; ConflictMemo.analyze(rescan=True) brings the
+versions up to date first, for callers that can afford a stat walk afterwards.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ck3_mod_manager.analyzer import ModAnalyzer
+
+# Analyses kept in memory, and on disk when persisted
+MAX_MEMOIZED = 32
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memo (fingerprint TEXT PRIMARY KEY, used_on REAL, conflicts BLOB);
+"""
+
+
+class ConflictMemo:
+    """
+    LRU of analyze_conflicts_by_id() results, safe to share between worker
+    threads. With a path, results are also stored in a small SQLite file and
+    survive restarts.
+    """
+
+    def __init__(self, max_entries: int = MAX_MEMOIZED, path: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self._results: "OrderedDict[str, Dict[str, List[str]]]" = OrderedDict()
+        # mod_id -> snapshot version this memo last saw (in this process), to notice changed mods
+        self._versions: Dict[str, Optional[int]] = {}
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.executescript(_SCHEMA)
+        return conn
+
+    @staticmethod
+    def fingerprint(mods: List[Dict], versions: Dict[str, Optional[int]]) -> str:
+        """The memo key for `mods` (in load order) at the given snapshot versions (mod id -> version)."""
+        entries = [(mod_id, versions.get(mod_id)) for mod_id in (str(mod.get('mod_id')) for mod in mods)]
+        return hashlib.blake2b(json.dumps(entries, separators=(',', ':')).encode('utf-8'), digest_size=16).hexdigest()
+
+    def _changed(self, mods: List[Dict], versions: Dict[str, Optional[int]]) -> List[str]:
+        """
+        Ids of the mods whose version changed since this memo last saw them,
+        or that it has not seen yet. Analyzer caches of those mods may predate
+        their current version (e.g. one another process snapshotted).
+        """
+        changed = []
+        with self._lock:
+            for mod in mods:
+                mod_id = str(mod.get('mod_id'))
+                if mod_id not in self._versions or self._versions[mod_id] != versions.get(mod_id):
+                    changed.append(mod_id)
+                self._versions[mod_id] = versions.get(mod_id)
+        return changed
+
+    def get(self, key: str) -> Optional[Dict[str, List[str]]]:
+        with self._lock:
+            conflicts = self._results.get(key)
+            if conflicts is not None:
+                self._results.move_to_end(key)
+                return conflicts
+        if self.path is None:
+            return None
+
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute("SELECT conflicts FROM memo WHERE fingerprint = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE memo SET used_on = ? WHERE fingerprint = ?", (time.time(), key))
+        finally:
+            conn.close()
+        conflicts = json.loads(zlib.decompress(row[0]))
+        self._remember(key, conflicts)
+        return conflicts
+
+    def put(self, key: str, conflicts: Dict[str, List[str]]):
+        self._remember(key, conflicts)
+        if self.path is None:
+            return
+        blob = zlib.compress(json.dumps(conflicts, separators=(',', ':')).encode('utf-8'))
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO memo VALUES (?, ?, ?)", (key, time.time(), blob))
+                conn.execute("DELETE FROM memo WHERE fingerprint NOT IN "
+                             "(SELECT fingerprint FROM memo ORDER BY used_on DESC LIMIT ?)", (self.max_entries,))
+        finally:
+            conn.close()
+
+    def _remember(self, key: str, conflicts: Dict[str, List[str]]):
+        with self._lock:
+            self._results[key] = conflicts
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def analyze(self, analyzer: ModAnalyzer, mods: List[Dict],
+                compute: Optional[Callable[[List[Dict]], Tuple[Dict[str, List[str]], Optional[Dict]]]] = None,
+                rescan: bool = False, cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, List[str]]:
+        """
+        Memoized analysis of `mods`; the analyzer needs a ManifestStore. With
+        rescan, mods are snapshotted first (see ModAnalyzer.rescan), otherwise
+        the versions are taken as stored.
+
+        On a miss the result comes from `compute`, which returns the conflicts
+        and the versions (mod id -> version) they were computed against, or
+        None for the current ones; analyzer.analyze_conflicts_by_id by default.
+        A result is only memoized under the versions it was computed against.
+        Mods whose version changed, or that are new to this memo, are dropped
+        from the analyzer's caches, so a miss never reuses their old manifests.
+        """
+        if analyzer.store is None:
+            raise ValueError("ConflictMemo needs an analyzer with a ManifestStore")
+        if rescan:
+            reports = analyzer.rescan(mods, cancelled=cancelled)
+            with self._lock:
+                # Just read by rescan(); no need to drop them again
+                self._versions.update((r.mod_id, r.new_version) for r in reports)
+        versions = analyzer.store.latest_versions()
+        for mod_id in self._changed(mods, versions):
+            analyzer.invalidate(mod_id)
+
+        key = self.fingerprint(mods, versions)
+        conflicts = self.get(key)
+        if conflicts is not None:
+            return conflicts
+        if compute is None:
+            conflicts, computed = analyzer.analyze_conflicts_by_id(mods), None
+        else:
+            conflicts, computed = compute(mods)
+        self.put(self.fingerprint(mods, computed) if computed is not None else key, conflicts)
+        return conflicts
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+        if self.path is not None:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM memo")
+            finally:
+                conn.close()
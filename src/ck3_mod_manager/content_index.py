@@ -0,0 +1,260 @@
+"""
+Inverted token index over the script and localization files of every mod in
+the library, to answer "which mod defines or uses X" without unpacking
+anything.
+
+The index lives in CACHE_DIR and is kept up to date from the manifest
+snapshots (see snapshots.py): only mods with a new snapshot are looked at,
+and of those only files whose CRC changed are read again, straight from the
+mod directory or archive.
+"""
+import re
+import sqlite3
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.manifest import ModReader
+from ck3_mod_manager.snapshots import ManifestStore
+from ck3_mod_manager.utils.config import CACHE_DIR
+
+# Files that are indexed, by extension
+TEXT_EXTENSIONS = ('.txt', '.yml', '.gui')
+# Hits returned by search() unless a limit is given
+DEFAULT_SEARCH_LIMIT = 200
+# Mods rescanned per step of update(), between progress reports
+UPDATE_BATCH = 50
+
+# Identifiers, optionally dotted (event ids like my_events.0001)
+_TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z0-9_]+)*")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mods (mod_id TEXT PRIMARY KEY, version INTEGER, dir_path TEXT, archive_path TEXT);
+CREATE TABLE IF NOT EXISTS files (file_id INTEGER PRIMARY KEY, mod_id TEXT, path TEXT, crc INTEGER,
+                                  UNIQUE (mod_id, path));
+CREATE TABLE IF NOT EXISTS postings (token TEXT, file_id INTEGER, line INTEGER,
+                                     PRIMARY KEY (token, file_id, line)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+"""
+
+
+class SearchHit(NamedTuple):
+    mod_id: str
+    path: str
+    line: int   # 1-based
+    text: str   # the line, stripped
+
+
+class IndexStats(NamedTuple):
+    mods: int           # mods (re)indexed
+    files: int          # files read
+    removed: int        # files dropped from the index
+
+
+def line_tokens(line: str) -> Set[str]:
+    """The lowercased tokens of one line; dotted names also yield their parts."""
+    tokens = set()
+    for match in _TOKEN_RE.finditer(line):
+        token = match.group().lower()
+        tokens.add(token)
+        if '.' in token:
+            tokens.update(part for part in token.split('.') if part and not part.isdigit())
+    return tokens
+
+
+def query_terms(query: str) -> List[Tuple[str, bool]]:
+    """(token, is prefix) pairs of a search query, tokenized like the indexed lines."""
+    terms = []
+    for chunk in query.lower().split():
+        tokens = _TOKEN_RE.findall(chunk)
+        terms += [(token, False) for token in tokens]
+        if tokens and chunk.endswith('*'):
+            terms[-1] = (tokens[-1], True)
+    return terms
+
+
+def is_text_file(path: str) -> bool:
+    return path.lower().endswith(TEXT_EXTENSIONS)
+
+
+# Lines are split on \n only (a trailing \r is dropped), so that reading a
+# whole file to index it and streaming it to show a hit number them alike
+def _read_lines(reader: ModReader, path: str) -> List[str]:
+    with reader.open(path) as f:
+        text = f.read().decode('utf-8-sig', errors='replace')
+    return [line.rstrip('\r') for line in text.split('\n')]
+
+
+def _read_selected_lines(reader: ModReader, path: str, numbers: Set[int]) -> Dict[int, str]:
+    """Lines `numbers` (1-based) of a file, streamed: reading stops at the last of them."""
+    last = max(numbers)
+    found = {}
+    with reader.open(path) as f:
+        for number, raw in enumerate(f, 1):
+            if number in numbers:
+                line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+                found[number] = line.removeprefix('\ufeff') if number == 1 else line
+            if number >= last:
+                break
+    return found
+
+
+class ContentIndex:
+    """Token -> (file, line) postings for the library's text files, in a SQLite file."""
+
+    def __init__(self, index_path: Optional[Path] = None, store: Optional[ManifestStore] = None):
+        self.index_path = Path(index_path) if index_path else CACHE_DIR / "content_index.sqlite"
+        self.store = store or ManifestStore()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.index_path)
+        # Searches keep working while an update is writing
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def is_empty(self) -> bool:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT 1 FROM mods LIMIT 1").fetchone() is None
+        finally:
+            conn.close()
+
+    def update(self, mods: List[Dict], analyzer: Optional[ModAnalyzer] = None,
+               progress: Optional[Callable[[int, int], None]] = None,
+               cancelled: Optional[Callable[[], bool]] = None) -> IndexStats:
+        """
+        Brings the index up to date with `mods` (normally the whole library).
+        Unchanged mods cost a stat check; mods that are no longer listed are
+        dropped. `progress(done, total)` is called after each batch of mods;
+        work stops early once `cancelled()` returns True, and what was indexed
+        so far is kept.
+        """
+        analyzer = analyzer or ModAnalyzer(self.store)
+        conn = self._connect()
+        try:
+            indexed = dict(conn.execute("SELECT mod_id, version FROM mods"))
+            stats = IndexStats(0, 0, 0)
+            for start in range(0, len(mods), UPDATE_BATCH):
+                if cancelled and cancelled():
+                    return stats
+                batch = mods[start:start + UPDATE_BATCH]
+                analyzer.rescan(batch)
+                versions = analyzer.store.latest_versions()
+                for mod in batch:
+                    version = versions.get(str(mod.get('mod_id')))
+                    if version is not None and indexed.get(str(mod.get('mod_id'))) != version:
+                        read, removed = self._index_mod(conn, mod, analyzer.store)
+                        stats = IndexStats(stats.mods + 1, stats.files + read, stats.removed + removed)
+                if progress:
+                    progress(start + len(batch), len(mods))
+
+            listed = {str(mod.get('mod_id')) for mod in mods}
+            for mod_id in indexed.keys() - listed:
+                with conn:
+                    removed = self._drop_files(conn, [row[0] for row in conn.execute(
+                        "SELECT file_id FROM files WHERE mod_id = ?", (mod_id,))])
+                    conn.execute("DELETE FROM mods WHERE mod_id = ?", (mod_id,))
+                stats = stats._replace(removed=stats.removed + removed)
+            return stats
+        finally:
+            conn.close()
+
+    def _index_mod(self, conn: sqlite3.Connection, mod: Dict, store: ManifestStore):
+        mod_id = str(mod.get('mod_id'))
+        snapshot = store.get(mod_id)
+        wanted = {path: f.crc for path, f in snapshot.files.items() if is_text_file(path)}
+        existing = {path: (file_id, crc) for file_id, path, crc in
+                    conn.execute("SELECT file_id, path, crc FROM files WHERE mod_id = ?", (mod_id,))}
+
+        stale = [file_id for path, (file_id, crc) in existing.items() if wanted.get(path) != crc]
+        to_read = sorted(path for path, crc in wanted.items()
+                         if path not in existing or existing[path][1] != crc)
+        complete = True
+        with conn, ModReader(mod) as reader:
+            removed = self._drop_files(conn, stale)
+            for path in to_read:
+                try:
+                    lines = _read_lines(reader, path)
+                except (OSError, zipfile.BadZipFile):
+                    complete = False
+                    continue
+                file_id = conn.execute("INSERT INTO files (mod_id, path, crc) VALUES (?, ?, ?)",
+                                       (mod_id, path, wanted[path])).lastrowid
+                conn.executemany("INSERT INTO postings VALUES (?, ?, ?)",
+                                 [(token, file_id, number) for number, line in enumerate(lines, 1)
+                                  for token in line_tokens(line)])
+            # Without a version the mod is looked at again next time, and the skipped files retried
+            conn.execute("INSERT OR REPLACE INTO mods VALUES (?, ?, ?, ?)",
+                         (mod_id, snapshot.version if complete else None, mod.get('dirPath'),
+                          mod.get('archivePath')))
+        return len(to_read), removed
+
+    @staticmethod
+    def _drop_files(conn: sqlite3.Connection, file_ids: List[int]) -> int:
+        for file_id in file_ids:
+            conn.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+            conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+        return len(file_ids)
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT,
+               mod_ids: Optional[Iterable[str]] = None) -> List[SearchHit]:
+        """
+        Lines containing every term of `query` (case-insensitive, whole tokens;
+        a trailing * matches a prefix), sorted by mod, path and line. Only the
+        first `limit` hits are returned, with their line text.
+        """
+        terms = query_terms(query)
+        if not terms:
+            return []
+
+        clauses, params = [], []
+        for term, prefix in terms:
+            if prefix:
+                clauses.append("SELECT file_id, line FROM postings WHERE token >= ? AND token < ?")
+                params += [term, term + '\uffff']
+            else:
+                clauses.append("SELECT file_id, line FROM postings WHERE token = ?")
+                params.append(term)
+        sql = (f"SELECT f.mod_id, f.path, h.line FROM ({' INTERSECT '.join(clauses)}) h "
+               f"JOIN files f ON f.file_id = h.file_id")
+        if mod_ids is not None:
+            mod_ids = [str(mod_id) for mod_id in mod_ids]
+            sql += f" WHERE f.mod_id IN ({','.join('?' * len(mod_ids))})"
+            params += mod_ids
+        sql += " ORDER BY f.mod_id, f.path, h.line LIMIT ?"
+        params.append(limit)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+            locations = {mod_id: {'mod_id': mod_id, 'dirPath': dir_path, 'archivePath': archive_path}
+                         for mod_id, dir_path, archive_path in
+                         conn.execute("SELECT mod_id, dir_path, archive_path FROM mods")}
+        finally:
+            conn.close()
+        return self._with_text(rows, locations)
+
+    @staticmethod
+    def _with_text(rows, locations: Dict[str, Dict]) -> List[SearchHit]:
+        # Each file with hits is read once, up to its last hit
+        wanted: Dict[tuple, Set[int]] = {}
+        for mod_id, path, line in rows:
+            wanted.setdefault((mod_id, path), set()).add(line)
+        texts: Dict[tuple, Dict[int, str]] = {}
+        readers: Dict[str, ModReader] = {}
+        try:
+            for (mod_id, path), numbers in wanted.items():
+                if mod_id not in readers:
+                    readers[mod_id] = ModReader(locations.get(mod_id, {}))
+                try:
+                    texts[(mod_id, path)] = _read_selected_lines(readers[mod_id], path, numbers)
+                except (OSError, zipfile.BadZipFile):
+                    texts[(mod_id, path)] = {}
+        finally:
+            for reader in readers.values():
+                reader.close()
+        return [SearchHit(mod_id, path, line, texts[(mod_id, path)].get(line, "").strip())
+                for mod_id, path, line in rows]
@@ -1,22 +1,82 @@
 import sqlite3
 import os
+import random
+import time
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
+
+from ck3_mod_manager.database.mod_record import ModRecord, ModRegistry, PlaysetMod
+
+# How long SQLite itself waits on a lock held by the Paradox launcher (ms)
+BUSY_TIMEOUT_MS = 2000
+# Extra attempts for a write that still finds the database locked, with backoff
+WRITE_RETRIES = 4
+RETRY_BASE_DELAY = 0.05
+RETRY_MAX_DELAY = 1.0
+
+# Minimal subset of the Paradox launcher-v2.sqlite schema used by LauncherDB
+LAUNCHER_SCHEMA = """
+CREATE TABLE playsets (id TEXT PRIMARY KEY, name TEXT, isActive INTEGER, createdOn INTEGER);
+CREATE TABLE mods (id TEXT PRIMARY KEY, displayName TEXT, name TEXT, version TEXT,
+                   dirPath TEXT, archivePath TEXT, thumbnailPath TEXT, steamId TEXT);
+CREATE TABLE playsets_mods (playsetId TEXT, modId TEXT, enabled INTEGER, position INTEGER);
+"""
+
+class ConcurrentModificationError(Exception):
+    """The rows changed in the database (e.g. by the launcher) since they were read."""
+
+def _is_locked(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
 
 class LauncherDB:
-    def __init__(self):
-        self.db_path = Path(os.path.expanduser("~/Documents/Paradox Interactive/Crusader Kings III/launcher-v2.sqlite"))
+    def __init__(self, db_path: Optional[Path] = None, registry: Optional[ModRegistry] = None):
+        self.db_path = Path(db_path) if db_path else Path(os.path.expanduser("~/Documents/Paradox Interactive/Crusader Kings III/launcher-v2.sqlite"))
         self.conn = None
+        # Mod rows come back as the registry's shared records, one per mod id
+        self.registry = registry or ModRegistry()
 
-    def connect(self):
+    def connect(self, check_same_thread: bool = True):
         if not self.db_path.exists():
             raise FileNotFoundError(f"Database not found at {self.db_path}")
-        self.conn = sqlite3.connect(self.db_path)
+        # Autocommit mode: writes open their own short BEGIN IMMEDIATE transactions
+        self.conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_MS / 1000,
+                                    isolation_level=None, check_same_thread=check_same_thread)
         self.conn.row_factory = sqlite3.Row
+        self.conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
 
     def close(self):
         if self.conn:
             self.conn.close()
+            self.conn = None
+
+    def _write(self, operation: Callable[[sqlite3.Cursor], object]):
+        """
+        Runs operation(cursor) in one BEGIN IMMEDIATE transaction and commits.
+        The write lock is taken up front, so the transaction either gets the
+        database to itself or fails before doing anything. If the launcher
+        keeps it locked past the busy timeout, the whole transaction is
+        retried a few times with jittered exponential backoff.
+        """
+        delay = RETRY_BASE_DELAY
+        for attempt in range(WRITE_RETRIES + 1):
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                result = operation(cursor)
+                cursor.execute("COMMIT")
+                return result
+            except sqlite3.OperationalError as e:
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                if not _is_locked(e) or attempt == WRITE_RETRIES:
+                    raise
+                time.sleep(delay * (1 + random.random()))
+                delay = min(delay * 2, RETRY_MAX_DELAY)
+            except BaseException:
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                raise
 
     def get_playsets(self) -> List[Dict]:
         """Fetch all playsets."""
@@ -31,14 +91,33 @@ class LauncherDB:
         row = cursor.fetchone()
         return dict(row) if row else None
 
-    def set_active_playset(self, playset_id: str):
-        """Set a playset as active."""
-        cursor = self.conn.cursor()
-        with self.conn:
-            cursor.execute("UPDATE playsets SET isActive = 0")
-            cursor.execute("UPDATE playsets SET isActive = 1 WHERE id = ?", (playset_id,))
+    def set_active_playset(self, playset_id: str) -> bool:
+        """Set a playset as active. Returns False if no such playset exists."""
+        def operation(cursor):
+            cursor.execute("SELECT 1 FROM playsets WHERE id = ?", (playset_id,))
+            if not cursor.fetchone():
+                return False
+            # One statement, so there is never a moment without an active playset
+            cursor.execute("UPDATE playsets SET isActive = (id = ?) WHERE isActive IS NOT (id = ?)",
+                           (playset_id, playset_id))
+            return True
+        return self._write(operation)
+
+    def get_playset_snapshot(self, playset_id: str) -> List[tuple]:
+        """(mod id, enabled, position) rows of a playset, for optimistic concurrency checks."""
+        return self._snapshot(self.conn.cursor(), playset_id)
+
+    @staticmethod
+    def _snapshot(cursor: sqlite3.Cursor, playset_id: str) -> List[tuple]:
+        # Same rows as get_mods_for_playset: entries whose mod the launcher removed are not part of it
+        cursor.execute("""
+            SELECT pm.modId, pm.enabled, pm.position FROM playsets_mods pm
+            JOIN mods m ON pm.modId = m.id
+            WHERE pm.playsetId = ? ORDER BY pm.position ASC, pm.modId ASC
+        """, (playset_id,))
+        return [tuple(row) for row in cursor.fetchall()]
 
-    def get_mods_for_playset(self, playset_id: str) -> List[Dict]:
+    def get_mods_for_playset(self, playset_id: str) -> List[PlaysetMod]:
         """Fetch mods for a playset, ordered by position."""
         query = """
         SELECT 
@@ -49,6 +128,7 @@ class LauncherDB:
             m.dirPath,
             m.archivePath,
             m.thumbnailPath,
+            m.steamId,
             pm.enabled,
             pm.position
         FROM playsets_mods pm
@@ -58,9 +138,10 @@ class LauncherDB:
         """
         cursor = self.conn.cursor()
         cursor.execute(query, (playset_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        intern = self.registry.intern
+        return [PlaysetMod(intern(row), row['enabled'], row['position']) for row in cursor.fetchall()]
 
-    def get_all_mods(self) -> List[Dict]:
+    def get_all_mods(self) -> List[ModRecord]:
         """Fetch all available mods from the database."""
         query = """
         SELECT 
@@ -70,21 +151,21 @@ class LauncherDB:
             version,
             dirPath,
             archivePath,
-            thumbnailPath
+            thumbnailPath,
+            steamId
         FROM mods
         ORDER BY displayName ASC
         """
         cursor = self.conn.cursor()
         cursor.execute(query)
-        return [dict(row) for row in cursor.fetchall()]
+        return [self.registry.intern(row) for row in cursor.fetchall()]
 
     
     def remove_mod_from_playset(self, playset_id, mod_id):
         """Removes a mod from the specified playset."""
         try:
-            with self.conn:
-                self.conn.execute("DELETE FROM playsets_mods WHERE playsetId = ? AND modId = ?", 
-                                  (playset_id, mod_id))
+            self._write(lambda cursor: cursor.execute(
+                "DELETE FROM playsets_mods WHERE playsetId = ? AND modId = ?", (playset_id, mod_id)))
             return True
         except sqlite3.Error as e:
             print(f"Error removing mod from playset: {e}")
@@ -92,37 +173,47 @@ class LauncherDB:
 
     def add_mod_to_playset(self, playset_id: str, mod_id: str) -> bool:
         """Add a mod to the playset. Returns True if added, False if already exists."""
-        cursor = self.conn.cursor()
-        
-        # Check if already exists
-        cursor.execute("SELECT 1 FROM playsets_mods WHERE playsetId = ? AND modId = ?", (playset_id, mod_id))
-        if cursor.fetchone():
-            return False
-            
-        # Get next position
-        cursor.execute("SELECT MAX(position) FROM playsets_mods WHERE playsetId = ?", (playset_id,))
-        row = cursor.fetchone()
-        next_pos = (row[0] + 1) if row and row[0] is not None else 0
-        
-        with self.conn:
+        def operation(cursor):
+            # Check and insert in one transaction, so the position cannot be taken meanwhile
+            cursor.execute("SELECT 1 FROM playsets_mods WHERE playsetId = ? AND modId = ?", (playset_id, mod_id))
+            if cursor.fetchone():
+                return False
+
+            # Get next position
+            cursor.execute("SELECT MAX(position) FROM playsets_mods WHERE playsetId = ?", (playset_id,))
+            row = cursor.fetchone()
+            next_pos = (row[0] + 1) if row and row[0] is not None else 0
+
             cursor.execute("""
                 INSERT INTO playsets_mods (playsetId, modId, enabled, position)
                 VALUES (?, ?, ?, ?)
             """, (playset_id, mod_id, 1, next_pos)) # Default enabled
-            
-        return True
+            return True
+
+        return self._write(operation)
 
-    def update_playset_mods(self, playset_id: str, mods_data: List[Dict]):
+    def update_playset_mods(self, playset_id: str, mods_data: List[Dict],
+                            expected: Optional[List[tuple]] = None):
         """
         Update enabled state and position for mods in a playset.
         mods_data should be a list of dicts with 'mod_id' and 'enabled', in the desired order.
+        If `expected` (a get_playset_snapshot() result taken when the playset was
+        read) is given and the rows no longer match it, nothing is written and
+        ConcurrentModificationError is raised.
         """
-        cursor = self.conn.cursor()
-        with self.conn:
-            for index, mod in enumerate(mods_data):
-                cursor.execute("""
-                    UPDATE playsets_mods 
-                    SET enabled = ?, position = ?
-                    WHERE playsetId = ? AND modId = ?
-                """, (mod['enabled'], index, playset_id, mod['mod_id']))
+        def operation(cursor):
+            if expected is not None:
+                if self._snapshot(cursor, playset_id) != [tuple(row) for row in expected]:
+                    raise ConcurrentModificationError(
+                        f"Playset {playset_id} was modified by another program since it was loaded")
+
+            # Rows that already have the right state are left alone
+            cursor.executemany("""
+                UPDATE playsets_mods 
+                SET enabled = ?, position = ?
+                WHERE playsetId = ? AND modId = ? AND (enabled IS NOT ? OR position IS NOT ?)
+            """, [(mod['enabled'], index, playset_id, mod['mod_id'], mod['enabled'], index)
+                  for index, mod in enumerate(mods_data)])
+
+        self._write(operation)
 
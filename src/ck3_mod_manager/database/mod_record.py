@@ -0,0 +1,139 @@
+import threading
+from typing import Dict, Iterator, Optional
+
+# Columns of a mod row, as selected by LauncherDB
+MOD_FIELDS = ("mod_id", "displayName", "name", "version", "dirPath", "archivePath", "thumbnailPath", "steamId")
+# Per-playset columns of a playsets_mods row
+PLAYSET_FIELDS = ("enabled", "position")
+
+
+def mod_label(mod, default: str = "Unknown Mod") -> str:
+    """Display name of a mod record or a plain mod dict."""
+    return mod.get('displayName') or mod.get('name') or default
+
+
+class ModRecord:
+    """
+    One mod of the launcher library. There is a single current instance per
+    mod id (see ModRegistry), shared by the DB layer, the GUI and the
+    analyzer. Records are not modified once handed out, so they can be read
+    from any thread without locking.
+
+    Fields are attributes; get(), [] and keys() are kept so that code written
+    against plain row dicts keeps working.
+    """
+    __slots__ = MOD_FIELDS
+
+    def __init__(self, mod_id, displayName=None, name=None, version=None,
+                 dirPath=None, archivePath=None, thumbnailPath=None, steamId=None):
+        self.mod_id = mod_id
+        self.displayName = displayName
+        self.name = name
+        self.version = version
+        self.dirPath = dirPath
+        self.archivePath = archivePath
+        self.thumbnailPath = thumbnailPath
+        self.steamId = steamId
+
+    @property
+    def label(self) -> str:
+        return mod_label(self)
+
+    def get(self, key: str, default=None):
+        if key in MOD_FIELDS:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str):
+        if key not in MOD_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def keys(self):
+        return MOD_FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(MOD_FIELDS)
+
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in MOD_FIELDS}
+
+    def __repr__(self):
+        return f"ModRecord({self.mod_id!r}, {self.label!r})"
+
+
+class PlaysetMod:
+    """A mod as it appears in one playset: the shared record plus its enabled state and position."""
+    __slots__ = ("record", "enabled", "position")
+
+    def __init__(self, record: ModRecord, enabled=1, position=0):
+        self.record = record
+        self.enabled = enabled
+        self.position = position
+
+    def __getattr__(self, name):
+        # Only reached for names that are not slots: mod fields and label
+        if name == "record":
+            raise AttributeError(name)
+        return getattr(self.record, name)
+
+    def get(self, key: str, default=None):
+        if key in PLAYSET_FIELDS:
+            return getattr(self, key)
+        return self.record.get(key, default)
+
+    def __getitem__(self, key: str):
+        if key in PLAYSET_FIELDS:
+            return getattr(self, key)
+        return self.record[key]
+
+    def keys(self):
+        return MOD_FIELDS + PLAYSET_FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def to_dict(self) -> Dict:
+        data = self.record.to_dict()
+        data['enabled'] = self.enabled
+        data['position'] = self.position
+        return data
+
+    def __repr__(self):
+        return f"PlaysetMod({self.record!r}, enabled={self.enabled!r}, position={self.position!r})"
+
+
+class ModRegistry:
+    """
+    The shared ModRecord of every mod seen so far, by mod id. Re-reading an
+    unchanged row returns the existing record; a changed row gets a new record
+    that replaces it here, while code still holding the old one (e.g. the GUI,
+    reading on another thread) keeps a consistent, if outdated, view.
+    """
+
+    def __init__(self):
+        self._records: Dict[str, ModRecord] = {}
+        self._lock = threading.Lock()
+
+    def intern(self, row) -> ModRecord:
+        """The record for a row (sqlite3.Row or mapping with MOD_FIELDS keys)."""
+        values = [row[field] for field in MOD_FIELDS]
+        key = str(values[0])
+        with self._lock:
+            record = self._records.get(key)
+            if record is None or any(getattr(record, field) != value for field, value in zip(MOD_FIELDS, values)):
+                record = self._records[key] = ModRecord(*values)
+            return record
+
+    def get(self, mod_id) -> Optional[ModRecord]:
+        return self._records.get(str(mod_id))
+
+    def label(self, mod_id) -> str:
+        record = self._records.get(str(mod_id))
+        return record.label if record else str(mod_id)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, mod_id):
+        return str(mod_id) in self._records
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import zipfile
+import zlib
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.manifest import ManifestEntry, ModReader
+
+_HASH_CHUNK = 1024 * 1024
+
+
+class DuplicateGroup(NamedTuple):
+    mods: List[Dict]        # every mod row with this content, first one is kept
+    file_count: int
+    content_size: int       # uncompressed size of one copy
+    reclaimable: int        # disk bytes held by the redundant copies
+    confirmed_by: str       # "crc", "hash", or "size" (verify=False and some files have no CRC)
+
+
+class DedupReport(NamedTuple):
+    groups: List[DuplicateGroup]
+    mods_scanned: int
+    reclaimable_bytes: int
+    redundant_files: int    # files every analysis scans more than once
+    redundant_bytes: int
+    unreadable: List[Dict]  # mods dropped because a file could not be read
+
+
+def manifest_fingerprint(manifest: Dict[str, ManifestEntry]) -> str:
+    """Hash of the sorted (path, size) list: equal content implies equal fingerprints."""
+    h = hashlib.blake2b(digest_size=16)
+    for rel_path in sorted(manifest):
+        h.update(f"{rel_path}\0{manifest[rel_path].size}\n".encode('utf-8'))
+    return h.hexdigest()
+
+
+def _location(mod: Dict) -> tuple:
+    # Several rows can point at the very same copy on disk; that is not duplication
+    return tuple(os.path.realpath(p) if p else None for p in (mod.get('dirPath'), mod.get('archivePath')))
+
+
+def _disk_size(mod: Dict, manifest: Dict[str, ManifestEntry]) -> int:
+    size = sum(e.size for e in manifest.values() if e.crc is None)
+    archive_path = mod.get('archivePath')
+    if archive_path:
+        try:
+            size += os.stat(archive_path).st_size
+        except OSError:
+            pass
+    return size
+
+
+def _partition(members: List[int], key: Callable[[int], object]) -> List[List[int]]:
+    buckets: Dict[object, List[int]] = {}
+    for member in members:
+        buckets.setdefault(key(member), []).append(member)
+    return [bucket for bucket in buckets.values() if len(bucket) > 1]
+
+
+class _Candidate:
+    def __init__(self, mod: Dict, manifest: Dict[str, ManifestEntry]):
+        self.mod = mod
+        self.manifest = manifest
+        self.reader: Optional[ModReader] = None
+        self.error: Optional[Exception] = None
+
+    def file_hash(self, rel_path: str) -> object:
+        """Content hash of one file; a fresh object() (equal to nothing) if the copy cannot be read."""
+        if self.error is not None:
+            return object()
+        try:
+            if self.reader is None:
+                self.reader = ModReader(self.mod)
+            h = hashlib.blake2b(digest_size=16)
+            with self.reader.open(rel_path) as f:
+                for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+                    h.update(chunk)
+            return h.hexdigest()
+        except (OSError, zipfile.BadZipFile, zlib.error) as e:
+            self.error = e
+            self.close()
+            return object()
+
+    def close(self):
+        if self.reader:
+            self.reader.close()
+            self.reader = None
+
+
+def find_duplicates(mods: List[Dict], analyzer: Optional[ModAnalyzer] = None,
+                    verify: bool = True) -> DedupReport:
+    """
+    Finds mods in the library whose content is identical, cheapest checks first:
+      1. file count and total size, then the (path, size) fingerprint,
+      2. zip CRCs from the central directory, where every copy has them,
+      3. full content hashes of the files that some copy has no CRC for.
+    Each stage only looks at the candidates the previous one left. A copy is
+    dropped from a group as soon as one of its files differs, or cannot be
+    read. With verify=False, stage 3 is skipped: files without CRCs are
+    trusted on matching paths and sizes.
+    """
+    analyzer = analyzer or ModAnalyzer()
+    candidates = []
+    seen_locations = set()
+    for mod in mods:
+        location = _location(mod)
+        if location in seen_locations:
+            continue
+        manifest = analyzer.get_mod_manifest(mod)
+        if manifest:
+            seen_locations.add(location)
+            candidates.append(_Candidate(mod, manifest))
+
+    # Stage 1: metadata only
+    def totals(i):
+        manifest = candidates[i].manifest
+        return (len(manifest), sum(e.size for e in manifest.values()))
+
+    groups = _partition(list(range(len(candidates))), totals)
+    groups = [g for group in groups for g in _partition(group, lambda i: manifest_fingerprint(candidates[i].manifest))]
+
+    result = []
+    try:
+        for group in groups:
+            paths = sorted(candidates[group[0]].manifest)
+
+            # Stage 2: CRCs, only comparable between archive members
+            pending = [group]
+            for rel_path in paths:
+                def crc(i, rel_path=rel_path):
+                    return candidates[i].manifest[rel_path].crc
+                pending = [
+                    part for members in pending
+                    for part in ([members] if any(crc(i) is None for i in members) else _partition(members, crc))
+                ]
+            for members in pending:
+                # Files with a CRC in every copy already agree
+                unconfirmed = [p for p in paths if any(candidates[i].manifest[p].crc is None for i in members)]
+                if not unconfirmed or not verify:
+                    result.append(_make_group([candidates[i] for i in members], "size" if unconfirmed else "crc"))
+                    continue
+
+                # Stage 3: full hashes of the survivors
+                confirmed = [members]
+                for rel_path in unconfirmed:
+                    confirmed = [
+                        part for survivors in confirmed
+                        for part in _partition(survivors, lambda i, rel_path=rel_path: candidates[i].file_hash(rel_path))
+                    ]
+                    if not confirmed:
+                        break
+                for survivors in confirmed:
+                    result.append(_make_group([candidates[i] for i in survivors], "hash"))
+    finally:
+        for candidate in candidates:
+            candidate.close()
+
+    result.sort(key=lambda g: g.reclaimable, reverse=True)
+    return DedupReport(
+        groups=result,
+        mods_scanned=len(candidates),
+        reclaimable_bytes=sum(g.reclaimable for g in result),
+        redundant_files=sum(g.file_count * (len(g.mods) - 1) for g in result),
+        redundant_bytes=sum(g.content_size * (len(g.mods) - 1) for g in result),
+        unreadable=[c.mod for c in candidates if c.error is not None],
+    )
+
+
+def _make_group(members: List[_Candidate], confirmed_by: str) -> DuplicateGroup:
+    keeper = members[0]
+    return DuplicateGroup(
+        mods=[c.mod for c in members],
+        file_count=len(keeper.manifest),
+        content_size=sum(e.size for e in keeper.manifest.values()),
+        reclaimable=sum(_disk_size(c.mod, c.manifest) for c in members[1:]),
+        confirmed_by=confirmed_by,
+    )
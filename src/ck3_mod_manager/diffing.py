@@ -0,0 +1,126 @@
+import difflib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.database.mod_record import mod_label
+from ck3_mod_manager.manifest import ModReader
+
+# Bytes read from each side; larger files are diffed up to this point only
+MAX_DIFF_BYTES = 1024 * 1024
+# Lines of diff output kept per file
+MAX_DIFF_LINES = 5000
+# How many computed diffs DiffCache keeps
+MAX_CACHED_DIFFS = 64
+
+_BINARY_SNIFF = 8192
+_READ_CHUNK = 64 * 1024
+
+
+class FileDiff(NamedTuple):
+    path: str
+    old_mod: str
+    new_mod: str
+    lines: List[str]        # unified diff, without line endings
+    added: int
+    removed: int
+    truncated: bool         # an input or the output hit its cap
+    binary: bool
+
+
+def read_capped(reader: ModReader, rel_path: str, max_bytes: int = MAX_DIFF_BYTES) -> Tuple[bytes, bool]:
+    """Reads at most `max_bytes` of a mod file; the flag tells whether there was more."""
+    chunks, size = [], 0
+    with reader.open(rel_path) as f:
+        while size <= max_bytes:
+            chunk = f.read(min(_READ_CHUNK, max_bytes + 1 - size))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+    data = b''.join(chunks)
+    return data[:max_bytes], size > max_bytes
+
+
+def _split_lines(data: bytes) -> List[str]:
+    # Paradox script files are UTF-8, usually with a BOM
+    return data.decode('utf-8-sig', errors='replace').splitlines()
+
+
+def diff_file(old_mod: Dict, new_mod: Dict, rel_path: str,
+              max_bytes: int = MAX_DIFF_BYTES, max_lines: int = MAX_DIFF_LINES) -> FileDiff:
+    """
+    Line diff of one file between two mods. Both versions are streamed from
+    the mod directory or archive and read up to `max_bytes` only.
+    """
+    with ModReader(old_mod) as old_reader, ModReader(new_mod) as new_reader:
+        old_data, old_truncated = read_capped(old_reader, rel_path, max_bytes)
+        new_data, new_truncated = read_capped(new_reader, rel_path, max_bytes)
+    truncated = old_truncated or new_truncated
+    old_name, new_name = mod_label(old_mod), mod_label(new_mod)
+
+    if b'\0' in old_data[:_BINARY_SNIFF] or b'\0' in new_data[:_BINARY_SNIFF]:
+        return FileDiff(rel_path, old_name, new_name, [], 0, 0, truncated, True)
+
+    lines, added, removed = [], 0, 0
+    diff = difflib.unified_diff(_split_lines(old_data), _split_lines(new_data),
+                                fromfile=f"{old_name}/{rel_path}", tofile=f"{new_name}/{rel_path}",
+                                lineterm='')
+    for line in diff:
+        if line.startswith('+') and not line.startswith('+++'):
+            added += 1
+        elif line.startswith('-') and not line.startswith('---'):
+            removed += 1
+        if len(lines) < max_lines:
+            lines.append(line)
+        else:
+            truncated = True
+    return FileDiff(rel_path, old_name, new_name, lines, added, removed, truncated, False)
+
+
+class DiffCache:
+    """
+    LRU cache of recent diffs, safe to share between the GUI and a worker
+    thread. Entries are keyed by the manifest signature of both versions, so
+    a file that changed on disk (after analyzer.invalidate) is diffed again.
+    """
+
+    def __init__(self, analyzer: Optional[ModAnalyzer] = None, max_entries: int = MAX_CACHED_DIFFS):
+        self.analyzer = analyzer or ModAnalyzer()
+        self.max_entries = max_entries
+        self._diffs: "OrderedDict[tuple, FileDiff]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, old_mod: Dict, new_mod: Dict, rel_path: str) -> tuple:
+        def side(mod):
+            entry = self.analyzer.get_mod_manifest(mod).get(rel_path)
+            return (str(mod.get('mod_id')), entry.signature if entry else None)
+        return (rel_path, side(old_mod), side(new_mod))
+
+    def get(self, key: tuple) -> Optional[FileDiff]:
+        with self._lock:
+            diff = self._diffs.get(key)
+            if diff is not None:
+                self._diffs.move_to_end(key)
+            return diff
+
+    def put(self, key: tuple, diff: FileDiff):
+        with self._lock:
+            self._diffs[key] = diff
+            self._diffs.move_to_end(key)
+            while len(self._diffs) > self.max_entries:
+                self._diffs.popitem(last=False)
+
+    def diff(self, old_mod: Dict, new_mod: Dict, rel_path: str) -> FileDiff:
+        """Cached diff_file()."""
+        key = self.key(old_mod, new_mod, rel_path)
+        diff = self.get(key)
+        if diff is None:
+            diff = diff_file(old_mod, new_mod, rel_path)
+            self.put(key, diff)
+        return diff
+
+    def clear(self):
+        with self._lock:
+            self._diffs.clear()
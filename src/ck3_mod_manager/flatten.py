@@ -0,0 +1,230 @@
+import json
+import os
+import shutil
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.manifest import ManifestEntry, ModReader
+
+# Written inside flattened directories (hidden, so scanners ignore it) and
+# next to flattened archives. Records where every output file came from.
+FLATTEN_MANIFEST = ".flatten_manifest.json"
+
+_COPY_CHUNK = 1024 * 1024
+
+
+class FlattenResult(NamedTuple):
+    written: int
+    skipped: int
+    removed: int
+    bytes_written: int
+
+
+def resolve_winners(mods: List[Dict], analyzer: ModAnalyzer) -> Dict[str, Tuple[Dict, ManifestEntry]]:
+    """
+    Maps every file of the enabled mods to the mod whose copy the game uses.
+    Mods are expected in load order; later mods override earlier ones.
+    """
+    winners: Dict[str, Tuple[Dict, ManifestEntry]] = {}
+    for mod in mods:
+        if not mod.get('enabled', True):
+            continue
+        for rel_path, entry in analyzer.get_mod_manifest(mod).items():
+            winners[rel_path] = (mod, entry)
+    return winners
+
+
+def build_descriptor(name: str, supported_version: Optional[str] = None, path: Optional[str] = None,
+                     archive: Optional[str] = None) -> str:
+    lines = ['version="1.0"', f'name="{name}"', 'tags={', '\t"Utilities"', '}']
+    if supported_version:
+        lines.append(f'supported_version="{supported_version}"')
+    if path:
+        lines.append(f'path="{path}"')
+    if archive:
+        lines.append(f'archive="{archive}"')
+    return "\n".join(lines) + "\n"
+
+
+def _load_previous(manifest_path: Path) -> Dict:
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_json(path: Path, data: Dict):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def flatten_playset(mods: List[Dict], output: Path, name: str = "Flattened Playset",
+                    as_zip: bool = False, supported_version: Optional[str] = None,
+                    analyzer: Optional[ModAnalyzer] = None) -> FlattenResult:
+    """
+    Writes the effective file set of a playset into a single generated mod.
+
+    `output` is either a mod directory or, with `as_zip`, a stored (uncompressed)
+    zip archive. A `<output name>.mod` descriptor pointing at it is written next
+    to it, so placing the output in Documents/mod makes it show up in the launcher.
+    File contents are streamed from the source archives and directories.
+    Re-exporting into the same directory only copies files whose winning source
+    changed since the last export.
+    """
+    analyzer = analyzer or ModAnalyzer()
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    winners = resolve_winners(mods, analyzer)
+    for rel_path in [p for p in winners if not _is_relative_path(p)]:
+        # Member names of a damaged or hostile archive, e.g. "../../x" or "/abs/x"
+        print(f"Skipping {rel_path!r}: not a path inside a mod")
+        del winners[rel_path]
+    files = {
+        rel_path: [str(mod.get('mod_id')), *entry.signature]
+        for rel_path, (mod, entry) in sorted(winners.items())
+    }
+    # Everything the output depends on besides the files: the enabled mods and the descriptor fields
+    state = {
+        'name': name,
+        'supported_version': supported_version,
+        'mods': [[str(mod.get('mod_id')), mod.get('name'), mod.get('version')]
+                 for mod in mods if mod.get('enabled', True)],
+        'files': files,
+    }
+    manifest_path = _manifest_path(output, as_zip)
+    previous = _load_previous(manifest_path)
+
+    if as_zip:
+        result = _write_archive(winners, state, output, previous)
+        outer_descriptor = build_descriptor(name, supported_version, archive=output.resolve().as_posix())
+        descriptor_path = output.with_name(output.stem + '.mod')
+    else:
+        output.mkdir(exist_ok=True)
+        result = _write_directory(winners, files, output, previous.get('files', {}), name, supported_version)
+        outer_descriptor = build_descriptor(name, supported_version, path=output.resolve().as_posix())
+        descriptor_path = output.with_name(output.name + '.mod')
+
+    with open(descriptor_path, 'w', encoding='utf-8') as f:
+        f.write(outer_descriptor)
+    _write_json(manifest_path, state)
+    return result
+
+
+def _is_relative_path(rel_path: str) -> bool:
+    path = PurePosixPath(rel_path)
+    return bool(rel_path) and not path.is_absolute() and '..' not in path.parts and ':' not in path.parts[0]
+
+
+def _target(root: Path, rel_path: str) -> Optional[Path]:
+    """`root / rel_path` if it stays inside `root` once resolved (symlinks included), else None."""
+    target = (root / rel_path).resolve()
+    if target == root or not target.is_relative_to(root):
+        return None
+    return target
+
+
+def _prune_empty_dirs(root: Path, path: Path):
+    # Removes the directories a deleted file leaves empty, up to (not including) root
+    for parent in path.parents:
+        if parent == root or not parent.is_relative_to(root):
+            return
+        try:
+            parent.rmdir()
+        except OSError:
+            return
+
+
+def _manifest_path(output: Path, as_zip: bool) -> Path:
+    if as_zip:
+        return output.with_name(output.name + FLATTEN_MANIFEST)
+    return output / FLATTEN_MANIFEST
+
+
+def _write_directory(winners, files, output: Path, previous: Dict[str, list],
+                     name: str, supported_version: Optional[str]) -> FlattenResult:
+    readers: Dict[str, ModReader] = {}
+    written = skipped = removed = bytes_written = 0
+    root = output.resolve()
+
+    try:
+        for rel_path, signature in list(files.items()):
+            mod, entry = winners[rel_path]
+            target = _target(root, rel_path)
+            if target is None:
+                print(f"Skipping {rel_path!r}: it would be written outside {output}")
+                del files[rel_path]
+                continue
+            if previous.get(rel_path) == signature and target.is_file() and target.stat().st_size == entry.size:
+                skipped += 1
+                continue
+
+            reader = readers.get(signature[0])
+            if reader is None:
+                reader = readers[signature[0]] = ModReader(mod)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with reader.open(rel_path) as src, open(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst, _COPY_CHUNK)
+            written += 1
+            bytes_written += entry.size
+    finally:
+        for reader in readers.values():
+            reader.close()
+
+    # Files that no mod in the playset provides any more
+    for rel_path in previous.keys() - files.keys():
+        target = _target(root, rel_path)
+        if target is None:
+            continue
+        try:
+            target.unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+        _prune_empty_dirs(root, target)
+
+    with open(output / 'descriptor.mod', 'w', encoding='utf-8') as f:
+        f.write(build_descriptor(name, supported_version))
+    return FlattenResult(written, skipped, removed, bytes_written)
+
+
+def _write_archive(winners, state: Dict, output: Path, previous: Dict) -> FlattenResult:
+    files = state['files']
+    if previous == state and output.is_file():
+        return FlattenResult(0, len(files), 0, 0)
+
+    readers: Dict[str, ModReader] = {}
+    bytes_written = 0
+    tmp_path = output.with_name(output.name + ".tmp")
+
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_STORED) as zf:
+            zf.writestr('descriptor.mod', build_descriptor(state['name'], state['supported_version']))
+            for rel_path, signature in files.items():
+                mod, entry = winners[rel_path]
+                reader = readers.get(signature[0])
+                if reader is None:
+                    reader = readers[signature[0]] = ModReader(mod)
+
+                info = zipfile.ZipInfo(rel_path)
+                info.compress_type = zipfile.ZIP_STORED
+                info.file_size = entry.size
+                with reader.open(rel_path) as src, \
+                        zf.open(info, 'w', force_zip64=entry.size >= zipfile.ZIP64_LIMIT) as dst:
+                    shutil.copyfileobj(src, dst, _COPY_CHUNK)
+                bytes_written += entry.size
+        os.replace(tmp_path, output)
+    finally:
+        for reader in readers.values():
+            reader.close()
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    removed = len(previous.get('files', {}).keys() - files.keys())
+    return FlattenResult(len(files), 0, removed, bytes_written)
@@ -0,0 +1,300 @@
+from typing import Dict, List, Optional
+
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, QSortFilterProxyModel, Qt
+from PySide6.QtGui import QColor
+
+# How many child rows are materialized per fetchMore() call
+FETCH_BATCH = 500
+
+ROOT_GROUP = "(root)"
+
+
+class _Node:
+    """
+    One row of the conflict tree.
+    Directory and mod-group nodes keep the raw data for their whole subtree in
+    `pending`, and only turn it into child nodes when the view asks for them.
+    """
+    __slots__ = ("parent", "row", "label", "mods", "paths", "children", "pending")
+
+    def __init__(self, parent, label, mods=(), paths=()):
+        self.parent = parent
+        self.row = 0
+        self.label = label
+        self.mods = mods        # tuple of mod names, in load order
+        self.paths = paths      # every conflicting path below this node
+        self.children: List["_Node"] = []
+        self.pending: list = []
+
+    @property
+    def depth(self) -> int:
+        depth = 0
+        node = self.parent
+        while node is not None:
+            depth += 1
+            node = node.parent
+        return depth
+
+
+class ConflictTreeModel(QAbstractItemModel):
+    """
+    Lazy tree over an analyzer conflict map: top-level directory -> group of
+    mods that touch the same files -> file. Nothing below the top level exists
+    until the view expands it.
+    """
+    HEADERS = ["File / Mod", "Conflict Type"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._root = _Node(None, "")
+        self._sort_column = 0
+        self._sort_order = Qt.AscendingOrder
+        self.file_count = 0
+
+    # -- Population -------------------------------------------------------
+
+    def set_conflicts(self, conflicts: Dict[str, List[str]]):
+        """Replaces the model contents with a new analyzer result."""
+        grouped: Dict[str, Dict[tuple, List[str]]] = {}
+        for file_path, mod_names in conflicts.items():
+            top = file_path.split('/', 1)[0] if '/' in file_path else ROOT_GROUP
+            grouped.setdefault(top, {}).setdefault(tuple(mod_names), []).append(file_path)
+
+        self.beginResetModel()
+        self._root = _Node(None, "")
+        for top, by_mods in grouped.items():
+            dir_node = _Node(self._root, top)
+            dir_node.pending = self._sorted(by_mods.items())
+            dir_node.paths = [p for paths in by_mods.values() for p in paths]
+            self._root.children.append(dir_node)
+        self.file_count = len(conflicts)
+        self._sort_children(self._root)
+        self.endResetModel()
+
+    def clear(self):
+        self.set_conflicts({})
+
+    def _materialize(self, parent: _Node, item) -> _Node:
+        if parent.depth == 1:
+            # Directory level: items are (mods, paths) groups
+            mods, paths = item
+            return _Node(parent, " ↔ ".join(mods), mods=mods, paths=paths)
+        # Mod group level: items are file paths
+        return _Node(parent, item, mods=parent.mods, paths=(item,))
+
+    # -- Lazy loading -----------------------------------------------------
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self._node(parent)
+        return bool(node.children or node.pending)
+
+    def canFetchMore(self, parent):
+        return bool(self._node(parent).pending)
+
+    def fetchMore(self, parent):
+        node = self._node(parent)
+        if not node.pending:
+            return
+        batch = node.pending[:FETCH_BATCH]
+        del node.pending[:FETCH_BATCH]
+
+        first = len(node.children)
+        self.beginInsertRows(parent, first, first + len(batch) - 1)
+        for offset, item in enumerate(batch):
+            child = self._materialize(node, item)
+            child.row = first + offset
+            if child.depth == 2:
+                child.pending = self._sorted(child.paths)
+            node.children.append(child)
+        self.endInsertRows()
+
+    # -- QAbstractItemModel -----------------------------------------------
+
+    def _node(self, index) -> _Node:
+        if index.isValid():
+            return index.internalPointer()
+        return self._root
+
+    def node_for(self, index: QModelIndex) -> Optional[_Node]:
+        """The node behind an index of this model, or None for an invalid index."""
+        return index.internalPointer() if index.isValid() else None
+
+    def node_at(self, row: int, parent: QModelIndex) -> Optional[_Node]:
+        node = self._node(parent)
+        if 0 <= row < len(node.children):
+            return node.children[row]
+        return None
+
+    def index(self, row, column, parent=QModelIndex()):
+        child = self.node_at(row, parent)
+        if child is None or not 0 <= column < len(self.HEADERS):
+            return QModelIndex()
+        return self.createIndex(row, column, child)
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        node = index.internalPointer().parent
+        if node is None or node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self._node(parent).children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        depth = node.depth
+
+        if role == Qt.DisplayRole:
+            if index.column() == 0:
+                return node.label
+            if depth == 1:
+                return f"{len(node.paths)} Files"
+            if depth == 2:
+                return f"{len(node.mods)} Mods, {len(node.paths)} Files"
+            return f"Won by {node.mods[-1]}"
+        if role == Qt.ForegroundRole and index.column() == 0:
+            return QColor("#ff6b6b") if depth == 3 else QColor("#ddd")
+        if role == Qt.ToolTipRole and depth >= 2:
+            return "Load order: " + " → ".join(node.mods)
+        return None
+
+    # -- Sorting ----------------------------------------------------------
+
+    def _sort_key(self, item):
+        # Items are either materialized nodes, (mods, paths) groups or paths
+        if isinstance(item, _Node):
+            label, count = item.label, len(item.paths)
+        elif isinstance(item, tuple):
+            label, count = " ↔ ".join(item[0]), len(item[1])
+        else:
+            label, count = item, 1
+        if self._sort_column == 1:
+            return (count, label.lower())
+        return label.lower()
+
+    def _sorted(self, items) -> list:
+        """Items in the current sort order."""
+        return sorted(items, key=self._sort_key, reverse=self._sort_order == Qt.DescendingOrder)
+
+    @staticmethod
+    def _unmaterialize(node: _Node):
+        # Back to the raw item it was built from
+        if node.depth == 2:
+            return (node.mods, node.paths)
+        return node.label
+
+    def _sort_children(self, node: _Node):
+        """
+        Sorts fetched and pending rows as one list, so the fetched rows stay
+        the first ones in the new order. Rows that move into the fetched range
+        are materialized; nodes that move out of it are dropped (row = -1).
+        """
+        fetched = len(node.children)
+        items = self._sorted(node.children + node.pending)
+        children = []
+        for item in items[:fetched]:
+            if not isinstance(item, _Node):
+                item = self._materialize(node, item)
+                if item.depth == 2:
+                    item.pending = self._sorted(item.paths)
+            children.append(item)
+        node.pending = []
+        for item in items[fetched:]:
+            if isinstance(item, _Node):
+                item.row = -1
+                item = self._unmaterialize(item)
+            node.pending.append(item)
+        node.children = children
+        for row, child in enumerate(node.children):
+            child.row = row
+            self._sort_children(child)
+
+    @staticmethod
+    def _attached(node: _Node) -> bool:
+        while node.parent is not None:
+            if node.row < 0:
+                return False
+            node = node.parent
+        return True
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sorts every level in place, including rows not fetched yet."""
+        self._sort_column = column
+        self._sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        nodes = [(index.internalPointer(), index.column()) for index in persistent]
+        self._sort_children(self._root)
+        self.changePersistentIndexList(
+            persistent, [self.createIndex(node.row, col, node) if self._attached(node) else QModelIndex()
+                         for node, col in nodes])
+        self.layoutChanged.emit()
+
+    # -- Filtering --------------------------------------------------------
+
+    def node_matches(self, node: _Node, needle: str) -> bool:
+        """
+        True if the node, or anything below it, matches `needle` (lowercase)
+        by path or by mod name. Works on unfetched data, so filtering never
+        forces the subtree to be built.
+        """
+        if node.depth == 1:
+            groups = [mods for mods, _ in node.pending] + [child.mods for child in node.children]
+        else:
+            groups = [node.mods]
+        if any(needle in name.lower() for mods in groups for name in mods):
+            return True
+        return any(needle in p.lower() for p in node.paths)
+
+
+class ConflictFilterProxy(QSortFilterProxyModel):
+    """Filters a ConflictTreeModel by mod name or path; sorting is done by the source."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._needle = ""
+
+    def set_filter_text(self, text: str):
+        if hasattr(self, "beginFilterChange"):
+            # Qt >= 6.10
+            self.beginFilterChange()
+            self._needle = text.strip().lower()
+            self.endFilterChange(QSortFilterProxyModel.Direction.Rows)
+        else:
+            self._needle = text.strip().lower()
+            self.invalidateRowsFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._needle:
+            return True
+        model = self.sourceModel()
+        node = model.node_at(source_row, source_parent)
+        return node is not None and model.node_matches(node, self._needle)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+    def fetchMore(self, parent):
+        # Keep fetching while every new source row is filtered out, otherwise
+        # an expanded group could look empty even though matches are pending.
+        source_parent = self.mapToSource(parent)
+        model = self.sourceModel()
+        before = self.rowCount(parent)
+        while model.canFetchMore(source_parent):
+            model.fetchMore(source_parent)
+            if self.rowCount(parent) > before:
+                break
@@ -0,0 +1,168 @@
+import sqlite3
+import zipfile
+from typing import Dict, List, Optional
+
+from PySide6.QtCore import QThread, QTimer, Signal
+from PySide6.QtWidgets import (QHBoxLayout, QLabel, QLineEdit, QPushButton, QTreeWidget, QTreeWidgetItem,
+                               QVBoxLayout, QWidget)
+
+from ck3_mod_manager.content_index import ContentIndex, IndexStats
+from ck3_mod_manager.gui.db_worker import DBClient
+
+# Delay after the last keystroke before searching
+SEARCH_DELAY_MS = 250
+
+
+class SearchWorker(QThread):
+    finished = Signal(object, object)  # query, hits or exception
+
+    def __init__(self, index: ContentIndex, query: str):
+        super().__init__()
+        self.index = index
+        self.query = query
+
+    def run(self):
+        try:
+            result = self.index.search(self.query)
+        except (OSError, sqlite3.Error) as e:
+            result = e
+        self.finished.emit(self.query, result)
+
+
+class IndexWorker(QThread):
+    progress = Signal(int, int)
+    finished = Signal(object)  # IndexStats or exception
+
+    def __init__(self, index: ContentIndex, mods: List[Dict]):
+        super().__init__()
+        self.index = index
+        self.mods = mods
+
+    def run(self):
+        try:
+            result = self.index.update(self.mods, progress=self.progress.emit,
+                                       cancelled=self.isInterruptionRequested)
+        except (OSError, sqlite3.Error, zipfile.BadZipFile) as e:
+            result = e
+        self.finished.emit(result)
+
+
+class ContentSearchWidget(QWidget):
+    """
+    Searches the script and localization files of the whole library through
+    the persistent ContentIndex. The index is brought up to date in the
+    background the first time the widget is shown, and on demand.
+    """
+
+    def __init__(self, db: DBClient, index: Optional[ContentIndex] = None, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.index = index or ContentIndex()
+        self.search_workers: List[SearchWorker] = []
+        self.index_worker: Optional[IndexWorker] = None
+        self._query = ""
+        self._indexed_once = False
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.run_search)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(5)
+
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search mod files, e.g. trait_brave or scripted_effect_*")
+        self.search_input.textChanged.connect(lambda _: self.search_timer.start())
+        self.search_input.returnPressed.connect(self.run_search)
+        search_layout.addWidget(self.search_input)
+
+        self.update_btn = QPushButton("Update Index")
+        self.update_btn.setStyleSheet("background-color: #444; border: 1px solid #666;")
+        self.update_btn.clicked.connect(self.update_index)
+        search_layout.addWidget(self.update_btn)
+        layout.addLayout(search_layout)
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #bbb;")
+        layout.addWidget(self.status_label)
+
+        self.results = QTreeWidget()
+        self.results.setHeaderLabels(["Mod", "File", "Line", "Text"])
+        self.results.setRootIsDecorated(False)
+        self.results.setUniformRowHeights(True)
+        layout.addWidget(self.results)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._indexed_once:
+            self._indexed_once = True
+            self.update_index()
+
+    def update_index(self):
+        if self.index_worker and self.index_worker.isRunning():
+            return
+        self.update_btn.setEnabled(False)
+        self.status_label.setText("Updating the content index...")
+        self.db.submit("get_all_mods", callback=self.on_mods_loaded)
+
+    def on_mods_loaded(self, mods):
+        self.index_worker = IndexWorker(self.index, mods)
+        self.index_worker.progress.connect(self.on_index_progress)
+        self.index_worker.finished.connect(self.on_index_finished)
+        self.index_worker.start()
+
+    def on_index_progress(self, done, total):
+        self.status_label.setText(f"Updating the content index... {done}/{total} mods")
+
+    def on_index_finished(self, result):
+        self.update_btn.setEnabled(True)
+        if isinstance(result, Exception):
+            self.status_label.setText(f"Could not update the content index: {result}")
+            return
+        stats: IndexStats = result
+        self.status_label.setText(f"Index up to date ({stats.files} files read from {stats.mods} changed mods).")
+        if self.search_input.text().strip():
+            self.run_search()
+
+    def run_search(self):
+        self.search_timer.stop()
+        self._query = self.search_input.text().strip()
+        if not self._query:
+            self.results.clear()
+            return
+        # Workers are only dropped once their thread has really ended
+        self.search_workers = [w for w in self.search_workers if not w.isFinished()]
+        worker = SearchWorker(self.index, self._query)
+        worker.finished.connect(self.on_search_finished)
+        self.search_workers.append(worker)
+        worker.start()
+
+    def on_search_finished(self, query, result):
+        if query != self._query:
+            # A newer search is on its way
+            return
+        if isinstance(result, Exception):
+            self.status_label.setText(f"Search failed: {result}")
+            return
+
+        self.results.setUpdatesEnabled(False)
+        self.results.clear()
+        items = []
+        for hit in result:
+            item = QTreeWidgetItem([self.db.registry.label(hit.mod_id), hit.path, str(hit.line), hit.text])
+            item.setToolTip(3, hit.text)
+            items.append(item)
+        self.results.addTopLevelItems(items)
+        self.results.setUpdatesEnabled(True)
+        self.status_label.setText(f"{len(result)} hits for '{query}'.")
+
+    def wait(self):
+        """Stops indexing and waits for running workers (used on shutdown)."""
+        if self.index_worker:
+            self.index_worker.requestInterruption()
+        for worker in self.search_workers + ([self.index_worker] if self.index_worker else []):
+            worker.wait()
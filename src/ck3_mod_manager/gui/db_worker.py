@@ -0,0 +1,135 @@
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+
+from ck3_mod_manager.database.launcher_db import LauncherDB
+from ck3_mod_manager.database.mod_record import ModRegistry
+
+# Requests for these methods can share one pending query
+READ_METHODS = {"get_playsets", "get_active_playset", "get_mods_for_playset", "get_all_mods"}
+
+
+class DBRequest(QObject):
+    """
+    Handle for one queued database call. `finished` carries the method's
+    return value, `failed` the exception it raised; both are emitted on the GUI thread.
+    """
+    finished = Signal(object)
+    failed = Signal(object)
+
+    def __init__(self, method: str, args: tuple, parent=None):
+        super().__init__(parent)
+        self.method = method
+        self.args = args
+        self.done = False
+        self.result = None
+        self.error: Optional[Exception] = None
+
+
+class _DBExecutor(QObject):
+    """Lives on the DB thread and owns the LauncherDB connection."""
+    completed = Signal(object, object, object)  # request, result, error
+
+    def __init__(self, db_path: Optional[Path], registry: ModRegistry):
+        super().__init__()
+        self.db = LauncherDB(db_path, registry)
+
+    @Slot(object)
+    def execute(self, request: DBRequest):
+        try:
+            if request.method == "connect":
+                result = self.db.connect()
+            elif request.method == "close":
+                result = self.db.close()
+                # Last request: everything queued before it has run by now
+                self.thread().quit()
+            else:
+                if self.db.conn is None:
+                    self.db.connect()
+                if callable(request.method):
+                    result = request.method(self.db, *request.args)
+                else:
+                    result = getattr(self.db, request.method)(*request.args)
+        except Exception as e:
+            self.completed.emit(request, None, e)
+            return
+        self.completed.emit(request, result, None)
+
+
+class DBClient(QObject):
+    """
+    Queued, non-blocking access to LauncherDB for the GUI.
+
+    All SQLite work happens on a dedicated thread, in submission order. Calls
+    return a DBRequest immediately; connect to its signals (or pass `callback`)
+    to get the result. Identical reads that are still waiting in the queue are
+    coalesced into one query, unless a write was queued after them.
+    """
+    _submitted = Signal(object)
+
+    def __init__(self, db_path: Optional[Path] = None, parent=None):
+        super().__init__(parent)
+        self.db_path = LauncherDB(db_path).db_path
+        # Every mod row the DB thread returns is a shared record from here
+        self.registry = ModRegistry()
+        self._pending_reads: Dict[Tuple[str, tuple], DBRequest] = {}
+
+        self._thread = QThread()
+        self._thread.setObjectName("LauncherDB")
+        self._executor = _DBExecutor(db_path, self.registry)
+        self._executor.moveToThread(self._thread)
+        self._submitted.connect(self._executor.execute)
+        self._executor.completed.connect(self._on_completed)
+        self._thread.start()
+
+    def submit(self, method: str, *args, callback: Optional[Callable] = None,
+               error_callback: Optional[Callable] = None) -> DBRequest:
+        """Queues `LauncherDB.<method>(*args)`."""
+        key = (method, args)
+        request = self._pending_reads.get(key) if method in READ_METHODS else None
+        if request is None:
+            request = DBRequest(method, args, self)
+            if method in READ_METHODS:
+                self._pending_reads[key] = request
+            else:
+                # Reads queued before this write must not answer reads queued after it
+                self._pending_reads.clear()
+            self._submitted.emit(request)
+
+        if callback:
+            request.finished.connect(callback)
+        if error_callback:
+            request.failed.connect(error_callback)
+        return request
+
+    def run(self, func: Callable, *args, callback: Optional[Callable] = None,
+            error_callback: Optional[Callable] = None) -> DBRequest:
+        """
+        Queues `func(launcher_db, *args)`, for work that needs several queries
+        in a row. It is ordered like a write: never coalesced, and only sees
+        rows written by calls queued before it.
+        """
+        return self.submit(func, *args, callback=callback, error_callback=error_callback)
+
+    @Slot(object, object, object)
+    def _on_completed(self, request: DBRequest, result, error):
+        if request.method in READ_METHODS:
+            key = (request.method, request.args)
+            if self._pending_reads.get(key) is request:
+                del self._pending_reads[key]
+        request.done = True
+        request.result = result
+        request.error = error
+        if error is not None:
+            print(f"Database call {request.method} failed: {type(error).__name__}: {error}")
+            request.failed.emit(error)
+        else:
+            request.finished.emit(result)
+        request.deleteLater()
+
+    def stop(self):
+        """Closes the connection and stops the DB thread once queued calls have run."""
+        if self._thread.isRunning():
+            self._submitted.emit(DBRequest("close", (), None))
+            self._thread.wait()
@@ -0,0 +1,153 @@
+import zipfile
+import zlib
+from typing import Dict, List, Optional
+
+from PySide6.QtCore import QThread, Signal
+from PySide6.QtGui import QColor, QFont, QSyntaxHighlighter, QTextCharFormat
+from PySide6.QtWidgets import QComboBox, QHBoxLayout, QLabel, QPlainTextEdit, QVBoxLayout, QWidget
+
+from ck3_mod_manager.database.mod_record import mod_label
+from ck3_mod_manager.diffing import DiffCache, FileDiff
+
+
+class DiffWorker(QThread):
+    finished = Signal(object, object)  # request, FileDiff or exception
+
+    def __init__(self, cache: DiffCache, request: tuple):
+        super().__init__()
+        self.cache = cache
+        self.request = request
+
+    def run(self):
+        old_mod, new_mod, rel_path = self.request
+        try:
+            result = self.cache.diff(old_mod, new_mod, rel_path)
+        except (OSError, zipfile.BadZipFile, RuntimeError, zlib.error, UnicodeError, KeyError, ValueError) as e:
+            result = e
+        self.finished.emit(self.request, result)
+
+
+class _DiffHighlighter(QSyntaxHighlighter):
+    def __init__(self, document):
+        super().__init__(document)
+        self.formats = {}
+        for prefix, color in (('+', "#51cf66"), ('-', "#ff6b6b"), ('@', "#74c0fc")):
+            fmt = QTextCharFormat()
+            fmt.setForeground(QColor(color))
+            self.formats[prefix] = fmt
+
+    def highlightBlock(self, text):
+        fmt = self.formats.get(text[:1])
+        if fmt is not None:
+            self.setFormat(0, len(text), fmt)
+
+
+class DiffView(QWidget):
+    """
+    Shows how two mods' versions of a conflicting file differ. Nothing is read
+    until show_file() is called; the diff is computed on a worker thread and
+    recent diffs are kept in the shared DiffCache.
+    """
+
+    def __init__(self, cache: DiffCache, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.rel_path: Optional[str] = None
+        self.mods: List[Dict] = []
+        self.workers: List[DiffWorker] = []
+        self._request = None
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        ctrl_layout = QHBoxLayout()
+        self.old_combo = QComboBox()
+        self.new_combo = QComboBox()
+        self.old_combo.currentIndexChanged.connect(self.refresh)
+        self.new_combo.currentIndexChanged.connect(self.refresh)
+        ctrl_layout.addWidget(self.old_combo, 1)
+        ctrl_layout.addWidget(QLabel("→"))
+        ctrl_layout.addWidget(self.new_combo, 1)
+        layout.addLayout(ctrl_layout)
+
+        self.status_label = QLabel("Select a conflicting file to compare the mods' versions.")
+        self.status_label.setStyleSheet("color: #bbb;")
+        layout.addWidget(self.status_label)
+
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.text.setFont(QFont("Menlo", 11))
+        self.highlighter = _DiffHighlighter(self.text.document())
+        layout.addWidget(self.text)
+
+    def show_file(self, rel_path: str, mods: List[Dict]):
+        """Compares `rel_path` between the mods that ship it (in load order); defaults to the last two."""
+        self.rel_path = rel_path
+        self.mods = mods
+        for combo in (self.old_combo, self.new_combo):
+            combo.blockSignals(True)
+            combo.clear()
+            for mod in mods:
+                combo.addItem(mod_label(mod))
+            combo.blockSignals(False)
+        if len(mods) >= 2:
+            self.old_combo.setCurrentIndex(len(mods) - 2)
+            self.new_combo.setCurrentIndex(len(mods) - 1)
+        self.refresh()
+
+    def clear(self):
+        self.rel_path = None
+        self.mods = []
+        self._request = None
+        self.old_combo.clear()
+        self.new_combo.clear()
+        self.text.clear()
+        self.status_label.setText("Select a conflicting file to compare the mods' versions.")
+
+    def refresh(self):
+        old_index, new_index = self.old_combo.currentIndex(), self.new_combo.currentIndex()
+        if self.rel_path is None or old_index < 0 or new_index < 0:
+            return
+        self._request = (self.mods[old_index], self.mods[new_index], self.rel_path)
+        self.status_label.setText(f"Comparing {self.rel_path}...")
+
+        # Workers are only dropped once their thread has really ended
+        self.workers = [w for w in self.workers if not w.isFinished()]
+        worker = DiffWorker(self.cache, self._request)
+        worker.finished.connect(self.on_diff_finished)
+        self.workers.append(worker)
+        worker.start()
+
+    def on_diff_finished(self, request, result):
+        if request is not self._request:
+            # The user already moved on to another row
+            return
+        if isinstance(result, Exception):
+            self.text.clear()
+            self.status_label.setText(f"Could not read {self.rel_path}: {result}")
+            return
+        self.show_diff(result)
+
+    def show_diff(self, diff: FileDiff):
+        if diff.binary:
+            self.text.clear()
+            self.status_label.setText(f"{diff.path} is a binary file.")
+            return
+        if not diff.lines:
+            self.text.clear()
+            self.status_label.setText(f"{diff.old_mod} and {diff.new_mod} ship identical versions.")
+            return
+
+        status = f"+{diff.added} -{diff.removed} lines"
+        if diff.truncated:
+            status += " (large file: diff truncated)"
+        self.status_label.setText(status)
+        self.text.setPlainText("\n".join(diff.lines))
+
+    def wait(self):
+        """Waits for running diff workers (used on shutdown)."""
+        for worker in list(self.workers):
+            worker.wait()
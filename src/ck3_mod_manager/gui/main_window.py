@@ -3,12 +3,25 @@ import subprocess
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QListWidget, QListWidgetItem, QLabel, 
                                QPushButton, QSplitter, QComboBox, QMessageBox,
-                               QCheckBox, QLineEdit, QTreeWidget, QTreeWidgetItem, QHeaderView)
+                               QCheckBox, QLineEdit, QTreeView, QHeaderView, QTabWidget,
+                               QStyle, QStyledItemDelegate, QStyleOptionViewItem)
 from PySide6.QtCore import Qt, QSize, Signal, QThread
-from PySide6.QtGui import QColor, QPalette, QKeySequence
+from PySide6.QtGui import QColor, QPalette, QKeySequence, QFont, QFontMetrics
 
-from ck3_mod_manager.database.launcher_db import LauncherDB
+from ck3_mod_manager.database.launcher_db import ConcurrentModificationError
+from ck3_mod_manager.gui.db_worker import DBClient
 from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.health import HealthChecker, ERROR
+from ck3_mod_manager.loader.dlc_sync import DlcLoadSync
+from ck3_mod_manager.service import ServiceClient, ServiceError
+from ck3_mod_manager.gui.conflict_model import ConflictTreeModel, ConflictFilterProxy
+from ck3_mod_manager.gui.diff_view import DiffView
+from ck3_mod_manager.gui.content_search import ContentSearchWidget
+from ck3_mod_manager.diffing import DiffCache
+from ck3_mod_manager.conflict_memo import ConflictMemo
+from ck3_mod_manager.snapshots import ManifestStore
+from ck3_mod_manager.vanilla import VanillaIndex
+from ck3_mod_manager.utils.config import CACHE_DIR
 
 class ModListItemWidget(QWidget):
     def __init__(self, mod, parent=None, show_checkbox=True, show_handle=True):
@@ -20,7 +33,7 @@ class ModListItemWidget(QWidget):
         # Drag Handle
         if show_handle:
             self.drag_handle = QLabel("≡")
-            self.drag_handle.setStyleSheet("color: #666; font-size: 16px; font-weight: bold;")
+            self.drag_handle.setObjectName("modDragHandle")
             self.drag_handle.setCursor(Qt.OpenHandCursor)
             layout.addWidget(self.drag_handle)
         
@@ -37,15 +50,13 @@ class ModListItemWidget(QWidget):
         info_layout.setSpacing(2)
         
         # Name
-        display_name = mod.get('displayName') or mod.get('name') or "Unknown"
-        self.name_label = QLabel(display_name)
-        self.name_label.setStyleSheet("font-weight: bold; font-size: 13px;")
+        self.name_label = QLabel(mod.label)
+        self.name_label.setObjectName("modName")
         info_layout.addWidget(self.name_label)
         
         # Version
-        version = mod.get('version', '?')
-        self.version_label = QLabel(f"v{version}")
-        self.version_label.setStyleSheet("color: #aaa; font-size: 11px;")
+        self.version_label = QLabel(f"v{mod.version or '?'}")
+        self.version_label.setObjectName("modVersion")
         info_layout.addWidget(self.version_label)
         
         layout.addLayout(info_layout)
@@ -53,7 +64,7 @@ class ModListItemWidget(QWidget):
 
         # Conflict Icon
         self.conflict_icon = QLabel("⚠️")
-        self.conflict_icon.setStyleSheet("color: #ffc107; font-size: 16px; margin-right: 5px;")
+        self.conflict_icon.setObjectName("modConflictIcon")
         self.conflict_icon.setToolTip("No conflicts detected")
         self.conflict_icon.hide()
         layout.addWidget(self.conflict_icon)
@@ -71,13 +82,49 @@ class ModListItemWidget(QWidget):
         else:
             self.conflict_icon.hide()
 
+# Item data role holding the version shown under a library row's name
+VERSION_ROLE = Qt.UserRole + 1
+
+class ModLibraryDelegate(QStyledItemDelegate):
+    """Paints a library row like ModListItemWidget (name over version), without a widget per row."""
+
+    def paint(self, painter, option, index):
+        option = QStyleOptionViewItem(option)
+        self.initStyleOption(option, index)
+        name = option.text
+        option.text = ""
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, option, painter, widget)
+
+        name_font = QFont(option.font)
+        name_font.setBold(True)
+        name_font.setPixelSize(13)
+        version_font = QFont(option.font)
+        version_font.setPixelSize(11)
+        name_height = QFontMetrics(name_font).height()
+        version_height = QFontMetrics(version_font).height()
+        # Both lines centered as a block, 2px apart, like the widget's layout
+        rect = option.rect.adjusted(10, 0, -10, 0)
+        top = rect.top() + (rect.height() - name_height - 2 - version_height) // 2
+        painter.save()
+        painter.setFont(name_font)
+        painter.setPen(QColor("#ddd"))
+        painter.drawText(rect.left(), top, rect.width(), name_height, Qt.AlignLeft | Qt.AlignVCenter, name)
+        painter.setFont(version_font)
+        painter.setPen(QColor("#aaa"))
+        painter.drawText(rect.left(), top + name_height + 2, rect.width(), version_height,
+                         Qt.AlignLeft | Qt.AlignVCenter, f"v{index.data(VERSION_ROLE) or '?'}")
+        painter.restore()
+
 class ModLibraryWidget(QWidget):
     mod_added = Signal()
 
-    def __init__(self, db: LauncherDB, parent=None):
+    def __init__(self, db: DBClient, parent=None):
         super().__init__(parent)
         self.db = db
         self.all_mods = []
+        self._labels = []
         self.init_ui()
         self.load_mods()
 
@@ -104,31 +151,40 @@ class ModLibraryWidget(QWidget):
         self.mod_list = QListWidget()
         self.mod_list.setSelectionMode(QListWidget.SingleSelection)
         self.mod_list.setDragEnabled(True)
+        self.mod_list.setItemDelegate(ModLibraryDelegate(self.mod_list))
         layout.addWidget(self.mod_list)
 
     def load_mods(self):
-        self.all_mods = self.db.get_all_mods()
-        self.update_list()
+        self.db.submit("get_all_mods", callback=self.on_mods_loaded)
+
+    def on_mods_loaded(self, mods):
+        self.all_mods = mods
+        self.update_list(self.search_input.text())
 
     def update_list(self, filter_text=""):
+        # Rows are built once per load (painted by ModLibraryDelegate, no widget
+        # per row); searching only hides and shows them
+        self.mod_list.setUpdatesEnabled(False)
         self.mod_list.clear()
-        filter_text = filter_text.lower()
-        
+        self._labels = []
         for mod in self.all_mods:
-            display_name = mod.get('displayName') or mod.get('name') or "Unknown"
-            if filter_text and filter_text not in display_name.lower():
-                continue
-                
-            item = QListWidgetItem(self.mod_list)
+            item = QListWidgetItem(mod.label, self.mod_list)
             item.setSizeHint(QSize(0, 50))
-            widget = ModListItemWidget(mod, show_checkbox=False, show_handle=False)
-            item.setData(Qt.UserRole, mod['mod_id'])
-            
-            self.mod_list.addItem(item)
-            self.mod_list.setItemWidget(item, widget)
+            item.setData(Qt.UserRole, mod.mod_id)
+            item.setData(VERSION_ROLE, mod.version)
+            self._labels.append(mod.label.lower())
+        self.mod_list.setUpdatesEnabled(True)
+        self.filter_mods(filter_text)
 
     def filter_mods(self, text):
-        self.update_list(text)
+        text = text.lower()
+        self.mod_list.setUpdatesEnabled(False)
+        for row, label in enumerate(self._labels):
+            item = self.mod_list.item(row)
+            hidden = bool(text) and text not in label
+            if item.isHidden() != hidden:
+                item.setHidden(hidden)
+        self.mod_list.setUpdatesEnabled(True)
 
     def add_selected_mod(self):
         items = self.mod_list.selectedItems()
@@ -142,32 +198,94 @@ class ModLibraryWidget(QWidget):
         # Ideally we'd emit a signal with the mod_id and let MainWindow handle it
         main_window = self.window()
         if isinstance(main_window, MainWindow) and main_window.current_playset_id:
-            if self.db.add_mod_to_playset(main_window.current_playset_id, mod_id):
-                QMessageBox.information(self, "Success", "Mod added to playset.")
-                self.mod_added.emit()
-            else:
-                QMessageBox.warning(self, "Error", "Mod already in playset or failed to add.")
+            self.db.submit("add_mod_to_playset", main_window.current_playset_id, mod_id,
+                           callback=self.on_mod_added, error_callback=self.on_add_failed)
         else:
              QMessageBox.warning(self, "Error", "No active playset found.")
 
+    def on_mod_added(self, added):
+        if added:
+            QMessageBox.information(self, "Success", "Mod added to playset.")
+            self.mod_added.emit()
+        else:
+            QMessageBox.warning(self, "Error", "Mod already in playset or failed to add.")
+
+    def on_add_failed(self, error):
+        QMessageBox.warning(self, "Error", f"Failed to add mod:\n{error}")
+
 class ConflictWorker(QThread):
     finished = Signal(dict)
+    # With a VanillaIndex: (game version or None, mod id -> vanilla files replaced)
+    vanilla_counted = Signal(object, dict)
     
-    def __init__(self, analyzer, mods):
+    def __init__(self, analyzer, mods, memo=None, vanilla=None):
         super().__init__()
         self.analyzer = analyzer
         self.mods = mods
+        self.memo = memo
+        self.vanilla = vanilla
+        self.vanilla_result = (None, {})
         
     def run(self):
-        conflicts = self.analyzer.analyze_conflicts(self.mods)
+        if self.memo is None:
+            conflicts, _ = self.compute(self.mods)
+            self.finished.emit(conflicts)
+            if self.vanilla is not None:
+                self.vanilla_counted.emit(*self.vanilla_result)
+            return
+        # The memoized result for the stored versions first, then the result
+        # for the files as they are now, if that differs
+        conflicts = self.memo.analyze(self.analyzer, self.mods, self.compute)
         self.finished.emit(conflicts)
+        current = self.memo.analyze(self.analyzer, self.mods, self.compute, rescan=True,
+                                    cancelled=self.isInterruptionRequested)
+        if current != conflicts and not self.isInterruptionRequested():
+            self.finished.emit(current)
+
+    def compute(self, mods):
+        """Conflicts of `mods` and the snapshot versions they match (None: the current ones)."""
+        # Prefer the background service when one is running: its caches are already warm
+        client = ServiceClient.try_connect()
+        if client:
+            try:
+                with client:
+                    result = client.call("analyze", mod_ids=[str(m.mod_id) for m in mods], by_id=True,
+                                         with_versions=True, with_vanilla=self.vanilla is not None)
+                if self.vanilla is not None:
+                    self.vanilla_result = (result["vanilla"]["version"], result["vanilla"]["overrides"])
+                return result["conflicts"], result["versions"]
+            except (ServiceError, OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Service analysis failed, analyzing locally: {e}")
+        conflicts = self.analyzer.analyze_conflicts_by_id(mods)
+        if self.vanilla is not None:
+            # The analysis just cached every mod's files
+            self.vanilla_result = self.vanilla.override_counts(mods, self.analyzer)
+        return conflicts, None
+
+class HealthWorker(QThread):
+    finished = Signal(list)
+
+    def __init__(self, checker, mods):
+        super().__init__()
+        self.checker = checker
+        self.mods = mods
+
+    def run(self):
+        issues = self.checker.check(self.mods)
+        self.finished.emit(issues)
 
 class ConflictReportWidget(QWidget):
-    def __init__(self, db: LauncherDB, parent=None):
+    def __init__(self, db: DBClient, parent=None):
         super().__init__(parent)
         self.db = db
         self.analyzer = ModAnalyzer()
+        self.diff_cache = DiffCache(self.analyzer)
+        # Read-only here: the baseline is built by the CLI's `vanilla` command
+        self.vanilla = VanillaIndex()
         self.current_playset_id = None
+        self.worker = None
+        # File path -> ids of the mods that ship it, from the last check
+        self.conflict_ids = {}
         self.init_ui()
 
     def init_ui(self):
@@ -186,16 +304,51 @@ class ConflictReportWidget(QWidget):
         ctrl_layout.addStretch()
         layout.addLayout(ctrl_layout)
         
-        # Tree
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["File / Mod", "Conflict Type"])
+        # Filter
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter conflicts by mod name or path...")
+        self.filter_input.textChanged.connect(self.filter_conflicts)
+        layout.addWidget(self.filter_input)
+
+        # Tree (lazy: groups are only expanded into rows when opened)
+        self.model = ConflictTreeModel(self)
+        self.proxy = ConflictFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+
+        self.tree = QTreeView()
+        self.tree.setModel(self.proxy)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setSortingEnabled(True)
+        self.tree.sortByColumn(0, Qt.AscendingOrder)
         self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
         self.tree.header().setSectionResizeMode(1, QHeaderView.ResizeToContents)
-        layout.addWidget(self.tree)
+        self.tree.selectionModel().currentChanged.connect(self.on_conflict_selected)
+
+        # Diff of the selected file, only read when a file row is opened
+        self.diff_view = DiffView(self.diff_cache, self)
+        splitter = QSplitter(Qt.Vertical)
+        splitter.addWidget(self.tree)
+        splitter.addWidget(self.diff_view)
+        splitter.setStretchFactor(0, 2)
+        splitter.setStretchFactor(1, 1)
+        layout.addWidget(splitter)
+
+    def filter_conflicts(self, text):
+        self.proxy.set_filter_text(text)
+
+    def on_conflict_selected(self, current, _previous):
+        node = self.model.node_for(self.proxy.mapToSource(current))
+        if node is None or node.depth != 3:
+            return
+        mods = [self.db.registry.get(mod_id) for mod_id in self.conflict_ids.get(node.label, ())]
+        mods = [mod for mod in mods if mod is not None]
+        if len(mods) >= 2:
+            self.diff_view.show_file(node.label, mods)
 
     def set_current_playset(self, playset_id):
         self.current_playset_id = playset_id
-        self.tree.clear()
+        self.model.clear()
+        self.diff_view.clear()
         self.status_label.setText("Ready to check active playset.")
 
     def run_check(self):
@@ -203,9 +356,14 @@ class ConflictReportWidget(QWidget):
             QMessageBox.warning(self, "Warning", "No active playset selected.")
             return
 
+        self.run_btn.setEnabled(False)
+        self.db.submit("get_mods_for_playset", self.current_playset_id,
+                       callback=self.start_check, error_callback=lambda _: self.run_btn.setEnabled(True))
+
+    def start_check(self, all_mods):
         # Get enabled mods only
-        all_mods = self.db.get_mods_for_playset(self.current_playset_id)
-        enabled_mods = [m for m in all_mods if m.get('enabled')]
+        self.run_btn.setEnabled(True)
+        enabled_mods = [m for m in all_mods if m.enabled]
         
         if len(enabled_mods) < 2:
             QMessageBox.information(self, "Info", "Need at least 2 enabled mods to check for conflicts.")
@@ -213,16 +371,26 @@ class ConflictReportWidget(QWidget):
 
         self.run_btn.setEnabled(False)
         self.status_label.setText("Scanning files... This may take a moment.")
-        self.tree.clear()
+        self.model.clear()
+        self.diff_view.clear()
         
         # Run in thread to keep UI responsive
-        self.worker = ConflictWorker(self.analyzer, enabled_mods)
+        self.worker = ConflictWorker(self.analyzer, enabled_mods, vanilla=self.vanilla)
         self.worker.finished.connect(self.on_check_finished)
+        self.worker.vanilla_counted.connect(self.on_vanilla_counted)
         self.worker.start()
 
+    def wait(self):
+        """Waits for the running check and diff workers (used on shutdown)."""
+        if self.worker:
+            self.worker.wait()
+        self.diff_view.wait()
+
     def on_check_finished(self, conflicts):
         self.run_btn.setEnabled(True)
-        self.tree.clear()
+        self.model.clear()
+        self.conflict_ids = {}
+        self.status_label.setToolTip("")
         
         if not conflicts:
             self.status_label.setText("No file conflicts found!")
@@ -230,21 +398,25 @@ class ConflictReportWidget(QWidget):
             return
 
         self.status_label.setText(f"Found {len(conflicts)} conflicting files.")
-        
-        # Populate tree
-        for file_path, mod_names in sorted(conflicts.items()):
-            file_item = QTreeWidgetItem(self.tree)
-            file_item.setText(0, file_path)
-            file_item.setText(1, f"{len(mod_names)} Mods")
-            file_item.setForeground(0, QColor("#ff6b6b")) # Reddish for file
-            
-            for mod_name in mod_names:
-                mod_item = QTreeWidgetItem(file_item)
-                mod_item.setText(0, mod_name)
-                mod_item.setText(1, "Overwrites")
-                mod_item.setForeground(0, QColor("#ddd"))
-
-        self.tree.expandAll()
+        self.conflict_ids = conflicts
+        labels = {}
+        for mod_ids in conflicts.values():
+            for mod_id in mod_ids:
+                if mod_id not in labels:
+                    labels[mod_id] = self.db.registry.label(mod_id)
+        self.model.set_conflicts({path: [labels[mod_id] for mod_id in mod_ids]
+                                  for path, mod_ids in conflicts.items()})
+
+    def on_vanilla_counted(self, version, overrides):
+        if not version:
+            self.status_label.setToolTip("Index the game files with `ck3-mod-cli vanilla` "
+                                         "to also count the vanilla files the mods replace.")
+            return
+        self.status_label.setText(f"{self.status_label.text()} {sum(overrides.values())} vanilla files "
+                                  f"replaced by {len(overrides)} mods (game {version}).")
+        self.status_label.setToolTip("\n".join(
+            f"{self.db.registry.label(mod_id)}: {count}"
+            for mod_id, count in sorted(overrides.items(), key=lambda item: -item[1])))
 
 class EditorListWidget(QListWidget):
     def __init__(self, parent=None):
@@ -271,11 +443,19 @@ class EditorListWidget(QListWidget):
         event.accept()
 
 class PlaysetEditorWidget(QWidget):
-    def __init__(self, db: LauncherDB, parent=None):
+    mods_loaded = Signal(int)
+    order_saved = Signal()
+
+    def __init__(self, db: DBClient, parent=None):
         super().__init__(parent)
         self.db = db
-        self.analyzer = ModAnalyzer()
+        self.analyzer = ModAnalyzer(ManifestStore())
+        # Switching back to an unchanged playset reuses its last analysis, across restarts too
+        self.conflict_memo = ConflictMemo(path=CACHE_DIR / "conflict_memo.sqlite")
         self.worker = None
+        self.loading_playset_id = None
+        # Rows as read from the database, to detect changes made by the launcher meanwhile
+        self.loaded_snapshot = None
         self.init_ui()
 
     def init_ui(self):
@@ -307,7 +487,17 @@ class PlaysetEditorWidget(QWidget):
             super().keyPressEvent(event)
 
     def load_mods(self, playset_id):
-        mods = self.db.get_mods_for_playset(playset_id)
+        self.loading_playset_id = playset_id
+        self.db.submit("get_mods_for_playset", playset_id,
+                       callback=lambda mods: self.on_mods_loaded(playset_id, mods))
+
+    def on_mods_loaded(self, playset_id, mods):
+        # Ignore answers for a playset the user already switched away from
+        if playset_id != self.loading_playset_id:
+            return
+        self.loaded_snapshot = sorted(((m.mod_id, m.enabled, m.position) for m in mods),
+                                      key=lambda row: (row[2], row[0]))
+        self.mod_list_widget.setUpdatesEnabled(False)
         self.mod_list_widget.clear()
         
         for mod in mods:
@@ -322,11 +512,13 @@ class PlaysetEditorWidget(QWidget):
             
             self.mod_list_widget.addItem(item)
             self.mod_list_widget.setItemWidget(item, widget)
+        self.mod_list_widget.setUpdatesEnabled(True)
             
+        self.mods_loaded.emit(len(mods))
         self.trigger_conflict_check()
 
-    def trigger_conflict_check(self):
-        # Gather enabled mods
+    def get_enabled_mods(self):
+        # Gather enabled mods, in load order
         enabled_mods = []
         for i in range(self.mod_list_widget.count()):
             item = self.mod_list_widget.item(i)
@@ -334,41 +526,44 @@ class PlaysetEditorWidget(QWidget):
             if widget and widget.is_checked():
                 mod = item.data(Qt.UserRole)
                 enabled_mods.append(mod)
+        return enabled_mods
+
+    def trigger_conflict_check(self):
+        enabled_mods = self.get_enabled_mods()
         
-        # Stop existing worker if running
-        if self.worker and self.worker.isRunning():
-            self.worker.wait() # Or terminate? Wait is safer but might block briefly.
+        # Stop existing worker if running; a rescan stops between mods
+        self.wait()
         
-        self.worker = ConflictWorker(self.analyzer, enabled_mods)
+        self.worker = ConflictWorker(self.analyzer, enabled_mods, self.conflict_memo)
         self.worker.finished.connect(self.update_conflict_icons)
         self.worker.start()
 
+    def wait(self):
+        """Stops the conflict check and waits for it (used on shutdown)."""
+        if self.worker and self.worker.isRunning():
+            self.worker.requestInterruption()
+            self.worker.wait()
+
     def update_conflict_icons(self, conflicts):
-        # Create map: mod_name -> list of conflicting mod names (derived from file conflicts)
+        # Map: mod id -> ids of the mods it shares files with. Many files share the
+        # same set of mods, so each distinct set is only walked once.
         mod_conflict_map = {}
-        
-        for file_path, mod_names in conflicts.items():
-            for mod_name in mod_names:
-                if mod_name not in mod_conflict_map:
-                    mod_conflict_map[mod_name] = set()
-                # Add other mods as conflicting with this one
-                others = [m for m in mod_names if m != mod_name]
-                mod_conflict_map[mod_name].update(others)
-                
+        for mod_ids in {tuple(mod_ids) for mod_ids in conflicts.values()}:
+            for mod_id in mod_ids:
+                mod_conflict_map.setdefault(mod_id, set()).update(mod_ids)
+
         # Update UI items
         for i in range(self.mod_list_widget.count()):
             item = self.mod_list_widget.item(i)
             widget = self.mod_list_widget.itemWidget(item)
-            mod = item.data(Qt.UserRole)
-            name = mod.get('displayName') or mod.get('name') or "Unknown"
-            
-            if name in mod_conflict_map and widget.is_checked():
-                widget.set_conflict_status(list(mod_conflict_map[name]))
+            mod_id = str(item.data(Qt.UserRole).mod_id)
+            others = mod_conflict_map.get(mod_id, set()) - {mod_id}
+
+            if others and widget.is_checked():
+                widget.set_conflict_status(sorted(self.db.registry.label(other) for other in others))
             else:
                 widget.set_conflict_status([])
 
-
-
     def save_current_order(self, playset_id):
         ordered_mods = []
         for i in range(self.mod_list_widget.count()):
@@ -378,12 +573,31 @@ class PlaysetEditorWidget(QWidget):
             
             if widget:
                 mod_data = {
-                    'mod_id': mod['mod_id'],
+                    'mod_id': mod.mod_id,
                     'enabled': 1 if widget.is_checked() else 0
                 }
                 ordered_mods.append(mod_data)
             
-        self.db.update_playset_mods(playset_id, ordered_mods)
+        self.db.submit("update_playset_mods", playset_id, ordered_mods, self.loaded_snapshot,
+                       callback=lambda _: self.on_order_saved(ordered_mods),
+                       error_callback=self.on_save_failed)
+
+    def on_order_saved(self, ordered_mods):
+        self.loaded_snapshot = [(m['mod_id'], m['enabled'], index) for index, m in enumerate(ordered_mods)]
+        self.order_saved.emit()
+
+    def on_save_failed(self, error):
+        if isinstance(error, ConcurrentModificationError):
+            reply = QMessageBox.question(self, "Playset Changed",
+                                         "This playset was changed by another program (probably the Paradox "
+                                         "launcher) since it was loaded, so nothing was saved.\n\n"
+                                         "Reload the playset now? Unsaved changes here will be lost.",
+                                         QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+            main_window = self.window()
+            if reply == QMessageBox.Yes and isinstance(main_window, MainWindow):
+                main_window.refresh_current_playset()
+        else:
+            QMessageBox.warning(self, "Error", f"Failed to save playset:\n{error}")
 
     def remove_selected_mod(self):
         items = self.mod_list_widget.selectedItems()
@@ -392,7 +606,7 @@ class PlaysetEditorWidget(QWidget):
             
         item = items[0]
         mod = item.data(Qt.UserRole)
-        mod_name = mod.get('displayName') or mod.get('name')
+        mod_name = mod.label
         
         reply = QMessageBox.question(self, 'Remove Mod', 
                                      f"Are you sure you want to remove '{mod_name}' from this playset?",
@@ -402,41 +616,48 @@ class PlaysetEditorWidget(QWidget):
             # Get current playset ID from parent window (a bit hacky but works for now)
             main_window = self.window()
             if isinstance(main_window, MainWindow) and main_window.current_playset_id:
-                if self.db.remove_mod_from_playset(main_window.current_playset_id, mod['mod_id']):
-                    # Refresh list
-                    row = self.mod_list_widget.row(item)
-                    self.mod_list_widget.takeItem(row)
-                    self.trigger_conflict_check() # Re-check conflicts
-                    main_window.refresh_current_playset() # Update status/counts
-                else:
-                    QMessageBox.warning(self, "Error", "Failed to remove mod from database.")
+                self.db.submit("remove_mod_from_playset", main_window.current_playset_id, mod.mod_id,
+                               callback=lambda removed: self.on_mod_removed(item, removed))
+
+    def on_mod_removed(self, item, removed):
+        if removed:
+            # Refresh list
+            row = self.mod_list_widget.row(item)
+            if row >= 0:
+                self.mod_list_widget.takeItem(row)
+            self.trigger_conflict_check() # Re-check conflicts
+            main_window = self.window()
+            if isinstance(main_window, MainWindow):
+                main_window.refresh_current_playset() # Update status/counts
+        else:
+            QMessageBox.warning(self, "Error", "Failed to remove mod from database.")
 
     def handle_library_drop(self, mod_id):
         # Called when item dropped from library
         main_window = self.window()
         if isinstance(main_window, MainWindow) and main_window.current_playset_id:
-             if self.db.add_mod_to_playset(main_window.current_playset_id, mod_id):
-                # We need to refresh the list fully to get correct order and widget
-                main_window.refresh_current_playset()
-             else:
-                # Likely already exists
-                pass
+            self.db.submit("add_mod_to_playset", main_window.current_playset_id, mod_id,
+                           callback=self.on_library_mod_added)
+
+    def on_library_mod_added(self, added):
+        # False most likely means the mod is already in the playset
+        main_window = self.window()
+        if added and isinstance(main_window, MainWindow):
+            # We need to refresh the list fully to get correct order and widget
+            main_window.refresh_current_playset()
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, db_path=None):
         super().__init__()
         self.setWindowTitle("CK3 Mod Manager (DB Mode)")
         self.resize(1000, 750)
         
-        self.db = LauncherDB()
+        # All database access runs on the DB worker thread
+        self.db = DBClient(db_path)
         self.current_playset_id = None
         self.playsets = []
         
-        try:
-            self.db.connect()
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"Failed to connect to launcher database:\n{e}")
-            sys.exit(1)
+        self.db.submit("connect", error_callback=self.on_db_error)
 
         self.apply_theme()
         self.init_ui()
@@ -475,6 +696,10 @@ class MainWindow(QMainWindow):
             QPushButton:hover { background-color: #0b5ed7; }
             QPushButton:pressed { background-color: #0a58ca; }
             QLabel { color: #ddd; }
+            QLabel#modDragHandle { color: #666; font-size: 16px; font-weight: bold; }
+            QLabel#modName { font-weight: bold; font-size: 13px; }
+            QLabel#modVersion { color: #aaa; font-size: 11px; }
+            QLabel#modConflictIcon { color: #ffc107; font-size: 16px; margin-right: 5px; }
             QComboBox { background-color: #333; color: white; padding: 5px; border: 1px solid #555; border-radius: 4px; }
             QLineEdit { background-color: #333; color: white; padding: 5px; border: 1px solid #555; border-radius: 4px; }
             QTabWidget::pane { border: 1px solid #444; top: -1px; } 
@@ -532,7 +757,13 @@ class MainWindow(QMainWindow):
         editor_layout.addWidget(editor_header)
         
         self.editor_tab = PlaysetEditorWidget(self.db)
+        self.editor_tab.mods_loaded.connect(self.on_playset_mods_loaded)
+        self.editor_tab.order_saved.connect(self.on_order_saved)
         editor_layout.addWidget(self.editor_tab)
+        # Shares the editor's analyzer so launch checks reuse its scanned manifests
+        self.health_checker = HealthChecker(self.editor_tab.analyzer)
+        self.dlc_sync = DlcLoadSync()
+        self.health_worker = None
         content_splitter.addWidget(editor_container)
         
         # Right Panel: Library
@@ -541,13 +772,17 @@ class MainWindow(QMainWindow):
         library_layout.setContentsMargins(2, 0, 0, 0) # Minimal left margin
         library_layout.setSpacing(0)
         
-        library_header = QLabel("Mod Library (Drag to Add)")
-        library_header.setStyleSheet("font-size: 14px; font-weight: bold; margin: 0; padding: 2px 0;")
-        library_layout.addWidget(library_header)
-        
+        library_tabs = QTabWidget()
         self.library_tab = ModLibraryWidget(self.db)
         self.library_tab.mod_added.connect(self.refresh_current_playset)
-        library_layout.addWidget(self.library_tab)
+        library_tabs.addTab(self.library_tab, "Mod Library (Drag to Add)")
+        # Nothing is indexed until the tab is first opened
+        self.search_tab = ContentSearchWidget(self.db)
+        library_tabs.addTab(self.search_tab, "Search Files")
+        # File-level conflicts of the current playset, with a diff of the selected file
+        self.conflict_tab = ConflictReportWidget(self.db)
+        library_tabs.addTab(self.conflict_tab, "Conflicts")
+        library_layout.addWidget(library_tabs)
         content_splitter.addWidget(library_container)
         
         content_splitter.setStretchFactor(0, 6)
@@ -558,8 +793,16 @@ class MainWindow(QMainWindow):
         self.status_label.setStyleSheet("color: #888; font-size: 11px;")
         self.statusBar().addWidget(self.status_label)
 
+    def on_db_error(self, error):
+        QMessageBox.critical(self, "Database Error", f"Failed to connect to launcher database:\n{error}")
+        self.close()
+        QApplication.instance().exit(1)
+
     def load_playsets(self):
-        self.playsets = self.db.get_playsets()
+        self.db.submit("get_playsets", callback=self.on_playsets_loaded)
+
+    def on_playsets_loaded(self, playsets):
+        self.playsets = playsets
         self.playset_combo.blockSignals(True)
         self.playset_combo.clear()
         
@@ -587,24 +830,104 @@ class MainWindow(QMainWindow):
 
     def refresh_current_playset(self):
         if self.current_playset_id:
+            self.conflict_tab.set_current_playset(self.current_playset_id)
             self.editor_tab.load_mods(self.current_playset_id)
-            mod_count = self.editor_tab.mod_list_widget.count()
-            self.status_label.setText(f"Loaded {mod_count} mods for playset.")
+
+    def on_playset_mods_loaded(self, mod_count):
+        self.status_label.setText(f"Loaded {mod_count} mods for playset.")
 
     def set_active_playset(self):
         if not self.current_playset_id: 
             return
-        self.db.set_active_playset(self.current_playset_id)
+        self.db.submit("set_active_playset", self.current_playset_id, callback=self.on_active_playset_set)
+
+    def on_active_playset_set(self, _):
         self.load_playsets()
         self.status_label.setText("Active playset updated.")
+        self.sync_load_order()
 
     def save_mods(self):
         if not self.current_playset_id:
             return
+        self.status_label.setText("Saving...")
         self.editor_tab.save_current_order(self.current_playset_id)
+
+    def on_order_saved(self):
         self.status_label.setText("Playset order and state saved to database.")
+        # Queued after the save, so it reads the rows just written
+        self.sync_load_order()
+
+    def closeEvent(self, event):
+        # Let queued saves finish, then close the connection
+        self.search_tab.wait()
+        self.conflict_tab.wait()
+        self.editor_tab.wait()
+        self.db.stop()
+        super().closeEvent(event)
 
     def launch_game(self):
+        if self.health_worker and self.health_worker.isRunning():
+            return
+        # Validate the enabled mods first: a missing or broken mod is much
+        # cheaper to catch here than after a multi-minute game load
+        self.status_label.setText("Checking mods before launch...")
+        self.health_worker = HealthWorker(self.health_checker, self.editor_tab.get_enabled_mods())
+        self.health_worker.finished.connect(self.on_health_checked)
+        self.health_worker.start()
+
+    def on_health_checked(self, issues):
+        if issues:
+            has_errors = any(issue.severity == ERROR for issue in issues)
+            lines = []
+            for issue in issues[:15]:
+                name = issue.mod.label
+                icon = "❌" if issue.severity == ERROR else "⚠️"
+                lines.append(f"{icon} {name}: {issue.message}")
+            if len(issues) > 15:
+                lines.append(f"... and {len(issues) - 15} more")
+
+            reply = QMessageBox.question(self, "Pre-launch Check",
+                                         f"Found {len(issues)} problem(s) with enabled mods:\n\n"
+                                         + "\n".join(lines) + "\n\nLaunch anyway?",
+                                         QMessageBox.Yes | QMessageBox.No,
+                                         QMessageBox.No if has_errors else QMessageBox.Yes)
+            if reply != QMessageBox.Yes:
+                self.status_label.setText("Launch cancelled.")
+                return
+
+        self.start_game()
+
+    def sync_load_order(self, launch=False):
+        """
+        Writes the active playset, as saved in the database, to dlc_load.json:
+        the game loads that file, not the launcher database. Runs on the DB
+        thread; with `launch` the game is started once it is done.
+        """
+        self.db.run(self.dlc_sync.sync,
+                    callback=lambda result: self.on_load_order_synced(result, launch),
+                    error_callback=lambda error: self.on_load_order_sync_failed(error, launch))
+
+    def on_load_order_synced(self, result, launch):
+        if result.unresolved:
+            names = [m.label for m in result.unresolved]
+            if launch:
+                QMessageBox.warning(self, "Load Order",
+                                    "No descriptor found for these mods; the game will not load them:\n\n"
+                                    + "\n".join(names[:15]))
+            else:
+                self.status_label.setText(f"No descriptor found for {len(names)} mods; the game will not load them.")
+        if launch:
+            self.run_steam()
+
+    def on_load_order_sync_failed(self, error, launch):
+        QMessageBox.warning(self, "Load Order", f"Could not update dlc_load.json:\n{error}")
+        if launch:
+            self.run_steam()
+
+    def start_game(self):
+        self.sync_load_order(launch=True)
+
+    def run_steam(self):
         try:
             # Steam protocol URL for CK3 (App ID 1158310)
             cmd = ["open", "steam://run/1158310"]
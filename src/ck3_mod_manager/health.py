@@ -0,0 +1,132 @@
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.loader.mod_loader import parse_descriptor
+from ck3_mod_manager.manifest import shallow_stat_token
+from ck3_mod_manager.utils.zip_reader import ZipEntry, read_zip_entries, read_zip_member
+
+ERROR = "error"
+WARNING = "warning"
+
+
+class HealthIssue(NamedTuple):
+    mod: Dict
+    severity: str
+    message: str
+
+
+class HealthChecker:
+    """
+    Validates the enabled mods of a playset before the game is launched.
+
+    Each mod costs three stat() calls (see manifest.shallow_stat_token); those
+    run in parallel. The full checks (zip central directory, descriptor,
+    optional CRCs) only run for mods whose stat results, or whose snapshot
+    version in the analyzer's ManifestStore, changed since the last check, so
+    keeping one checker around makes repeated checks of a large playset nearly
+    free. Edits deep inside a folder mod are picked up once a rescan has
+    recorded them; the checks here do not depend on them otherwise.
+    """
+
+    def __init__(self, analyzer: Optional[ModAnalyzer] = None, max_workers: int = 16):
+        self.analyzer = analyzer or ModAnalyzer()
+        self.max_workers = max_workers
+        # mod_id -> ((stat tokens, snapshot version), crc verified, issues)
+        self._results: Dict[str, Tuple[tuple, bool, List[HealthIssue]]] = {}
+
+    def check(self, mods: List[Dict], verify_crc: bool = False) -> List[HealthIssue]:
+        """Checks every enabled mod and returns the problems found, in load order."""
+        enabled = [m for m in mods if m.get('enabled', True)]
+        # One query for the whole playset
+        versions = self.analyzer.store.latest_versions() if self.analyzer.store is not None else {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = pool.map(lambda mod: self._check_mod(mod, verify_crc, versions), enabled)
+            return [issue for issues in results for issue in issues]
+
+    def _check_mod(self, mod: Dict, verify_crc: bool, versions: Dict[str, int]) -> List[HealthIssue]:
+        mod_id = str(mod.get('mod_id'))
+        tokens = shallow_stat_token(mod)
+        key = (tokens, versions.get(mod_id))
+
+        cached = self._results.get(mod_id)
+        if cached and cached[0] == key and (cached[1] or not verify_crc):
+            return cached[2]
+        if cached and cached[0] != key:
+            # Something on disk changed: the cached manifest is stale too
+            self.analyzer.invalidate(mod_id)
+
+        issues = self._full_check(mod, tokens, verify_crc)
+        self._results[mod_id] = (key, verify_crc, issues)
+        return issues
+
+    def _full_check(self, mod: Dict, tokens: tuple, verify_crc: bool) -> List[HealthIssue]:
+        issues = []
+        dir_path = mod.get('dirPath')
+        archive_path = mod.get('archivePath')
+
+        if not dir_path and not archive_path:
+            return [HealthIssue(mod, ERROR, "Mod has neither a directory nor an archive path")]
+        if dir_path and (tokens[0] is None or not os.path.isdir(dir_path)):
+            issues.append(HealthIssue(mod, ERROR, f"Mod directory is missing: {dir_path}"))
+        entries: List[ZipEntry] = []
+        if archive_path:
+            if tokens[2] is None:
+                issues.append(HealthIssue(mod, ERROR, f"Mod archive is missing: {archive_path}"))
+            else:
+                archive_issues, entries = self._check_archive(mod, archive_path, verify_crc)
+                issues.extend(archive_issues)
+        if any(i.severity == ERROR for i in issues):
+            return issues
+
+        if not self.analyzer.get_mod_manifest(mod):
+            issues.append(HealthIssue(mod, WARNING, "Mod contains no files"))
+        issues.extend(self._check_descriptor(mod, entries))
+        return issues
+
+    def _check_archive(self, mod: Dict, archive_path: str,
+                       verify_crc: bool) -> Tuple[List[HealthIssue], List[ZipEntry]]:
+        try:
+            # Parsing the central directory catches truncated and damaged archives
+            entries = read_zip_entries(archive_path)
+            if verify_crc:
+                with zipfile.ZipFile(archive_path) as zf:
+                    bad = zf.testzip()
+                if bad:
+                    return [HealthIssue(mod, ERROR, f"CRC mismatch in archive member {bad}")], entries
+        except (zipfile.BadZipFile, OSError, EOFError) as e:
+            return [HealthIssue(mod, ERROR, f"Archive is damaged: {e}")], []
+        return [], entries
+
+    def _read_descriptor(self, mod: Dict, entries: List[ZipEntry]) -> bytes:
+        # Loose files win over the archive, as in ModReader
+        dir_path = mod.get('dirPath')
+        if dir_path and os.path.isfile(os.path.join(dir_path, 'descriptor.mod')):
+            with open(os.path.join(dir_path, 'descriptor.mod'), 'rb') as f:
+                return f.read()
+        for entry in entries:
+            if entry.name.replace('\\', '/') == 'descriptor.mod':
+                return read_zip_member(mod['archivePath'], entry)
+        raise FileNotFoundError('descriptor.mod')
+
+    def _check_descriptor(self, mod: Dict, entries: List[ZipEntry]) -> List[HealthIssue]:
+        try:
+            descriptor = parse_descriptor(self._read_descriptor(mod, entries).decode('utf-8', errors='replace'))
+        except FileNotFoundError:
+            return [HealthIssue(mod, WARNING, "descriptor.mod is missing")]
+        except (zipfile.BadZipFile, OSError) as e:
+            return [HealthIssue(mod, ERROR, f"Could not read descriptor.mod: {e}")]
+
+        issues = []
+        db_name = mod.get('name')
+        if db_name and descriptor.get('name') and descriptor['name'] != db_name:
+            issues.append(HealthIssue(
+                mod, WARNING, f"Descriptor name '{descriptor['name']}' does not match launcher name '{db_name}'"))
+        db_version = mod.get('version')
+        if db_version and descriptor.get('mod_version') and descriptor['mod_version'] != db_version:
+            issues.append(HealthIssue(
+                mod, WARNING,
+                f"Descriptor version {descriptor['mod_version']} does not match launcher version {db_version}"))
+        return issues
@@ -0,0 +1,184 @@
+"""
+Keeps dlc_load.json (what the game actually loads) in step with the
+playsets_mods rows of the launcher database.
+"""
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ck3_mod_manager.loader.mod_loader import parse_descriptor
+
+DOCUMENTS_PATH = Path(os.path.expanduser("~/Documents/Paradox Interactive/Crusader Kings III"))
+
+
+class SyncResult(NamedTuple):
+    enabled_mods: List[str]     # descriptor paths as written to dlc_load.json
+    added: List[str]
+    removed: List[str]
+    reordered: bool
+    written: bool
+    unresolved: List[Dict]      # enabled mods without a descriptor in Documents/mod
+
+
+def _norm(path: str) -> str:
+    return os.path.normcase(os.path.normpath(path))
+
+
+class DescriptorIndex:
+    """
+    Maps launcher mods to the `mod/*.mod` descriptors the game refers to.
+
+    Descriptors are keyed by the content path they point at (`path=` or
+    `archive=`) and by Steam workshop id. Only descriptors whose stat changed
+    since the last refresh are parsed again.
+    """
+
+    def __init__(self, documents_path: Path):
+        self.documents_path = Path(documents_path)
+        self.mod_path = self.documents_path / "mod"
+        # file name -> (stat token, keys)
+        self._entries: Dict[str, Tuple[Tuple[int, int], List[str]]] = {}
+        self._keys: Dict[str, str] = {}
+
+    def refresh(self):
+        try:
+            scanned = [e for e in os.scandir(self.mod_path) if e.name.endswith(".mod") and e.is_file()]
+        except FileNotFoundError:
+            scanned = []
+
+        changed = False
+        entries = {}
+        for entry in scanned:
+            st = entry.stat()
+            token = (st.st_size, st.st_mtime_ns)
+            cached = self._entries.get(entry.name)
+            if cached and cached[0] == token:
+                entries[entry.name] = cached
+                continue
+            entries[entry.name] = (token, self._descriptor_keys(entry.path))
+            changed = True
+        if changed or entries.keys() != self._entries.keys():
+            self._entries = entries
+            # Sorted, so that with several descriptors for one mod the pick is stable
+            self._keys = {}
+            for name in sorted(entries):
+                for key in entries[name][1]:
+                    self._keys.setdefault(key, f"mod/{name}")
+
+    def _descriptor_keys(self, path: str) -> List[str]:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                descriptor = parse_descriptor(f.read())
+        except OSError:
+            return []
+        keys = []
+        for field in ('path', 'archive'):
+            if descriptor.get(field):
+                # Relative paths (local mods: path="mod/my_mod") are relative to the documents folder
+                keys.append("path:" + _norm(str(self.documents_path / descriptor[field])))
+        if descriptor.get('remote_file_id'):
+            keys.append("steam:" + descriptor['remote_file_id'])
+        return keys
+
+    def lookup(self, mod: Dict) -> Optional[str]:
+        """Descriptor path (e.g. "mod/ugc_123.mod") for a launcher mod row, or None."""
+        keys = []
+        if mod.get('steamId'):
+            keys.append(f"steam:{mod['steamId']}")
+        for field in ('dirPath', 'archivePath'):
+            if mod.get(field):
+                keys.append("path:" + _norm(mod[field]))
+        dir_path = mod.get('dirPath') or ''
+        # Workshop content lives in .../workshop/content/1158310/<steam id>
+        workshop_id = os.path.basename(os.path.normpath(dir_path)) if dir_path else ''
+        if re.fullmatch(r"\d+", workshop_id):
+            keys.append("steam:" + workshop_id)
+
+        for key in keys:
+            if key in self._keys:
+                return self._keys[key]
+        return None
+
+
+class DlcLoadSync:
+    """
+    Writes the enabled mods of a playset, in load order, to dlc_load.json.
+
+    The file is only rewritten when the mod list actually differs, through a
+    temp file and rename, and every other key (disabled_dlcs, ...) is kept.
+    """
+
+    def __init__(self, documents_path: Optional[Path] = None):
+        self.documents_path = Path(documents_path) if documents_path else DOCUMENTS_PATH
+        self.dlc_load_path = self.documents_path / "dlc_load.json"
+        self.index = DescriptorIndex(self.documents_path)
+
+    def resolve(self, mods: List[Dict]) -> Tuple[List[str], List[Dict]]:
+        """Descriptor paths of the enabled mods in order, and the enabled mods without one."""
+        self.index.refresh()
+        enabled, unresolved = [], []
+        seen = set()
+        for mod in mods:
+            if not mod.get('enabled', True):
+                continue
+            descriptor = self.index.lookup(mod)
+            if descriptor is None:
+                unresolved.append(mod)
+            elif descriptor not in seen:
+                seen.add(descriptor)
+                enabled.append(descriptor)
+        return enabled, unresolved
+
+    def read(self) -> Dict:
+        try:
+            with open(self.dlc_load_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def sync_mods(self, mods: List[Dict], dry_run: bool = False) -> SyncResult:
+        """Brings dlc_load.json in line with `mods` (a playset's rows, in load order)."""
+        enabled, unresolved = self.resolve(mods)
+        return self.update(enabled, dry_run=dry_run)._replace(unresolved=unresolved)
+
+    def update(self, enabled: List[str], dry_run: bool = False) -> SyncResult:
+        """Sets the enabled_mods list of dlc_load.json to `enabled` descriptor paths."""
+        data = self.read()
+        current = data.get('enabled_mods')
+        current = current if isinstance(current, list) else []
+
+        new_set, current_set = set(enabled), set(current)
+        added = [m for m in enabled if m not in current_set]
+        removed = [m for m in current if m not in new_set]
+        reordered = not added and not removed and enabled != current
+        changed = enabled != current or 'disabled_dlcs' not in data
+
+        if changed and not dry_run:
+            data['enabled_mods'] = enabled
+            data.setdefault('disabled_dlcs', [])
+            self._write(data)
+        return SyncResult(enabled, added, removed, reordered, changed and not dry_run, [])
+
+    def sync(self, db, playset_id: Optional[str] = None, dry_run: bool = False) -> SyncResult:
+        """Syncs from a connected LauncherDB; defaults to the active playset."""
+        if not playset_id:
+            playset = db.get_active_playset()
+            if not playset:
+                raise ValueError("No active playset found.")
+            playset_id = playset['id']
+        return self.sync_mods(db.get_mods_for_playset(playset_id), dry_run=dry_run)
+
+    def _write(self, data: Dict):
+        tmp_path = self.dlc_load_path.with_name(self.dlc_load_path.name + ".tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.dlc_load_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
@@ -3,6 +3,49 @@ import re
 from pathlib import Path
 from typing import List, Dict, Optional
 
+def parse_descriptor(content: str, default_name: str = "") -> Dict:
+    """Parses the text of a Paradox .mod descriptor (key=value format)."""
+    data = {}
+    # Basic parsing using regex or simple line split
+    # Format is usually: name="Mod Name" path="mod/..." or supported_version="1.12.*"
+
+    name_match = re.search(r'name\s*=\s*"(.*?)"', content)
+    if name_match:
+        data['name'] = name_match.group(1)
+    else:
+        data['name'] = default_name
+
+    # Not replace_path="..."
+    path_match = re.search(r'(?<!\w)path\s*=\s*"(.*?)"', content)
+    if path_match:
+        raw_path = path_match.group(1)
+        # handle relative path
+        if not os.path.isabs(raw_path):
+             # Usually relative to user documents/Paradox Interactive/Crusader Kings III
+             # But local mods often have path="mod/my_mod"
+             pass
+        data['path'] = raw_path
+
+    archive_match = re.search(r'(?<!\w)archive\s*=\s*"(.*?)"', content)
+    if archive_match:
+        data['archive'] = archive_match.group(1)
+
+    version_match = re.search(r'supported_version\s*=\s*"(.*?)"', content)
+    if version_match:
+        data['version'] = version_match.group(1)
+
+    # The mod's own version (as opposed to the game version it supports)
+    mod_version_match = re.search(r'^\s*version\s*=\s*"(.*?)"', content, re.MULTILINE)
+    if mod_version_match:
+        data['mod_version'] = mod_version_match.group(1)
+
+    remote_id_match = re.search(r'remote_file_id\s*=\s*"(.*?)"', content)
+    if remote_id_match:
+        data['remote_file_id'] = remote_id_match.group(1)
+
+    return data
+
+
 class ModLoader:
     def __init__(self):
         self.documents_path = Path(os.path.expanduser("~/Documents/Paradox Interactive/Crusader Kings III"))
@@ -33,39 +76,10 @@ class ModLoader:
 
     def _parse_mod_file(self, file_path: Path) -> Optional[Dict]:
         """Parses a Paradox .mod file (key=value format)."""
-        data = {}
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-                
-            # Basic parsing using regex or simple line split
-            # Format is usually: name="Mod Name" path="mod/..." or supported_version="1.12.*"
-            
-            name_match = re.search(r'name\s*=\s*"(.*?)"', content)
-            if name_match:
-                data['name'] = name_match.group(1)
-            else:
-                data['name'] = file_path.stem
-
-            path_match = re.search(r'path\s*=\s*"(.*?)"', content)
-            if path_match:
-                raw_path = path_match.group(1)
-                # handle relative path
-                if not os.path.isabs(raw_path):
-                     # Usually relative to user documents/Paradox Interactive/Crusader Kings III
-                     # But local mods often have path="mod/my_mod"
-                     pass
-                data['path'] = raw_path
-            
-            version_match = re.search(r'supported_version\s*=\s*"(.*?)"', content)
-            if version_match:
-                data['version'] = version_match.group(1)
-            
-            remote_id_match = re.search(r'remote_file_id\s*=\s*"(.*?)"', content)
-            if remote_id_match:
-                data['remote_file_id'] = remote_id_match.group(1)
-
-            return data
+            return parse_descriptor(content, default_name=file_path.stem)
 
         except Exception as e:
             print(f"Error parsing {file_path}: {e}")
@@ -73,28 +87,25 @@ class ModLoader:
 
     def save_load_order(self, mod_list: List[Dict]):
         """
-        Saves the load order. 
-        In CK3, load order is managed by 'dlc_load.json' or 'launcher-v2.sqlite'.
-        Editing dlc_load.json is the simplest way to force a load order (used by barebones launcher mode)
-        or we might need to update the sqlite db if we want to sync with the official launcher.
-        
-        For this simplified version, let's try to update 'dlc_load.json' if it exists, 
-        or just print the order for now as a first step.
+        Saves the load order to 'dlc_load.json', which is what the game reads
+        (format: {"disabled_dlcs":[],"enabled_mods":["mod/ugc_12345.mod", "mod/local_mod.mod"]}).
+        The file is only rewritten if the order changed; other keys are kept.
         """
-        dlc_load_path = self.documents_path / "dlc_load.json"
-        
-        # Format for dlc_load.json:
-        # {"disabled_dlcs":[],"enabled_mods":["mod/ugc_12345.mod", "mod/local_mod.mod"]}
-        
-        enabled_mods = [mod['descriptor_path'] for mod in mod_list if mod.get('enabled', False)]
-        
-        import json
-        data = {"disabled_dlcs": [], "enabled_mods": enabled_mods}
-        
+        from ck3_mod_manager.loader.dlc_sync import DlcLoadSync
+
+        enabled_mods = []
+        for mod in mod_list:
+            if mod.get('enabled', False):
+                descriptor_path = Path(mod['descriptor_path'])
+                try:
+                    descriptor_path = descriptor_path.relative_to(self.documents_path)
+                except ValueError:
+                    pass
+                enabled_mods.append(descriptor_path.as_posix())
+
         try:
-            with open(dlc_load_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
-            print(f"Saved load order to {dlc_load_path}")
+            result = DlcLoadSync(self.documents_path).update(enabled_mods)
+            if result.written:
+                print(f"Saved load order to {self.documents_path / 'dlc_load.json'}")
         except Exception as e:
             print(f"Failed to save load order: {e}")
-
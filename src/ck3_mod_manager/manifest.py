@@ -0,0 +1,184 @@
+import hashlib
+import os
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Dict, NamedTuple, Optional, Tuple
+
+from ck3_mod_manager.utils.zip_reader import read_zip_entries
+
+
+class ManifestEntry(NamedTuple):
+    size: int
+    crc: Optional[int]  # CRC-32 from the zip central directory; None for loose files
+    mtime_ns: int       # 0 for zip members
+
+    @property
+    def signature(self) -> tuple:
+        """Cheap change token: CRC for zip members, mtime for loose files."""
+        return (self.size, self.crc if self.crc is not None else self.mtime_ns)
+
+
+def stat_token(path: Optional[str]) -> Optional[Tuple[int, int]]:
+    """(size, mtime) of a path, or None if it is missing."""
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def tree_stat_token(root: Optional[str]) -> Optional[str]:
+    """
+    Digest of the path, size and mtime of every file below `root` (one stat
+    walk, symlinks not followed), or None if it is not a directory. Editing,
+    adding or removing a file anywhere in the tree changes it.
+    """
+    if not root or not os.path.isdir(root):
+        return None
+    entries = []
+    stack = [(root, "")]
+    while stack:
+        path, prefix = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, f"{prefix}{entry.name}/"))
+                    else:
+                        st = entry.stat(follow_symlinks=False)
+                        entries.append(f"{prefix}{entry.name}\0{st.st_size}\0{st.st_mtime_ns}")
+        except OSError:
+            entries.append(f"{prefix}\0unreadable")
+    digest = hashlib.blake2b(digest_size=16)
+    for line in sorted(entries):
+        digest.update(line.encode('utf-8', 'surrogateescape'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def mod_stat_token(mod: Dict) -> tuple:
+    """
+    Change token of a mod on disk: a stat walk of its directory (see
+    tree_stat_token), plus stat of its descriptor and archive. No file
+    contents are read.
+    """
+    dir_path = mod.get('dirPath')
+    return (
+        tree_stat_token(dir_path),
+        stat_token(os.path.join(dir_path, 'descriptor.mod')) if dir_path else None,
+        stat_token(mod.get('archivePath')),
+    )
+
+
+def shallow_stat_token(mod: Dict) -> tuple:
+    """
+    Three stat() calls: the mod directory itself, its descriptor and its
+    archive. Enough to notice a mod that vanished, was replaced or updated
+    through its descriptor; edits deep inside a folder mod need
+    mod_stat_token (or a ManifestStore snapshot version) instead.
+    """
+    dir_path = mod.get('dirPath')
+    return (
+        stat_token(dir_path),
+        stat_token(os.path.join(dir_path, 'descriptor.mod')) if dir_path else None,
+        stat_token(mod.get('archivePath')),
+    )
+
+
+def _is_mod_file(name: str) -> bool:
+    # Directories, descriptors and hidden files (.DS_Store, .git/...) are not part of a mod's content
+    if name.endswith('/') or name.endswith('.mod'):
+        return False
+    return not any(part.startswith('.') for part in name.split('/'))
+
+
+def scan_mod(mod: Dict) -> Dict[str, ManifestEntry]:
+    """
+    Builds the file manifest of a mod: relative path -> size/CRC/mtime.
+    Archive mods are listed from their central directory, directory mods with
+    a single stat per file. When a mod has both, loose files win.
+    """
+    manifest: Dict[str, ManifestEntry] = {}
+
+    archive_path = mod.get('archivePath')
+    if archive_path and Path(archive_path).exists():
+        try:
+            for entry in read_zip_entries(archive_path):
+                name = entry.name.replace('\\', '/')
+                if _is_mod_file(name):
+                    manifest[name] = ManifestEntry(entry.size, entry.crc, 0)
+        except Exception as e:
+            print(f"Error reading zip {archive_path}: {e}")
+
+    dir_path = mod.get('dirPath')
+    if dir_path and Path(dir_path).is_dir():
+        try:
+            _scan_directory(dir_path, "", manifest)
+        except Exception as e:
+            print(f"Error reading directory {dir_path}: {e}")
+
+    return manifest
+
+
+def scan_directory(root: str) -> Dict[str, ManifestEntry]:
+    """Manifest of every file below `root`, by the same rules as a directory mod. Raises OSError."""
+    manifest: Dict[str, ManifestEntry] = {}
+    _scan_directory(root, "", manifest)
+    return manifest
+
+
+def _scan_directory(root: str, prefix: str, manifest: Dict[str, ManifestEntry]):
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.name.startswith('.'):
+                continue
+            # Symlinked directories are not followed (a link cycle would never end); linked files are read
+            if entry.is_dir(follow_symlinks=False):
+                _scan_directory(entry.path, f"{prefix}{entry.name}/", manifest)
+            elif entry.is_file() and _is_mod_file(entry.name):
+                st = entry.stat()
+                manifest[prefix + entry.name] = ManifestEntry(st.st_size, None, st.st_mtime_ns)
+
+
+class ModReader:
+    """
+    Opens individual files of a mod for streaming, whether they live in the
+    mod directory or inside its archive. The archive is opened once and kept
+    open until close(), so reading many files from one mod stays cheap.
+    """
+
+    def __init__(self, mod: Dict):
+        self.dir_path = Path(mod['dirPath']) if mod.get('dirPath') else None
+        self.archive_path = Path(mod['archivePath']) if mod.get('archivePath') else None
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._zip_names: Optional[Dict[str, str]] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._zip:
+            self._zip.close()
+            self._zip = None
+
+    def open(self, rel_path: str) -> BinaryIO:
+        """Returns a binary stream for `rel_path`. Raises FileNotFoundError if the mod has no such file."""
+        if self.dir_path:
+            candidate = self.dir_path / rel_path
+            if candidate.is_file():
+                return open(candidate, 'rb')
+
+        if self.archive_path and self.archive_path.exists():
+            if self._zip is None:
+                self._zip = zipfile.ZipFile(self.archive_path, 'r')
+                self._zip_names = {name.replace('\\', '/'): name for name in self._zip.namelist()}
+            name = self._zip_names.get(rel_path)
+            if name is not None:
+                return self._zip.open(name, 'r')
+
+        raise FileNotFoundError(rel_path)
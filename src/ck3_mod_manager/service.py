@@ -0,0 +1,404 @@
+"""
+Optional long-running service that keeps the launcher database connection,
+the analyzer's manifest caches and conflict results warm between runs.
+
+Clients talk to it over a Unix socket using newline-delimited JSON-RPC 2.0:
+    {"jsonrpc": "2.0", "id": 1, "method": "analyze", "params": {"playset_id": "..."}}
+"""
+import fcntl
+import inspect
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.database.launcher_db import LauncherDB
+from ck3_mod_manager.database.mod_record import mod_label
+from ck3_mod_manager.health import HealthChecker
+from ck3_mod_manager.snapshots import ManifestStore
+from ck3_mod_manager.utils.config import GAME_PATH, SERVICE_SOCKET_PATH
+from ck3_mod_manager.vanilla import VanillaIndex
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+# How many analysis results the conflict index keeps
+MAX_CACHED_ANALYSES = 32
+
+
+class ServiceError(Exception):
+    def __init__(self, message: str, code: int = SERVER_ERROR):
+        super().__init__(message)
+        self.code = code
+
+
+class ServiceUnavailable(ServiceError):
+    """No service is listening on the socket."""
+
+
+class ServiceAlreadyRunning(ServiceError):
+    """Another live service holds the lock for this socket."""
+
+
+class ModService:
+    """The warm state and the operations exposed over RPC."""
+
+    METHODS = ("ping", "list_playsets", "list_mods", "analyze", "query_path", "check", "rescan", "invalidate")
+
+    def __init__(self, db: LauncherDB, analyzer: Optional[ModAnalyzer] = None,
+                 vanilla: Optional[VanillaIndex] = None, game_path: Path = GAME_PATH):
+        self.db = db
+        self.analyzer = analyzer or ModAnalyzer(ManifestStore())
+        self.health_checker = HealthChecker(self.analyzer)
+        # Baseline of the game files, built by the CLI's `vanilla` command; only read here
+        self.vanilla = vanilla or VanillaIndex()
+        self.game_path = game_path
+        self.started = time.time()
+        # Conflict index: (mod id, snapshot version) pairs in load order -> analyzer result (by id)
+        self._conflicts: "OrderedDict[tuple, Dict[str, List[str]]]" = OrderedDict()
+        # mod_id -> snapshot version the analyzer's cached manifest of that mod matches
+        self._versions: Dict[str, Optional[int]] = {}
+        # Library-wide path -> mod ids index, built on first query
+        self._path_index: Optional[Dict[str, List[str]]] = None
+        # One request at a time: sqlite connection and caches are shared
+        self._lock = threading.Lock()
+
+    def dispatch(self, method: str, params: Dict):
+        if method not in self.METHODS:
+            raise ServiceError(f"Method not found: {method}", METHOD_NOT_FOUND)
+        func = getattr(self, method)
+        try:
+            inspect.signature(func).bind(**params)
+        except TypeError as e:
+            raise ServiceError(str(e), INVALID_PARAMS)
+        with self._lock:
+            return func(**params)
+
+    # -- Operations -------------------------------------------------------
+
+    def ping(self):
+        return {"pid": os.getpid(), "uptime": time.time() - self.started,
+                "cached_analyses": len(self._conflicts)}
+
+    def list_playsets(self):
+        return self.db.get_playsets()
+
+    def list_mods(self, playset_id: Optional[str] = None):
+        mods = self.db.get_mods_for_playset(playset_id) if playset_id else self.db.get_all_mods()
+        return [mod.to_dict() for mod in mods]
+
+    def _enabled_mods(self, playset_id: Optional[str], mod_ids: Optional[List[str]]) -> List[Dict]:
+        if mod_ids is not None:
+            library = {str(m['mod_id']): m for m in self.db.get_all_mods()}
+            missing = [mod_id for mod_id in mod_ids if str(mod_id) not in library]
+            if missing:
+                raise ServiceError(f"Unknown mod ids: {missing}", INVALID_PARAMS)
+            return [library[str(mod_id)] for mod_id in mod_ids]
+
+        if not playset_id:
+            playset = self.db.get_active_playset()
+            if not playset:
+                raise ServiceError("No active playset found.")
+            playset_id = playset['id']
+        return [m for m in self.db.get_mods_for_playset(playset_id) if m.get('enabled')]
+
+    def _current_key(self, mods: List[Dict]) -> tuple:
+        """
+        The conflict index key of `mods`: (mod id, snapshot version) pairs.
+        Mods are rescanned first (one stat walk each when unchanged), so a
+        key never stands for an older state of the files. Manifests cached
+        for an older version, e.g. one another process snapshotted, are dropped.
+        """
+        if self.analyzer.store is None:
+            return tuple((str(m['mod_id']), None) for m in mods)
+        self._apply_reports(self.analyzer.rescan(mods))
+        versions = self.analyzer.store.latest_versions()
+        key = []
+        for mod in mods:
+            mod_id = str(mod['mod_id'])
+            version = versions.get(mod_id)
+            if self._versions.get(mod_id) != version:
+                self.analyzer.invalidate(mod_id)
+                self._versions[mod_id] = version
+            key.append((mod_id, version))
+        return tuple(key)
+
+    def _apply_reports(self, reports) -> int:
+        """Moves cached analyses forward to the new versions in `reports`, re-evaluating only changed paths."""
+        changed = {r.mod_id: r for r in reports}
+        for report in reports:
+            # rescan() just read these manifests
+            self._versions[report.mod_id] = report.new_version
+        if not changed:
+            return 0
+        self._path_index = None
+        library = {str(m['mod_id']): m for m in self.db.get_all_mods()}
+        updated = 0
+        for key, conflicts in list(self._conflicts.items()):
+            mod_ids = [mod_id for mod_id, _ in key]
+            paths = {path for mod_id in mod_ids if mod_id in changed for path in changed[mod_id].changed_paths}
+            if not paths:
+                continue
+            del self._conflicts[key]
+            # Only analyses of exactly the previous versions can be carried forward
+            if all(mod_id in library for mod_id in mod_ids) and all(
+                    changed[mod_id].old_version == version for mod_id, version in key if mod_id in changed):
+                new_key = tuple((mod_id, changed[mod_id].new_version if mod_id in changed else version)
+                                for mod_id, version in key)
+                self._conflicts[new_key] = self.analyzer.update_conflicts(
+                    conflicts, [library[mod_id] for mod_id in mod_ids], paths)
+                updated += 1
+        return updated
+
+    def analyze(self, playset_id: Optional[str] = None, mod_ids: Optional[List[str]] = None,
+                by_id: bool = False, with_versions: bool = False, with_vanilla: bool = False):
+        """
+        Conflicts between the enabled mods of a playset, or an explicit load order.
+        Files map to mod names, or to mod ids with by_id. With with_versions or
+        with_vanilla the result is {"conflicts": ...} plus, respectively,
+        "versions": {mod id: snapshot version}, the versions it was computed
+        against, and "vanilla": {"version": game version or None,
+        "overrides": {mod id: number of vanilla files replaced}} (see
+        VanillaIndex.override_counts).
+        """
+        mods = self._enabled_mods(playset_id, mod_ids)
+        key = self._current_key(mods)
+        if key in self._conflicts:
+            self._conflicts.move_to_end(key)
+            conflicts = self._conflicts[key]
+        else:
+            conflicts = self.analyzer.analyze_conflicts_by_id(mods)
+            self._conflicts[key] = conflicts
+            if len(self._conflicts) > MAX_CACHED_ANALYSES:
+                self._conflicts.popitem(last=False)
+
+        if not by_id:
+            names = {str(m['mod_id']): mod_label(m) for m in mods}
+            conflicts = {path: [names[mod_id] for mod_id in ids] for path, ids in conflicts.items()}
+        if not (with_versions or with_vanilla):
+            return conflicts
+        result = {"conflicts": conflicts}
+        if with_versions:
+            result["versions"] = dict(key)
+        if with_vanilla:
+            version, overrides = self.vanilla.override_counts(mods, self.analyzer, self.game_path)
+            result["vanilla"] = {"version": version, "overrides": overrides}
+        return result
+
+    def query_path(self, path: str):
+        """Which mods in the library ship `path`."""
+        if self._path_index is None:
+            index: Dict[str, List[str]] = {}
+            for mod in self.db.get_all_mods():
+                for rel_path in self.analyzer.get_mod_files(mod):
+                    index.setdefault(rel_path, []).append(str(mod['mod_id']))
+            self._path_index = index
+        return self._path_index.get(path.replace('\\', '/'), [])
+
+    def check(self, playset_id: Optional[str] = None, verify_crc: bool = False):
+        mods = self._enabled_mods(playset_id, None)
+        return [
+            {"mod_id": issue.mod.get('mod_id'), "severity": issue.severity, "message": issue.message}
+            for issue in self.health_checker.check(mods, verify_crc=verify_crc)
+        ]
+
+    def rescan(self, playset_id: Optional[str] = None, all_mods: bool = False, force: bool = False):
+        """
+        Snapshots the enabled mods of a playset (or the whole library) and
+        reports what changed since the last rescan. Cached analyses are updated
+        in place: only the changed paths are re-evaluated.
+        """
+        if self.analyzer.store is None:
+            raise ServiceError("The analyzer has no manifest store.")
+        mods = list(self.db.get_all_mods()) if all_mods else self._enabled_mods(playset_id, None)
+        reports = self.analyzer.rescan(mods, force=force)
+        updated = self._apply_reports(reports)
+
+        shifts = [] if all_mods else self.analyzer.conflict_shifts(mods, reports)
+        return {"reports": [r._asdict() for r in reports],
+                "shifts": [s._asdict() for s in shifts],
+                "updated_analyses": updated}
+
+    def invalidate(self, mod_id: Optional[str] = None):
+        """Drops cached scans (of one mod, or everything) after mods changed on disk."""
+        self.analyzer.invalidate(mod_id)
+        self._path_index = None
+        if mod_id is None:
+            self._conflicts.clear()
+        else:
+            for key in [k for k in self._conflicts if str(mod_id) in dict(k)]:
+                del self._conflicts[key]
+        return True
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.handle_line(line)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b"\n")
+            self.wfile.flush()
+
+
+class ServiceServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Unix socket server with a lock file next to the socket.
+
+    The lock (an flock on `<socket>.lock`) is what decides whether a service is
+    alive: if it can be taken, any socket file left behind belongs to a dead
+    process and is removed before binding.
+    """
+    daemon_threads = True
+
+    def __init__(self, service: ModService, socket_path: Path = SERVICE_SOCKET_PATH):
+        self.service = service
+        self.socket_path = Path(socket_path)
+        self.lock_path = self.socket_path.with_name(self.socket_path.name + ".lock")
+        self._lock_file = self._acquire_lock()
+        try:
+            if self.socket_path.exists() or self.socket_path.is_symlink():
+                self.socket_path.unlink()
+            super().__init__(str(self.socket_path), _RequestHandler)
+            os.chmod(self.socket_path, 0o600)
+        except Exception:
+            self._release_lock()
+            raise
+
+    def _acquire_lock(self):
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.lock_path, 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.seek(0)
+            pid = lock_file.read().strip() or "?"
+            lock_file.close()
+            raise ServiceAlreadyRunning(f"Service already running (pid {pid}) on {self.socket_path}")
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        return lock_file
+
+    def _release_lock(self):
+        if self._lock_file:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def server_close(self):
+        super().server_close()
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+        self._release_lock()
+
+    def handle_line(self, line: bytes) -> Dict:
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return _error(None, PARSE_ERROR, f"Parse error: {e}")
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return _error(None, INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get('id')
+        params = request.get('params') or {}
+        if not isinstance(params, dict):
+            return _error(request_id, INVALID_PARAMS, "params must be an object")
+        if request['method'] == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"jsonrpc": "2.0", "id": request_id, "result": True}
+
+        try:
+            result = self.service.dispatch(request['method'], params)
+        except ServiceError as e:
+            return _error(request_id, e.code, str(e))
+        except Exception as e:
+            return _error(request_id, SERVER_ERROR, f"{type(e).__name__}: {e}")
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def _error(request_id, code: int, message: str) -> Dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class ServiceClient:
+    """Blocking JSON-RPC client. One instance holds one connection; not thread-safe."""
+
+    def __init__(self, socket_path: Path = SERVICE_SOCKET_PATH, timeout: float = 30.0):
+        self.socket_path = Path(socket_path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(str(self.socket_path))
+        except OSError as e:
+            # Also covers timeouts, permission errors and paths too long for a socket
+            self._sock.close()
+            raise ServiceUnavailable(f"No service listening on {self.socket_path}: {e}")
+        self._file = self._sock.makefile('rwb')
+        self._next_id = 0
+
+    @classmethod
+    def try_connect(cls, socket_path: Path = SERVICE_SOCKET_PATH, timeout: float = 30.0) -> Optional["ServiceClient"]:
+        """Returns a connected client, or None if no service is running."""
+        try:
+            return cls(socket_path, timeout)
+        except ServiceUnavailable:
+            return None
+
+    def call(self, method: str, **params):
+        self._next_id += 1
+        request = {"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params}
+        try:
+            self._file.write(json.dumps(request).encode('utf-8') + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        except OSError as e:
+            raise ServiceUnavailable(f"Lost the connection to the service: {e}")
+        if not line:
+            raise ServiceUnavailable("Service closed the connection")
+        try:
+            response = json.loads(line)
+            if 'error' in response:
+                error = response['error']
+                raise ServiceError(error['message'], error['code'])
+            return response['result']
+        except (ValueError, KeyError, TypeError) as e:
+            raise ServiceError(f"Malformed response from the service: {e}", PARSE_ERROR)
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def serve(db_path: Optional[Path] = None, socket_path: Path = SERVICE_SOCKET_PATH):
+    """Runs the service in the foreground until interrupted or asked to shut down."""
+    db = LauncherDB(db_path)
+    db.connect(check_same_thread=False)
+    server = ServiceServer(ModService(db), socket_path)
+    print(f"Serving on {server.socket_path} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        db.close()
@@ -0,0 +1,188 @@
+"""
+Versioned manifest snapshots of the library's mods, so that a rescan after a
+Workshop update can say which files each mod added, removed or changed.
+
+A snapshot is the mod's file list with (size, CRC-32) per file, stored as one
+compressed blob per version in CACHE_DIR. Zip members carry their CRC in the
+central directory; loose files are hashed once and their CRC is carried over
+to later snapshots for as long as their size and mtime stay the same.
+"""
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from ck3_mod_manager.manifest import ManifestEntry, ModReader
+from ck3_mod_manager.utils.config import CACHE_DIR
+
+# Versions kept per mod; older snapshots are pruned
+MAX_SNAPSHOTS = 5
+
+_CRC_CHUNK = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (mod_id TEXT, version INTEGER, token TEXT, taken_on REAL,
+                                      file_count INTEGER, files BLOB,
+                                      PRIMARY KEY (mod_id, version)) WITHOUT ROWID;
+"""
+
+
+class SnapshotFile(NamedTuple):
+    size: int
+    crc: int        # CRC-32 of the contents
+    mtime_ns: int   # 0 for zip members
+
+
+class Snapshot(NamedTuple):
+    mod_id: str
+    version: int
+    token: str
+    taken_on: float
+    files: Dict[str, SnapshotFile]
+
+
+class ChangeReport(NamedTuple):
+    mod_id: str
+    name: str
+    old_version: Optional[int]  # None for the first snapshot of a mod
+    new_version: int
+    added: List[str]
+    removed: List[str]
+    modified: List[str]
+
+    @property
+    def changed_paths(self) -> List[str]:
+        return self.added + self.removed + self.modified
+
+
+class ConflictShift(NamedTuple):
+    path: str
+    before: List[str]   # ids of the mods that shipped the file, in load order
+    after: List[str]
+    modified: bool      # one of the mods changed its copy of the file
+
+
+def _encode(files: Dict[str, SnapshotFile]) -> bytes:
+    return zlib.compress(json.dumps({path: list(f) for path, f in files.items()},
+                                    separators=(',', ':')).encode('utf-8'))
+
+
+def _decode(blob: bytes) -> Dict[str, SnapshotFile]:
+    return {path: SnapshotFile(*f) for path, f in json.loads(zlib.decompress(blob)).items()}
+
+
+def _stream_crc(f) -> int:
+    crc = 0
+    for chunk in iter(lambda: f.read(_CRC_CHUNK), b''):
+        crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def encode_token(token) -> str:
+    """A stat token (see manifest.mod_stat_token) in the form it is stored."""
+    return json.dumps(token, separators=(',', ':'))
+
+
+class ManifestStore:
+    """Manifest snapshots per mod and version, in a small SQLite file."""
+
+    def __init__(self, store_path: Optional[Path] = None, max_snapshots: int = MAX_SNAPSHOTS):
+        self.store_path = Path(store_path) if store_path else CACHE_DIR / "manifests.sqlite"
+        self.max_snapshots = max_snapshots
+
+    def _connect(self) -> sqlite3.Connection:
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.store_path)
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def latest_tokens(self) -> Dict[str, str]:
+        """mod_id -> stat token of its latest snapshot, for every mod in one query."""
+        conn = self._connect()
+        try:
+            # SQLite returns the bare column from the row holding MAX()
+            return {mod_id: token for mod_id, _, token in
+                    conn.execute("SELECT mod_id, MAX(version), token FROM snapshots GROUP BY mod_id")}
+        finally:
+            conn.close()
+
+    def latest_versions(self) -> Dict[str, int]:
+        """mod_id -> version of its latest snapshot."""
+        conn = self._connect()
+        try:
+            return dict(conn.execute("SELECT mod_id, MAX(version) FROM snapshots GROUP BY mod_id"))
+        finally:
+            conn.close()
+
+    def versions(self, mod_id) -> List[int]:
+        conn = self._connect()
+        try:
+            return [row[0] for row in conn.execute(
+                "SELECT version FROM snapshots WHERE mod_id = ? ORDER BY version", (str(mod_id),))]
+        finally:
+            conn.close()
+
+    def get(self, mod_id, version: Optional[int] = None) -> Optional[Snapshot]:
+        """One snapshot of a mod; the latest if no version is given."""
+        conn = self._connect()
+        try:
+            if version is None:
+                row = conn.execute("SELECT version, token, taken_on, files FROM snapshots WHERE mod_id = ? "
+                                   "ORDER BY version DESC LIMIT 1", (str(mod_id),)).fetchone()
+            else:
+                row = conn.execute("SELECT version, token, taken_on, files FROM snapshots "
+                                   "WHERE mod_id = ? AND version = ?", (str(mod_id), version)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return Snapshot(str(mod_id), row[0], row[1], row[2], _decode(row[3]))
+
+    def record(self, mod: Dict, token: str, manifest: Dict[str, ManifestEntry],
+               name: Optional[str] = None) -> Optional[ChangeReport]:
+        """
+        Stores a new snapshot of `mod` if its contents differ from the latest
+        one and returns what changed. Returns None if nothing did; only the
+        stored stat token is refreshed then.
+        """
+        mod_id = str(mod.get('mod_id'))
+        previous = self.get(mod_id)
+        old_files = previous.files if previous else {}
+
+        files: Dict[str, SnapshotFile] = {}
+        with ModReader(mod) as reader:
+            for path, entry in manifest.items():
+                crc = entry.crc
+                if crc is None:
+                    old = old_files.get(path)
+                    if old and old.size == entry.size and old.mtime_ns == entry.mtime_ns:
+                        crc = old.crc
+                    else:
+                        with reader.open(path) as f:
+                            crc = _stream_crc(f)
+                files[path] = SnapshotFile(entry.size, crc, entry.mtime_ns)
+
+        added = sorted(files.keys() - old_files.keys())
+        removed = sorted(old_files.keys() - files.keys())
+        modified = sorted(path for path in files.keys() & old_files.keys()
+                          if files[path][:2] != old_files[path][:2])
+
+        conn = self._connect()
+        try:
+            with conn:
+                if previous and not (added or removed or modified):
+                    # Touched but identical: keep the version, remember the new mtimes
+                    conn.execute("UPDATE snapshots SET token = ?, files = ? WHERE mod_id = ? AND version = ?",
+                                 (token, _encode(files), mod_id, previous.version))
+                    return None
+                version = previous.version + 1 if previous else 1
+                conn.execute("INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?)",
+                             (mod_id, version, token, time.time(), len(files), _encode(files)))
+                conn.execute("DELETE FROM snapshots WHERE mod_id = ? AND version <= ?",
+                             (mod_id, version - self.max_snapshots))
+        finally:
+            conn.close()
+        return ChangeReport(mod_id, name or mod_id, previous.version if previous else None, version,
+                            added, removed, modified)
@@ -1,8 +1,18 @@
 from pathlib import Path
 import os
+import tempfile
 
 # 프로젝트 루트 디렉토리 (절대 경로)
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
 
 # 데이터베이스 경로 (환경변수 DB_PATH가 있으면 사용, 없으면 프로젝트 루트의 ck3_mods.db 사용)
-DB_PATH = Path(os.path.expanduser("~/Documents/Paradox Interactive/Crusader Kings III/launcher-v2.sqlite.backup"))
\ No newline at end of file
+DB_PATH = Path(os.path.expanduser("~/Documents/Paradox Interactive/Crusader Kings III/launcher-v2.sqlite.backup"))
+
+# 백그라운드 서비스 소켓 경로 (환경변수 CK3MM_SOCKET이 있으면 사용, 없으면 임시 디렉토리 사용)
+SERVICE_SOCKET_PATH = Path(os.environ.get("CK3MM_SOCKET") or Path(tempfile.gettempdir()) / f"ck3-modmanager-{os.getuid()}.sock")
+
+# CK3 게임 설치 경로 (환경변수 CK3MM_GAME_PATH가 있으면 사용, 없으면 Steam 기본 설치 경로 사용)
+GAME_PATH = Path(os.environ.get("CK3MM_GAME_PATH") or os.path.expanduser("~/Library/Application Support/Steam/steamapps/common/Crusader Kings III"))
+
+# 캐시 디렉토리 (환경변수 CK3MM_CACHE_DIR가 있으면 사용, 없으면 ~/.cache/ck3-modmanager 사용)
+CACHE_DIR = Path(os.environ.get("CK3MM_CACHE_DIR") or Path.home() / ".cache" / "ck3-modmanager")
@@ -0,0 +1,158 @@
+import mmap
+import struct
+import zipfile
+import zlib
+from pathlib import Path
+from typing import List, NamedTuple, Union
+
+# End of central directory record (fixed part, without the trailing comment)
+_EOCD_SIGNATURE = b"PK\x05\x06"
+_EOCD_STRUCT = struct.Struct("<4s4H2LH")
+# Zip64 end of central directory locator, sits right before the EOCD record
+_ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+_ZIP64_LOCATOR_SIZE = 20
+# Central directory file header (fixed part, followed by name/extra/comment)
+_CDIR_SIGNATURE = b"PK\x01\x02"
+_CDIR_STRUCT = struct.Struct("<4s6H3L5H2L")
+
+# Local file header (fixed part, followed by name/extra and the member data)
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+_LOCAL_STRUCT = struct.Struct("<4s5H3L2H")
+
+_MAX_COMMENT = 0xFFFF
+_UTF8_FLAG = 0x800
+
+
+class ZipEntry(NamedTuple):
+    name: str
+    size: int
+    compressed_size: int
+    crc: int
+    compress_type: int
+    header_offset: int
+
+
+class _Unsupported(Exception):
+    """Raised internally when an archive needs the full zipfile implementation."""
+
+
+def read_zip_entries(path: Union[str, Path]) -> List[ZipEntry]:
+    """
+    Lists the members of a zip archive by parsing only its central directory.
+    The archive is memory-mapped, so no member data is ever read.
+    Archives this parser does not handle (zip64, multi-disk, prepended data,
+    legacy name encodings) are delegated to the zipfile module.
+    Raises zipfile.BadZipFile if the file is not a readable zip archive.
+    """
+    try:
+        return _read_central_directory(path)
+    except _Unsupported:
+        return _read_with_zipfile(path)
+
+
+def _read_central_directory(path: Union[str, Path]) -> List[ZipEntry]:
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            raise zipfile.BadZipFile(f"File is not a zip file: {path}")
+
+    with mm:
+        file_size = len(mm)
+        search_start = max(0, file_size - _EOCD_STRUCT.size - _MAX_COMMENT)
+        eocd_pos = mm.rfind(_EOCD_SIGNATURE, search_start)
+        if eocd_pos < 0 or eocd_pos + _EOCD_STRUCT.size > file_size:
+            raise zipfile.BadZipFile(f"File is not a zip file: {path}")
+
+        (_, disk_no, cd_disk, disk_entries, total_entries,
+         cd_size, cd_offset, _) = _EOCD_STRUCT.unpack_from(mm, eocd_pos)
+
+        locator_pos = eocd_pos - _ZIP64_LOCATOR_SIZE
+        if locator_pos >= 0 and mm[locator_pos:locator_pos + 4] == _ZIP64_LOCATOR_SIGNATURE:
+            raise _Unsupported("zip64")
+        if disk_no != 0 or cd_disk != 0 or disk_entries != total_entries:
+            raise _Unsupported("multi-disk")
+        if cd_offset + cd_size != eocd_pos:
+            # Either data was prepended (self-extracting archives) or the
+            # directory is damaged; zipfile knows how to sort that out.
+            raise _Unsupported("central directory is not where the EOCD says")
+
+        entries = []
+        unpack_header = _CDIR_STRUCT.unpack_from
+        header_size = _CDIR_STRUCT.size
+        pos = cd_offset
+        end = cd_offset + cd_size
+
+        for _ in range(total_entries):
+            if pos + header_size > end:
+                raise zipfile.BadZipFile(f"Truncated central directory: {path}")
+            (signature, _, _, flags, compress_type, _, _, crc,
+             compressed_size, size, name_len, extra_len, comment_len,
+             _, _, _, header_offset) = unpack_header(mm, pos)
+            if signature != _CDIR_SIGNATURE:
+                raise zipfile.BadZipFile(f"Bad central directory entry: {path}")
+            if 0xFFFFFFFF in (compressed_size, size, header_offset):
+                raise _Unsupported("zip64 entry")
+            if header_offset >= cd_offset:
+                raise zipfile.BadZipFile(f"Entry points past archive data: {path}")
+
+            name_start = pos + header_size
+            raw_name = mm[name_start:name_start + name_len]
+            if flags & _UTF8_FLAG:
+                name = raw_name.decode("utf-8")
+            elif raw_name.isascii():
+                name = raw_name.decode("ascii")
+            else:
+                raise _Unsupported("legacy name encoding")
+
+            entries.append(ZipEntry(name, size, compressed_size, crc,
+                                    compress_type, header_offset))
+            pos = name_start + name_len + extra_len + comment_len
+
+        if pos != end:
+            raise zipfile.BadZipFile(f"Central directory size mismatch: {path}")
+
+    return entries
+
+
+def _read_with_zipfile(path: Union[str, Path]) -> List[ZipEntry]:
+    with zipfile.ZipFile(path, "r") as zip_ref:
+        return [
+            ZipEntry(info.filename, info.file_size, info.compress_size, info.CRC,
+                     info.compress_type, info.header_offset)
+            for info in zip_ref.infolist()
+        ]
+
+
+def read_zip_member(path: Union[str, Path], entry: ZipEntry) -> bytes:
+    """
+    Reads one member listed by read_zip_entries(), seeking straight to its
+    local header. Stored and deflated members are read directly and checked
+    against the size and CRC-32 of the central directory, as zipfile does;
+    anything else goes through the zipfile module.
+    Raises zipfile.BadZipFile if the member cannot be read or is corrupt.
+    """
+    if entry.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        with zipfile.ZipFile(path, "r") as zip_ref:
+            return zip_ref.read(entry.name)
+
+    with open(path, "rb") as f:
+        f.seek(entry.header_offset)
+        header = f.read(_LOCAL_STRUCT.size)
+        if len(header) != _LOCAL_STRUCT.size or header[:4] != _LOCAL_SIGNATURE:
+            raise zipfile.BadZipFile(f"Bad local header for {entry.name}: {path}")
+        name_len, extra_len = _LOCAL_STRUCT.unpack(header)[-2:]
+        f.seek(name_len + extra_len, 1)
+        data = f.read(entry.compressed_size)
+
+    if len(data) != entry.compressed_size:
+        raise zipfile.BadZipFile(f"Truncated member {entry.name}: {path}")
+    if entry.compress_type == zipfile.ZIP_DEFLATED:
+        try:
+            data = zlib.decompress(data, -15)
+        except zlib.error as e:
+            raise zipfile.BadZipFile(f"Damaged member {entry.name}: {e}")
+    if len(data) != entry.size or zlib.crc32(data) != entry.crc:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for member {entry.name}: {path}")
+    return data
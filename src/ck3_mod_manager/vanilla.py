@@ -0,0 +1,234 @@
+"""
+Persistent index of the vanilla game files, used to tell which game files a
+mod replaces outright. Building it means hashing the whole `game/` folder, so
+it is done once per game version and stored in CACHE_DIR.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.manifest import ModReader, scan_directory
+from ck3_mod_manager.utils.config import CACHE_DIR, GAME_PATH
+
+_HASH_CHUNK = 1024 * 1024
+# Files every patch replaces, relative to the install folder; their stat
+# results stand in for the version when launcher-settings.json has none
+_VERSION_STAMPS = ("binaries/ck3", "binaries/ck3.exe", "game/checksum_manifest.txt")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (version TEXT PRIMARY KEY, game_path TEXT, file_count INTEGER, built_on REAL);
+CREATE TABLE IF NOT EXISTS files (version TEXT, path TEXT, size INTEGER, hash TEXT,
+                                  PRIMARY KEY (version, path)) WITHOUT ROWID;
+"""
+
+
+class VanillaFile(NamedTuple):
+    size: int
+    hash: str   # blake2b-128 of the contents
+
+
+class VanillaOverride(NamedTuple):
+    path: str
+    vanilla_size: int
+    mod_size: int
+    identical: Optional[bool] = None    # unchanged copy of the vanilla file; None if not verified
+
+
+class GameNotFoundError(FileNotFoundError):
+    """The game path does not point at a CK3 installation."""
+
+
+def _install_root(game_path: Path) -> Path:
+    # Accept both the install folder and its game/ subfolder
+    game_path = Path(game_path)
+    return game_path.parent if game_path.name == "game" else game_path
+
+
+def game_version(game_path: Path = GAME_PATH) -> str:
+    """
+    The installed game version, from launcher/launcher-settings.json. If that
+    cannot be read, a token derived from stat() results is used instead (see
+    _version_stamp), so a patch still invalidates the index. Raises
+    GameNotFoundError if there is no game/ folder at `game_path`.
+    """
+    root = _install_root(game_path)
+    if not (root / "game").is_dir():
+        raise GameNotFoundError(f"No Crusader Kings III installation found at {game_path} (no game/ folder).")
+    try:
+        with open(root / "launcher" / "launcher-settings.json", 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+        version = settings.get('rawVersion') or settings.get('version')
+        if version:
+            return str(version)
+    except (OSError, ValueError, AttributeError):
+        pass
+    return f"unknown-{_version_stamp(root)}"
+
+
+def _version_stamp(root: Path) -> str:
+    """
+    A digest of the size and mtime of the game executable and checksum
+    manifest, which every patch replaces. Installs that have none of those get
+    the mtimes of game/ and the folders two levels below it instead: those
+    change when a patch adds, removes or replaces (writes and renames) files
+    at that depth, but not when a file deeper down is rewritten in place.
+    """
+    stamps = []
+    for rel_path in _VERSION_STAMPS:
+        try:
+            st = os.stat(root / rel_path)
+        except OSError:
+            continue
+        stamps.append((rel_path, st.st_size, st.st_mtime_ns))
+    if not stamps:
+        stamps = _folder_mtimes(root / "game", "", depth=2)
+    return hashlib.blake2b(repr(stamps).encode(), digest_size=8).hexdigest()
+
+
+def _folder_mtimes(path: Path, rel_path: str, depth: int) -> List[tuple]:
+    mtimes = [(rel_path, os.stat(path).st_mtime_ns)]
+    if depth:
+        with os.scandir(path) as it:
+            folders = sorted(entry.name for entry in it if entry.is_dir(follow_symlinks=False))
+        for name in folders:
+            mtimes.extend(_folder_mtimes(path / name, f"{rel_path}{name}/", depth - 1))
+    return mtimes
+
+
+def _stream_hash(f) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def _file_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return _stream_hash(f)
+
+
+class VanillaIndex:
+    """
+    path -> (size, hash) of every file under the game's `game/` folder, per
+    game version, in a small SQLite file. Lookups load one version into memory
+    once; after that checking a mod costs one set intersection.
+    """
+
+    def __init__(self, index_path: Optional[Path] = None, max_workers: int = 8):
+        self.index_path = Path(index_path) if index_path else CACHE_DIR / "vanilla_index.sqlite"
+        self.max_workers = max_workers
+        self._files: Dict[str, Dict[str, VanillaFile]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.index_path)
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def versions(self) -> List[str]:
+        conn = self._connect()
+        try:
+            return [row[0] for row in conn.execute("SELECT version FROM builds ORDER BY built_on DESC")]
+        finally:
+            conn.close()
+
+    def build(self, game_path: Path = GAME_PATH, version: Optional[str] = None) -> str:
+        """Indexes the game folder (hashing in parallel) and replaces any older baseline."""
+        root = _install_root(game_path)
+        version = version or game_version(root)
+        manifest = scan_directory(str(root / "game"))
+
+        paths = sorted(manifest)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            hashes = list(pool.map(lambda rel_path: _file_hash(str(root / "game" / rel_path)), paths))
+
+        conn = self._connect()
+        try:
+            with conn:
+                # One install, one baseline: older versions are never looked up again
+                conn.execute("DELETE FROM files")
+                conn.execute("DELETE FROM builds")
+                conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?)",
+                                 [(version, p, manifest[p].size, h) for p, h in zip(paths, hashes)])
+                conn.execute("INSERT INTO builds VALUES (?, ?, ?, ?)",
+                             (version, str(root), len(paths), time.time()))
+        finally:
+            conn.close()
+        self._files = {version: {p: VanillaFile(manifest[p].size, h) for p, h in zip(paths, hashes)}}
+        return version
+
+    def ensure(self, game_path: Path = GAME_PATH) -> str:
+        """Returns the current game version, building the baseline first if it is missing or outdated."""
+        version = game_version(game_path)
+        if version not in self._files and version not in self.versions():
+            self.build(game_path, version)
+        return version
+
+    def indexed_version(self, game_path: Path = GAME_PATH) -> Optional[str]:
+        """The installed game version if its baseline is already stored; never builds one."""
+        try:
+            version = game_version(game_path)
+        except GameNotFoundError:
+            return None
+        if version in self._files or version in self.versions():
+            return version
+        return None
+
+    def files(self, version: str) -> Dict[str, VanillaFile]:
+        if version not in self._files:
+            conn = self._connect()
+            try:
+                rows = conn.execute("SELECT path, size, hash FROM files WHERE version = ?", (version,))
+                self._files[version] = {path: VanillaFile(size, h) for path, size, h in rows}
+            finally:
+                conn.close()
+        return self._files[version]
+
+    def overrides(self, mod: Dict, version: str, analyzer: Optional[ModAnalyzer] = None,
+                  verify: bool = False) -> List[VanillaOverride]:
+        """
+        The vanilla files a mod replaces outright (same relative path), sorted by path.
+        With verify, files of the same size as the vanilla one are hashed to find unchanged copies.
+        """
+        analyzer = analyzer or ModAnalyzer()
+        vanilla = self.files(version)
+        manifest = analyzer.get_mod_manifest(mod)
+        paths = sorted(manifest.keys() & vanilla.keys())
+        if not verify:
+            return [VanillaOverride(path, vanilla[path].size, manifest[path].size) for path in paths]
+
+        result = []
+        with ModReader(mod) as reader:
+            for path in paths:
+                identical = False
+                if manifest[path].size == vanilla[path].size:
+                    with reader.open(path) as f:
+                        identical = _stream_hash(f) == vanilla[path].hash
+                result.append(VanillaOverride(path, vanilla[path].size, manifest[path].size, identical))
+        return result
+
+    def override_counts(self, mods: List[Dict], analyzer: ModAnalyzer,
+                        game_path: Path = GAME_PATH) -> Tuple[Optional[str], Dict[str, int]]:
+        """
+        (game version, mod id -> number of vanilla files it replaces) for the
+        mods that replace any. Only an existing baseline is used: if the
+        installed version has not been indexed yet, the version is None and
+        nothing is counted. Mod files come from the analyzer's cache, so right
+        after a conflict scan this is one set intersection per mod.
+        """
+        version = self.indexed_version(game_path)
+        if version is None:
+            return None, {}
+        vanilla = self.files(version).keys()
+        counts = {}
+        for mod in mods:
+            count = len(analyzer.get_mod_files(mod) & vanilla)
+            if count:
+                counts[str(mod.get('mod_id'))] = count
+        return version, counts
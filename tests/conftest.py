@@ -0,0 +1,62 @@
+import os
+import sqlite3
+
+import pytest
+
+from ck3_mod_manager.database.launcher_db import LAUNCHER_SCHEMA
+
+
+@pytest.fixture
+def mod_dirs(tmp_path):
+    """Three directory mods; 'a' and 'b' both touch common/traits/00_traits.txt."""
+    files = {
+        'a': {"common/traits/00_traits.txt": "a", "events/a.txt": "a"},
+        'b': {"common/traits/00_traits.txt": "b", "gfx/b.dds": "b"},
+        'c': {"history/c.txt": "c"},
+    }
+    dirs = {}
+    for mod_id, contents in files.items():
+        root = tmp_path / "mods" / mod_id
+        for rel_path, content in contents.items():
+            (root / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            (root / rel_path).write_text(content)
+        (root / "descriptor.mod").write_text(f'name="Mod {mod_id.upper()}"')
+        dirs[mod_id] = root
+    return dirs
+
+
+@pytest.fixture
+def edit_mod_file():
+    """Writes (or with None, deletes) one file of a mod, as an editor or an update would."""
+    def edit(root, rel_path, content):
+        path = root / rel_path
+        if content is None:
+            path.unlink()
+            return
+        before = path.stat().st_mtime_ns if path.exists() else None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        # Coarse filesystem clocks can give a quick rewrite the same mtime
+        st = path.stat()
+        if st.st_mtime_ns == before:
+            os.utime(path, ns=(st.st_atime_ns, before + 1_000_000_000))
+    return edit
+
+
+@pytest.fixture
+def launcher_db_path(tmp_path, mod_dirs):
+    """A launcher database with playsets 'Main' (active: a, b, c disabled) and 'Other' (empty)."""
+    path = tmp_path / "launcher-v2.sqlite"
+    conn = sqlite3.connect(path)
+    conn.executescript(LAUNCHER_SCHEMA)
+    conn.executemany("INSERT INTO playsets VALUES (?, ?, ?, ?)",
+                     [("main", "Main", 1, 2), ("other", "Other", 0, 1)])
+    conn.executemany("INSERT INTO mods VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+        (mod_id, f"Mod {mod_id.upper()}", f"Mod {mod_id.upper()}", "1.0", str(root), None, None, None)
+        for mod_id, root in mod_dirs.items()
+    ])
+    conn.executemany("INSERT INTO playsets_mods VALUES (?, ?, ?, ?)",
+                     [("main", "a", 1, 0), ("main", "b", 1, 1), ("main", "c", 0, 2)])
+    conn.commit()
+    conn.close()
+    return path
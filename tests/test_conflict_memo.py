@@ -0,0 +1,95 @@
+import pytest
+
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.conflict_memo import ConflictMemo
+from ck3_mod_manager.snapshots import ManifestStore
+
+
+def _mods(mod_dirs, ids="abc"):
+    return [{'mod_id': mod_id, 'dirPath': str(mod_dirs[mod_id])} for mod_id in ids]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ManifestStore(tmp_path / "manifests.sqlite")
+
+
+def test_memoized_until_a_mod_changes(mod_dirs, edit_mod_file, store, monkeypatch):
+    memo = ConflictMemo()
+    analyzer = ModAnalyzer(store)
+    calls = []
+    def compute(mods):
+        calls.append([m['mod_id'] for m in mods])
+        return analyzer.analyze_conflicts_by_id(mods), None
+
+    expected = {"common/traits/00_traits.txt": ['a', 'b']}
+    assert memo.analyze(analyzer, _mods(mod_dirs), compute, rescan=True) == expected
+    assert memo.analyze(analyzer, _mods(mod_dirs, "cb"), compute, rescan=True) == {}
+    assert memo.analyze(analyzer, _mods(mod_dirs), compute, rescan=True) == expected
+    assert calls == [['a', 'b', 'c'], ['c', 'b']]
+
+    # Load order is part of the key
+    assert memo.fingerprint(_mods(mod_dirs, "ab"), {}) != memo.fingerprint(_mods(mod_dirs, "ba"), {})
+
+    # A hit without rescan reads the stored versions only: no stat walk
+    monkeypatch.setattr("ck3_mod_manager.analyzer.mod_stat_token", lambda mod: pytest.fail("stat walk"))
+    assert memo.analyze(analyzer, _mods(mod_dirs), compute) == expected
+    monkeypatch.undo()
+
+    # Deleting a file in a subfolder: the stored versions still answer, the rescan sees the change
+    edit_mod_file(mod_dirs['b'], "common/traits/00_traits.txt", None)
+    assert memo.analyze(analyzer, _mods(mod_dirs), compute) == expected
+    assert memo.analyze(analyzer, _mods(mod_dirs), compute, rescan=True) == {}
+    assert len(calls) == 3
+
+    # So is editing one in place
+    edit_mod_file(mod_dirs['b'], "gfx/b.dds", "c")
+    memo.analyze(analyzer, _mods(mod_dirs), compute, rescan=True)
+    assert len(calls) == 4
+
+
+def test_edits_made_while_closed(tmp_path, mod_dirs, edit_mod_file, store):
+    path = tmp_path / "conflict_memo.sqlite"
+    analyzer = ModAnalyzer(store)
+    expected = {"common/traits/00_traits.txt": ['a', 'b']}
+    assert ConflictMemo(path=path).analyze(analyzer, _mods(mod_dirs), rescan=True) == expected
+
+    # The persisted result no longer matches, and the analyzer's cached manifest of 'a' is not reused
+    edit_mod_file(mod_dirs['a'], "common/traits/00_traits.txt", None)
+    assert ConflictMemo(path=path).analyze(analyzer, _mods(mod_dirs), rescan=True) == {}
+
+
+def test_remote_results_are_filed_under_their_versions(mod_dirs, edit_mod_file, store):
+    memo = ConflictMemo()
+    analyzer = ModAnalyzer(store)
+    memo.analyze(analyzer, _mods(mod_dirs, "ab"), rescan=True)
+
+    # A service answers for a newer state of 'b' than the one stored here
+    stale_answer = ({"stale": ['a', 'b']}, {'a': 1, 'b': 2})
+    assert memo.analyze(analyzer, _mods(mod_dirs, "ba"), lambda mods: stale_answer) == {"stale": ['a', 'b']}
+    # Not memoized under version 1 of 'b'
+    assert memo.get(memo.fingerprint(_mods(mod_dirs, "ba"), {'a': 1, 'b': 1})) is None
+    assert memo.get(memo.fingerprint(_mods(mod_dirs, "ba"), {'a': 1, 'b': 2})) == {"stale": ['a', 'b']}
+
+
+def test_lru_and_persistence(tmp_path, mod_dirs, store):
+    path = tmp_path / "cache" / "conflict_memo.sqlite"
+    memo = ConflictMemo(max_entries=2, path=path)
+    analyzer = ModAnalyzer(store)
+    keys = []
+    for ids in ("ab", "bc", "ac"):
+        key = memo.fingerprint(_mods(mod_dirs, ids), {})
+        memo.put(key, analyzer.analyze_conflicts_by_id(_mods(mod_dirs, ids)))
+        keys.append(key)
+
+    assert memo.get(keys[0]) is None
+    # A fresh memo (a restart) reads the surviving entries back from disk
+    restarted = ConflictMemo(max_entries=2, path=path)
+    assert restarted.get(keys[1]) == {}
+    assert restarted.get(keys[0]) is None
+    assert restarted.analyze(analyzer, _mods(mod_dirs, "ab"),
+                             lambda mods: ({"recomputed": []}, None)) == {"recomputed": []}
+    restarted.clear()
+    assert ConflictMemo(path=path).get(keys[1]) is None
+    with pytest.raises(ValueError):
+        restarted.analyze(ModAnalyzer(), _mods(mod_dirs))
@@ -0,0 +1,133 @@
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QModelIndex, QPersistentModelIndex, Qt
+from PySide6.QtWidgets import QApplication
+
+from ck3_mod_manager.gui.conflict_model import ConflictFilterProxy, ConflictTreeModel, FETCH_BATCH
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+CONFLICTS = {
+    "common/traits/00_traits.txt": ["Mod A", "Mod B"],
+    "common/traits/01_traits.txt": ["Mod A", "Mod B"],
+    "common/on_action/yearly.txt": ["Mod B", "Mod C"],
+    "events/birth.txt": ["Mod A", "Mod C"],
+    "thumbnail.png": ["Mod A", "Mod B", "Mod C"],
+}
+
+
+def _labels(model, parent=QModelIndex()):
+    return [model.index(row, 0, parent).data() for row in range(model.rowCount(parent))]
+
+
+def test_groups_are_built_lazily(app):
+    model = ConflictTreeModel()
+    model.set_conflicts(CONFLICTS)
+
+    assert _labels(model) == ["(root)", "common", "events"]
+    common = model.index(1, 0)
+    assert model.hasChildren(common)
+    assert model.rowCount(common) == 0
+
+    model.fetchMore(common)
+    assert _labels(model, common) == ["Mod A ↔ Mod B", "Mod B ↔ Mod C"]
+
+    pair = model.index(0, 0, common)
+    assert model.rowCount(pair) == 0
+    model.fetchMore(pair)
+    assert _labels(model, pair) == ["common/traits/00_traits.txt", "common/traits/01_traits.txt"]
+    assert model.index(0, 1, pair).data() == "Won by Mod B"
+
+
+def test_fetched_files_follow_the_sort_order(app):
+    model = ConflictTreeModel()
+    model.set_conflicts({f"events/{name}.txt": ["Mod A", "Mod B"] for name in "zam"})
+    events = model.index(0, 0)
+    model.fetchMore(events)
+    pair = model.index(0, 0, events)
+    model.fetchMore(pair)
+    assert _labels(model, pair) == ["events/a.txt", "events/m.txt", "events/z.txt"]
+
+    model.sort(0, Qt.DescendingOrder)
+    model.set_conflicts({f"events/{name}.txt": ["Mod A", "Mod B"] for name in "mza"})
+    events = model.index(0, 0)
+    model.fetchMore(events)
+    pair = model.index(0, 0, events)
+    model.fetchMore(pair)
+    assert _labels(model, pair) == ["events/z.txt", "events/m.txt", "events/a.txt"]
+    assert model.node_for(model.index(0, 0, pair)).label == "events/z.txt"
+    assert model.node_for(QModelIndex()) is None
+
+
+def test_fetch_is_batched(app):
+    model = ConflictTreeModel()
+    model.set_conflicts({f"gfx/{i:05d}.dds": ["Mod A", "Mod B"] for i in range(FETCH_BATCH + 10)})
+    gfx = model.index(0, 0)
+    model.fetchMore(gfx)
+    pair = model.index(0, 0, gfx)
+
+    model.fetchMore(pair)
+    assert model.rowCount(pair) == FETCH_BATCH
+    assert model.canFetchMore(pair)
+    model.fetchMore(pair)
+    assert model.rowCount(pair) == FETCH_BATCH + 10
+    assert not model.canFetchMore(pair)
+
+
+def test_sort_includes_unfetched_rows(app):
+    model = ConflictTreeModel()
+    model.set_conflicts(CONFLICTS)
+    model.sort(1, Qt.DescendingOrder)
+
+    assert _labels(model) == ["common", "events", "(root)"]
+    common = model.index(0, 0)
+    model.fetchMore(common)
+    assert _labels(model, common) == ["Mod A ↔ Mod B", "Mod B ↔ Mod C"]
+
+
+def test_sort_after_partial_fetch(app):
+    model = ConflictTreeModel()
+    model.set_conflicts({f"gfx/{i:05d}.dds": ["Mod A", "Mod B"] for i in range(FETCH_BATCH + 10)})
+    gfx = model.index(0, 0)
+    model.fetchMore(gfx)
+    pair = model.index(0, 0, gfx)
+    model.fetchMore(pair)
+    first = model.index(0, 0, pair)
+    persistent = QPersistentModelIndex(first)
+
+    # The fetched rows are the first FETCH_BATCH of the new order, not the old rows reversed
+    model.sort(0, Qt.DescendingOrder)
+    labels = _labels(model, pair)
+    assert len(labels) == FETCH_BATCH
+    assert labels[0] == f"gfx/{FETCH_BATCH + 9:05d}.dds"
+    assert not persistent.isValid()
+    model.fetchMore(pair)
+    assert _labels(model, pair) == [f"gfx/{i:05d}.dds" for i in reversed(range(FETCH_BATCH + 10))]
+
+
+def test_filter_by_mod_and_path(app):
+    model = ConflictTreeModel()
+    model.set_conflicts(CONFLICTS)
+    proxy = ConflictFilterProxy()
+    proxy.setSourceModel(model)
+
+    proxy.set_filter_text("mod c")
+    assert _labels(proxy) == ["(root)", "common", "events"]
+
+    proxy.set_filter_text("on_action")
+    assert _labels(proxy) == ["common"]
+    common = proxy.index(0, 0)
+    proxy.fetchMore(common)
+    assert _labels(proxy, common) == ["Mod B ↔ Mod C"]
+
+    proxy.set_filter_text("")
+    assert proxy.rowCount() == 3
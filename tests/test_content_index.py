@@ -0,0 +1,108 @@
+import zipfile
+
+from ck3_mod_manager import cli, content_index, snapshots
+from ck3_mod_manager.manifest import ModReader
+from ck3_mod_manager.content_index import ContentIndex, line_tokens, query_terms
+from ck3_mod_manager.snapshots import ManifestStore
+
+
+def test_tokens():
+    assert line_tokens("trait_brave = { opposites = { craven } } # Brave") == {
+        "trait_brave", "opposites", "craven", "brave"}
+    assert line_tokens("namespace = my_events.0001") == {"namespace", "my_events.0001", "my_events"}
+    assert query_terms("Scripted_effect_* = craven") == [("scripted_effect_", True), ("craven", False)]
+
+
+def test_index_search_and_incremental_update(tmp_path, mod_dirs, edit_mod_file):
+    (mod_dirs['a'] / "common" / "traits" / "00_traits.txt").write_text("trait_brave = {\n\tcraven = no\n}\n")
+    archive = tmp_path / "zipped.zip"
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("localization/english/z_l_english.yml", "l_english:\n trait_brave:0 \"Brave\"\n")
+        zf.writestr("gfx/icon.dds", "trait_brave")
+    mods = [{'mod_id': 'a', 'dirPath': str(mod_dirs['a'])},
+            {'mod_id': 'b', 'dirPath': str(mod_dirs['b'])},
+            {'mod_id': 'z', 'archivePath': str(archive)}]
+
+    index = ContentIndex(tmp_path / "cache" / "content_index.sqlite", ManifestStore(tmp_path / "cache" / "m.sqlite"))
+    assert index.is_empty()
+    stats = index.update(mods)
+    assert stats.mods == 3 and stats.files == 4
+
+    hits = index.search("TRAIT_BRAVE")
+    assert [(h.mod_id, h.path, h.line) for h in hits] == [
+        ('a', "common/traits/00_traits.txt", 1),
+        ('z', "localization/english/z_l_english.yml", 2)]
+    assert hits[1].text == 'trait_brave:0 "Brave"'
+    assert [h.line for h in index.search("craven no")] == [2]
+    assert [h.mod_id for h in index.search("trait_br*", mod_ids=['z'])] == ['z']
+    assert index.search("trait_brave", limit=1)[0].mod_id == 'a'
+    assert index.search("nothing_like_this") == []
+
+    # Unchanged mods are not read again
+    assert index.update(mods) == (0, 0, 0)
+
+    # Plain edits in subfolders, nothing else touched
+    edit_mod_file(mod_dirs['b'], "events/b.txt", "my_events.0001 = { trait_brave = yes }")
+    edit_mod_file(mod_dirs['a'], "common/traits/00_traits.txt", "trait_bold = {\n\tcraven = no\n}\n")
+    stats = index.update(mods[:2])
+    assert stats.mods == 2 and stats.files == 2 and stats.removed == 2   # z left the library
+    assert [h.mod_id for h in index.search("trait_brave")] == ['b']
+    assert [h.text for h in index.search("trait_bold")] == ["trait_bold = {"]
+    assert [h.path for h in index.search("my_events")] == ["events/b.txt"]
+
+
+def test_unreadable_files_are_retried(tmp_path, mod_dirs, monkeypatch):
+    mods = [{'mod_id': 'a', 'dirPath': str(mod_dirs['a'])}]
+    index = ContentIndex(tmp_path / "content_index.sqlite", ManifestStore(tmp_path / "m.sqlite"))
+    read_lines = content_index._read_lines
+
+    def flaky(reader, path):
+        if path == "events/a.txt":
+            raise OSError("locked")
+        return read_lines(reader, path)
+    monkeypatch.setattr(content_index, "_read_lines", flaky)
+    assert index.update(mods).files == 2
+    assert [h.path for h in index.search("a")] == ["common/traits/00_traits.txt"]
+
+    monkeypatch.setattr(content_index, "_read_lines", read_lines)
+    # Only the file that failed is read again
+    assert index.update(mods) == (1, 1, 0)
+    assert [h.path for h in index.search("a")] == ["common/traits/00_traits.txt", "events/a.txt"]
+
+
+def test_hit_text_is_read_up_to_the_hit_only(tmp_path, monkeypatch):
+    root = tmp_path / "big"
+    (root / "common").mkdir(parents=True)
+    # BOM, CRLF line ends and a lone \r (not a line break), then lines that never need to be read
+    (root / "common" / "big.txt").write_bytes(b"\xef\xbb\xbfhead = {\r\n\rtrait_brave = {}\r\n" + b"filler = {}\n" * 100_000)
+    mods = [{'mod_id': 'big', 'dirPath': str(root)}]
+    index = ContentIndex(tmp_path / "content_index.sqlite", ManifestStore(tmp_path / "m.sqlite"))
+    index.update(mods)
+
+    positions = []
+    open_file = ModReader.open
+
+    def tracked_open(self, rel_path):
+        f = open_file(self, rel_path)
+        close = f.close
+        f.close = lambda: (positions.append(f.tell()), close())
+        return f
+    monkeypatch.setattr(ModReader, "open", tracked_open)
+    hits = index.search("head")
+    hits += index.search("trait_brave")
+    assert [(h.line, h.text) for h in hits] == [(1, "head = {"), (2, "trait_brave = {}")]
+    assert positions and max(positions) < 100_000
+
+
+def test_cli_search_updates_by_default(tmp_path, launcher_db_path, mod_dirs, edit_mod_file, monkeypatch, capsys):
+    monkeypatch.setattr(content_index, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(snapshots, "CACHE_DIR", tmp_path / "cache")
+    search = ["--db", str(launcher_db_path), "search", "trait_bold"]
+    cli.main(search)
+    assert "0 hits" in capsys.readouterr().out
+
+    edit_mod_file(mod_dirs['c'], "history/c.txt", "trait_bold = yes")
+    cli.main([*search, "--no-update"])
+    assert "0 hits" in capsys.readouterr().out
+    cli.main(search)
+    assert "Mod C: history/c.txt:1: trait_bold = yes" in capsys.readouterr().out
@@ -0,0 +1,72 @@
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from ck3_mod_manager.gui.db_worker import DBClient
+
+
+@pytest.fixture
+def client(launcher_db_path):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    client = DBClient(launcher_db_path)
+    yield client
+    client.stop()
+
+
+def _wait(request, timeout_ms=5000):
+    results = []
+    loop = QEventLoop()
+    request.finished.connect(lambda result: (results.append(result), loop.quit()))
+    request.failed.connect(lambda error: (results.append(error), loop.quit()))
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec()
+    assert results, "request timed out"
+    return results[0]
+
+
+def test_calls_run_off_the_calling_thread(client, monkeypatch):
+    from ck3_mod_manager.database.launcher_db import LauncherDB
+    seen = []
+    original = LauncherDB.get_playsets
+    monkeypatch.setattr(LauncherDB, "get_playsets",
+                        lambda self: seen.append(threading.get_ident()) or original(self))
+
+    playsets = _wait(client.submit("get_playsets"))
+
+    assert [p['name'] for p in playsets] == ["Main", "Other"]
+    assert seen and seen[0] != threading.get_ident()
+
+
+def test_identical_reads_are_coalesced(client):
+    results = {}
+    first = client.submit("get_mods_for_playset", "main", callback=lambda r: results.setdefault("first", r))
+    second = client.submit("get_mods_for_playset", "main")
+    other = client.submit("get_mods_for_playset", "other")
+    assert first is second
+    assert other is not first
+
+    # A write queued in between must not be skipped by a later read
+    client.submit("update_playset_mods", "main", [{'mod_id': 'b', 'enabled': 1}, {'mod_id': 'a', 'enabled': 0}])
+    third = client.submit("get_mods_for_playset", "main", callback=lambda r: results.setdefault("third", r))
+    assert third is not first
+
+    _wait(client.submit("get_playsets"))  # queued last, so everything above has run
+    assert [m['mod_id'] for m in results["first"]] == ["a", "b", "c"]
+    assert [(m['mod_id'], m['enabled']) for m in results["third"]][:2] == [("b", 1), ("a", 0)]
+
+
+def test_errors_are_reported(client):
+    error = _wait(client.submit("get_mods_for_playset"))
+    assert isinstance(error, TypeError)
+
+
+def test_run_sees_earlier_writes(client):
+    client.submit("set_active_playset", "other")
+    result = _wait(client.run(lambda db, key: (key, db.get_active_playset()['id']), "active"))
+    assert result == ("active", "other")
@@ -0,0 +1,99 @@
+import shutil
+import zipfile
+
+import pytest
+
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.dedup import _Candidate, find_duplicates
+
+
+def _write_mod(root, files):
+    for rel_path, content in files.items():
+        target = root / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content)
+    return root
+
+
+def _zip_mod(path, files):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for rel_path, content in files.items():
+            zf.writestr(rel_path, content)
+    return path
+
+
+FILES = {"common/traits/00_traits.txt": "brave = {}", "events/birth.txt": "namespace = birth"}
+
+
+def test_detects_directory_copies(tmp_path):
+    original = _write_mod(tmp_path / "workshop" / "123", FILES)
+    copy = tmp_path / "local" / "fork"
+    shutil.copytree(original, copy)
+    # Same paths and sizes, different content: only the hash stage can tell
+    tweaked = _write_mod(tmp_path / "local" / "tweaked", {**FILES, "events/birth.txt": "namespace = bIrth"})
+
+    mods = [
+        {'mod_id': '1', 'name': 'Original', 'dirPath': str(original)},
+        {'mod_id': '2', 'name': 'Fork', 'dirPath': str(copy)},
+        {'mod_id': '3', 'name': 'Tweaked', 'dirPath': str(tweaked)},
+        {'mod_id': '4', 'name': 'Alias of Original', 'dirPath': str(original)},
+    ]
+    report = find_duplicates(mods)
+
+    assert report.mods_scanned == 3
+    assert len(report.groups) == 1
+    group = report.groups[0]
+    assert [m['mod_id'] for m in group.mods] == ['1', '2']
+    assert group.confirmed_by == "hash"
+    assert group.reclaimable == sum(len(c) for c in FILES.values())
+    assert report.redundant_files == 2
+
+
+def test_zip_copies_can_be_confirmed_by_crc(tmp_path, monkeypatch):
+    a = _zip_mod(tmp_path / "a.zip", FILES)
+    b = _zip_mod(tmp_path / "b.zip", FILES)
+    c = _zip_mod(tmp_path / "c.zip", {**FILES, "events/birth.txt": "namespace = bIrth"})
+    mods = [{'mod_id': str(i), 'archivePath': str(p)} for i, p in enumerate((a, b, c))]
+
+    fast = find_duplicates(mods, verify=False)
+    assert [[m['mod_id'] for m in g.mods] for g in fast.groups] == [['0', '1']]
+    assert fast.groups[0].confirmed_by == "crc"
+    assert fast.reclaimable_bytes == b.stat().st_size
+
+    # Matching CRCs are not hashed again when verifying either
+    monkeypatch.setattr(_Candidate, "file_hash", lambda self, rel_path: pytest.fail("hashed a CRC-confirmed file"))
+    assert find_duplicates(mods).groups[0].confirmed_by == "crc"
+
+
+def test_fast_mode_trusts_sizes_without_crcs(tmp_path):
+    a = _write_mod(tmp_path / "a", FILES)
+    b = _write_mod(tmp_path / "b", {**FILES, "events/birth.txt": "namespace = bIrth"})
+    mods = [{'mod_id': '1', 'dirPath': str(a)}, {'mod_id': '2', 'dirPath': str(b)}]
+    assert [g.confirmed_by for g in find_duplicates(mods, verify=False).groups] == ["size"]
+    assert find_duplicates(mods).groups == []
+
+
+def test_unreadable_copies_are_dropped(tmp_path):
+    original = _write_mod(tmp_path / "original", FILES)
+    copies = [shutil.copytree(original, tmp_path / f"copy{i}") for i in range(2)]
+    archive = _zip_mod(tmp_path / "copy.zip", FILES)
+    mods = [{'mod_id': '1', 'dirPath': str(original)}, {'mod_id': '2', 'dirPath': str(copies[0])},
+            {'mod_id': '3', 'dirPath': str(copies[1])}, {'mod_id': '4', 'archivePath': str(archive)}]
+    analyzer = ModAnalyzer()
+    for mod in mods:
+        analyzer.get_mod_manifest(mod)
+    # Changed on disk after the scan: one file gone, one archive damaged
+    (copies[1] / "events" / "birth.txt").unlink()
+    archive.write_bytes(b"not a zip")
+
+    report = find_duplicates(mods, analyzer)
+    assert [[m['mod_id'] for m in g.mods] for g in report.groups] == [['1', '2']]
+    assert sorted(m['mod_id'] for m in report.unreadable) == ['3', '4']
+
+
+def test_no_duplicates(tmp_path):
+    a = _write_mod(tmp_path / "a", FILES)
+    b = _write_mod(tmp_path / "b", {"common/other.txt": "x"})
+    report = find_duplicates([{'mod_id': '1', 'dirPath': str(a)}, {'mod_id': '2', 'dirPath': str(b)}])
+    assert report.groups == []
+    assert report.reclaimable_bytes == 0
@@ -0,0 +1,87 @@
+import zipfile
+
+import pytest
+
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.diffing import DiffCache, diff_file
+
+TRAITS = "﻿trait_a = {\n\tcost = 10\n}\ntrait_b = {\n\tcost = 20\n}\n"
+
+
+def _mods(tmp_path):
+    root = tmp_path / "dir_mod"
+    (root / "common" / "traits").mkdir(parents=True)
+    (root / "common" / "traits" / "00_traits.txt").write_text(TRAITS, encoding="utf-8")
+    archive = tmp_path / "zip_mod.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("common/traits/00_traits.txt", TRAITS.replace("cost = 20", "cost = 25"))
+        zf.writestr("gfx/icon.dds", b"DDS \0\0\0\x7c")
+    (root / "gfx").mkdir()
+    (root / "gfx" / "icon.dds").write_bytes(b"DDS \0\0\0\x00")
+    return ({'mod_id': '1', 'name': 'Dir Mod', 'dirPath': str(root)},
+            {'mod_id': '2', 'name': 'Zip Mod', 'archivePath': str(archive)})
+
+
+def test_diff_between_directory_and_archive(tmp_path):
+    old, new = _mods(tmp_path)
+    diff = diff_file(old, new, "common/traits/00_traits.txt")
+
+    assert (diff.added, diff.removed) == (1, 1)
+    assert "-\tcost = 20" in diff.lines and "+\tcost = 25" in diff.lines
+    assert diff.lines[0] == "--- Dir Mod/common/traits/00_traits.txt"
+    assert not diff.truncated and not diff.binary
+
+    assert diff_file(old, new, "gfx/icon.dds").binary
+    assert diff_file(old, old, "common/traits/00_traits.txt").lines == []
+
+
+def test_large_files_are_capped(tmp_path):
+    old, new = _mods(tmp_path)
+    big = tmp_path / "dir_mod" / "common" / "big.txt"
+    big.write_text("line\n" * 10000)
+    diff = diff_file(old, {'mod_id': '3', 'name': 'Empty', 'dirPath': str(tmp_path / "dir_mod")},
+                     "common/big.txt", max_bytes=100)
+    assert diff.lines == []  # identical within the cap
+
+    other = tmp_path / "other" / "common"
+    other.mkdir(parents=True)
+    (other / "big.txt").write_text("x\n" * 10000)
+    diff = diff_file(old, {'mod_id': '4', 'name': 'Other', 'dirPath': str(other.parent)},
+                     "common/big.txt", max_bytes=100, max_lines=10)
+    assert diff.truncated
+    assert len(diff.lines) == 10
+    assert diff.removed == 20  # "line\n" * 20 fits in 100 bytes
+
+
+def test_cache_reuses_and_evicts(tmp_path):
+    old, new = _mods(tmp_path)
+    analyzer = ModAnalyzer()
+    cache = DiffCache(analyzer, max_entries=1)
+
+    first = cache.diff(old, new, "common/traits/00_traits.txt")
+    assert cache.diff(old, new, "common/traits/00_traits.txt") is first
+
+    # A changed file gets a new key once its manifest is rescanned
+    (tmp_path / "dir_mod" / "common" / "traits" / "00_traits.txt").write_text(TRAITS + "trait_c = {}\n")
+    analyzer.invalidate('1')
+    changed = cache.diff(old, new, "common/traits/00_traits.txt")
+    assert changed is not first and changed.removed == 2
+
+    cache.diff(old, new, "gfx/icon.dds")
+    assert cache.get(cache.key(old, new, "common/traits/00_traits.txt")) is None
+
+
+def test_worker_reports_read_errors():
+    pytest.importorskip("PySide6")
+    import zlib
+    from ck3_mod_manager.gui.diff_view import DiffWorker
+
+    class BrokenCache:
+        def diff(self, *request):
+            raise zlib.error("invalid stored block lengths")
+
+    worker = DiffWorker(BrokenCache(), ({}, {}, "common/a.txt"))
+    results = []
+    worker.finished.connect(lambda request, result: results.append(result))
+    worker.run()
+    assert len(results) == 1 and isinstance(results[0], zlib.error)
@@ -0,0 +1,85 @@
+import json
+import sqlite3
+
+from ck3_mod_manager.database.launcher_db import LauncherDB
+from ck3_mod_manager.loader.dlc_sync import DlcLoadSync
+from ck3_mod_manager.loader.mod_loader import ModLoader
+
+
+def _documents(tmp_path, mod_dirs):
+    """Documents folder with descriptors for a (absolute path), b (relative path) and c."""
+    (tmp_path / "mod").mkdir()
+    (tmp_path / "mod" / "a.mod").write_text(f'name="Mod A"\npath="{mod_dirs["a"].as_posix()}"')
+    (tmp_path / "mod" / "ugc_2.mod").write_text('name="Mod B"\npath="mods/b"\nremote_file_id="2"')
+    (tmp_path / "mod" / "c.mod").write_text(f'name="Mod C"\npath="{mod_dirs["c"].as_posix()}"')
+    return tmp_path
+
+
+def test_sync_writes_active_playset(tmp_path, mod_dirs, launcher_db_path):
+    documents = _documents(tmp_path, mod_dirs)
+    (documents / "dlc_load.json").write_text(json.dumps({"disabled_dlcs": ["dlc/dlc001.dlc"], "enabled_mods": []}))
+    db = LauncherDB(launcher_db_path)
+    db.connect()
+    sync = DlcLoadSync(documents)
+
+    result = sync.sync(db)
+    assert result.written
+    assert result.added == ["mod/a.mod", "mod/ugc_2.mod"]
+    data = json.loads((documents / "dlc_load.json").read_text())
+    assert data == {"disabled_dlcs": ["dlc/dlc001.dlc"], "enabled_mods": ["mod/a.mod", "mod/ugc_2.mod"]}
+
+    # Nothing changed: the file is left alone
+    mtime = (documents / "dlc_load.json").stat().st_mtime_ns
+    assert not sync.sync(db).written
+    assert (documents / "dlc_load.json").stat().st_mtime_ns == mtime
+
+    db.update_playset_mods("main", [{'mod_id': 'b', 'enabled': 1}, {'mod_id': 'a', 'enabled': 1},
+                                    {'mod_id': 'c', 'enabled': 0}])
+    result = sync.sync(db, dry_run=True)
+    assert result.reordered and not result.written
+    result = sync.sync(db)
+    assert result.written
+    assert json.loads((documents / "dlc_load.json").read_text())["enabled_mods"] == ["mod/ugc_2.mod", "mod/a.mod"]
+    db.close()
+
+
+def test_unresolved_and_steam_lookup(tmp_path, mod_dirs):
+    documents = _documents(tmp_path, mod_dirs)
+    mods = [
+        {'mod_id': 'x', 'steamId': '2', 'dirPath': "/elsewhere/b", 'enabled': 1},
+        {'mod_id': 'y', 'dirPath': str(tmp_path / "workshop" / "1158310" / "2"), 'enabled': 1},
+        {'mod_id': 'z', 'dirPath': str(tmp_path / "unknown"), 'enabled': 1},
+    ]
+    result = DlcLoadSync(documents).sync_mods(mods)
+    # Both rows point at the same descriptor; it is listed once
+    assert result.enabled_mods == ["mod/ugc_2.mod"]
+    assert [m['mod_id'] for m in result.unresolved] == ['z']
+    assert json.loads((documents / "dlc_load.json").read_text())["disabled_dlcs"] == []
+
+
+def test_sync_resolves_by_steam_id_from_the_db(tmp_path, mod_dirs, launcher_db_path):
+    documents = _documents(tmp_path, mod_dirs)
+    # Mod B's content moved; only its workshop id still ties it to mod/ugc_2.mod
+    conn = sqlite3.connect(launcher_db_path)
+    conn.execute("UPDATE mods SET dirPath = ?, steamId = '2' WHERE id = 'b'", (str(tmp_path / "moved"),))
+    conn.commit()
+    conn.close()
+    db = LauncherDB(launcher_db_path)
+    db.connect()
+
+    result = DlcLoadSync(documents).sync(db)
+    assert result.enabled_mods == ["mod/a.mod", "mod/ugc_2.mod"]
+    assert result.unresolved == []
+    db.close()
+
+
+def test_mod_loader_keeps_disabled_dlcs(tmp_path):
+    (tmp_path / "dlc_load.json").write_text(json.dumps({"disabled_dlcs": ["dlc/dlc002.dlc"], "enabled_mods": []}))
+    loader = ModLoader()
+    loader.documents_path = tmp_path
+    loader.save_load_order([
+        {'descriptor_path': str(tmp_path / "mod" / "a.mod"), 'enabled': True},
+        {'descriptor_path': str(tmp_path / "mod" / "b.mod"), 'enabled': False},
+    ])
+    data = json.loads((tmp_path / "dlc_load.json").read_text())
+    assert data == {"disabled_dlcs": ["dlc/dlc002.dlc"], "enabled_mods": ["mod/a.mod"]}
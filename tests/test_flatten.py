@@ -0,0 +1,113 @@
+import json
+import zipfile
+
+import pytest
+
+from ck3_mod_manager.flatten import FLATTEN_MANIFEST, flatten_playset
+
+
+def _make_mods(tmp_path):
+    base = tmp_path / "base"
+    (base / "common" / "traits").mkdir(parents=True)
+    (base / "common" / "traits" / "00_traits.txt").write_text("base traits")
+    (base / "events").mkdir()
+    (base / "events" / "birth.txt").write_text("base events")
+
+    patch = tmp_path / "patch.zip"
+    with zipfile.ZipFile(patch, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("common/traits/00_traits.txt", "patched traits")
+        zf.writestr("descriptor.mod", 'name="Patch"')
+
+    return [
+        {'mod_id': 'base', 'name': 'Base', 'dirPath': str(base), 'enabled': 1},
+        {'mod_id': 'off', 'name': 'Off', 'dirPath': str(base), 'enabled': 0},
+        {'mod_id': 'patch', 'name': 'Patch', 'archivePath': str(patch), 'enabled': 1},
+    ]
+
+
+def test_flatten_directory_uses_load_order_winner(tmp_path):
+    mods = _make_mods(tmp_path)
+    out = tmp_path / "out" / "flat"
+
+    result = flatten_playset(mods, out, name="Flat")
+
+    assert result.written == 2
+    assert (out / "common" / "traits" / "00_traits.txt").read_text() == "patched traits"
+    assert (out / "events" / "birth.txt").read_text() == "base events"
+    assert 'name="Flat"' in (out / "descriptor.mod").read_text()
+    assert f'path="{out.resolve().as_posix()}"' in (tmp_path / "out" / "flat.mod").read_text()
+
+
+def test_reflatten_only_copies_changes(tmp_path):
+    mods = _make_mods(tmp_path)
+    out = tmp_path / "flat"
+    flatten_playset(mods, out)
+
+    assert flatten_playset(mods, out).written == 0
+
+    mods[0]['enabled'] = 0  # base no longer contributes events/birth.txt
+    result = flatten_playset(mods, out)
+    assert (result.written, result.skipped, result.removed) == (0, 1, 1)
+    assert not (out / "events" / "birth.txt").exists()
+    assert list(json.loads((out / FLATTEN_MANIFEST).read_text())['files']) == ["common/traits/00_traits.txt"]
+
+
+def test_flatten_zip(tmp_path):
+    mods = _make_mods(tmp_path)
+    out = tmp_path / "flat.zip"
+
+    result = flatten_playset(mods, out, as_zip=True)
+
+    assert result.written == 2
+    with zipfile.ZipFile(out) as zf:
+        assert zf.read("common/traits/00_traits.txt") == b"patched traits"
+        assert all(info.compress_type == zipfile.ZIP_STORED for info in zf.infolist())
+    assert 'archive="' in (tmp_path / "flat.mod").read_text()
+    assert flatten_playset(mods, out, as_zip=True).written == 0
+
+
+def test_zip_is_rebuilt_when_only_the_mod_list_changes(tmp_path):
+    mods = _make_mods(tmp_path)
+    out = tmp_path / "flat.zip"
+    flatten_playset(mods, out, as_zip=True)
+
+    # Same files win, but the playset now lists a newer version of Patch
+    mods[2]['version'] = "2.0"
+    assert flatten_playset(mods, out, as_zip=True).written == 2
+    assert flatten_playset(mods, out, as_zip=True).written == 0
+    assert flatten_playset(mods, out, as_zip=True, name="Renamed").written == 2
+    with zipfile.ZipFile(out) as zf:
+        assert 'name="Renamed"' in zf.read("descriptor.mod").decode()
+
+
+def test_members_outside_the_output_are_skipped(tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    hostile = tmp_path / "hostile.zip"
+    with zipfile.ZipFile(hostile, "w") as zf:
+        zf.writestr((outside / "absolute.txt").as_posix(), "x")
+        zf.writestr("linked/through_symlink.txt", "x")
+        zf.writestr("events/ok.txt", "ok")
+    mods = [{'mod_id': 'h', 'archivePath': str(hostile), 'enabled': 1}]
+    out = tmp_path / "flat"
+    out.mkdir()
+    try:
+        (out / "linked").symlink_to(outside, target_is_directory=True)
+    except OSError:
+        pytest.skip("symlinks not supported here")
+
+    result = flatten_playset(mods, out)
+    assert result.written == 1
+    assert list(outside.iterdir()) == []
+    assert list(json.loads((out / FLATTEN_MANIFEST).read_text())['files']) == ["events/ok.txt"]
+
+
+def test_removed_files_leave_no_empty_folders(tmp_path):
+    mods = _make_mods(tmp_path)
+    out = tmp_path / "flat"
+    flatten_playset(mods, out)
+
+    mods[0]['enabled'] = 0
+    flatten_playset(mods, out)
+    assert not (out / "events").exists()
+    assert (out / "common" / "traits").is_dir()
@@ -0,0 +1,94 @@
+import zipfile
+
+import pytest
+
+import ck3_mod_manager.health as health
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.health import ERROR, WARNING, HealthChecker
+from ck3_mod_manager.snapshots import ManifestStore
+
+
+def _dir_mod(root, name="Test Mod", version="1.0"):
+    (root / "common").mkdir(parents=True)
+    (root / "common" / "a.txt").write_text("a")
+    (root / "descriptor.mod").write_text(f'version="{version}"\nname="{name}"\nsupported_version="1.12.*"\n')
+    return root
+
+
+def _zip_mod(path, name="Zip Mod"):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("descriptor.mod", f'name="{name}"')
+        zf.writestr("common/a.txt", "a" * 1000)
+    return path
+
+
+def test_healthy_playset(tmp_path):
+    mods = [
+        {'mod_id': '1', 'name': 'Test Mod', 'version': '1.0', 'dirPath': str(_dir_mod(tmp_path / "a")), 'enabled': 1},
+        {'mod_id': '2', 'name': 'Zip Mod', 'archivePath': str(_zip_mod(tmp_path / "b.zip")), 'enabled': 1},
+        {'mod_id': '3', 'name': 'Disabled', 'dirPath': str(tmp_path / "gone"), 'enabled': 0},
+    ]
+    assert HealthChecker().check(mods, verify_crc=True) == []
+
+
+def test_missing_and_damaged_mods(tmp_path):
+    archive = _zip_mod(tmp_path / "b.zip")
+    archive.write_bytes(archive.read_bytes()[:-30])  # truncated download
+    mods = [
+        {'mod_id': '1', 'name': 'Gone', 'dirPath': str(tmp_path / "gone")},
+        {'mod_id': '2', 'name': 'Zip Mod', 'archivePath': str(archive)},
+        {'mod_id': '3', 'name': 'Renamed', 'version': '2.0', 'dirPath': str(_dir_mod(tmp_path / "c"))},
+    ]
+
+    issues = HealthChecker().check(mods)
+
+    assert [(i.mod['mod_id'], i.severity) for i in issues] == [
+        ('1', ERROR), ('2', ERROR), ('3', WARNING), ('3', WARNING)]
+    assert "does not match launcher name 'Renamed'" in issues[2].message
+
+
+def test_warm_check_only_stats(tmp_path, monkeypatch):
+    mods = [{'mod_id': str(i), 'name': 'Zip Mod', 'archivePath': str(_zip_mod(tmp_path / f"{i}.zip"))}
+            for i in range(20)]
+    checker = HealthChecker()
+    assert checker.check(mods) == []
+
+    calls = []
+    monkeypatch.setattr(health, "read_zip_entries", lambda path: calls.append(path))
+    assert checker.check(mods) == []
+    assert calls == []
+
+    # A replaced archive is checked again
+    (tmp_path / "3.zip").write_bytes(b"not a zip anymore")
+    monkeypatch.undo()
+    issues = checker.check(mods)
+    assert [i.mod['mod_id'] for i in issues] == ['3']
+
+
+def test_recheck_after_edit_in_subfolder(tmp_path, edit_mod_file, monkeypatch):
+    root = _dir_mod(tmp_path / "a")
+    mods = [{'mod_id': '1', 'name': 'Test Mod', 'version': '1.0', 'dirPath': str(root)}]
+    analyzer = ModAnalyzer(ManifestStore(tmp_path / "manifests.sqlite"))
+    analyzer.rescan(mods)
+    checker = HealthChecker(analyzer)
+    assert checker.check(mods) == []
+
+    # Warm checks of folder mods never walk their trees
+    monkeypatch.setattr("ck3_mod_manager.manifest.tree_stat_token", lambda root: pytest.fail("tree walk"))
+    assert checker.check(mods) == []
+    monkeypatch.undo()
+
+    # The mod's only content file goes away; the directory and descriptor stay as they are.
+    # Once a rescan records the new snapshot version, the mod is checked again.
+    edit_mod_file(root, "common/a.txt", None)
+    analyzer.rescan(mods)
+    assert [i.message for i in checker.check(mods)] == ["Mod contains no files"]
+
+
+def test_descriptor_read_from_parsed_entries(tmp_path, monkeypatch):
+    mods = [{'mod_id': '1', 'name': 'Other Name', 'archivePath': str(_zip_mod(tmp_path / "b.zip"))}]
+    # No ZipFile is opened without verify_crc
+    monkeypatch.setattr(health.zipfile, "ZipFile", None)
+    issues = HealthChecker().check(mods)
+    assert [i.severity for i in issues] == [WARNING]
+    assert "Descriptor name 'Zip Mod'" in issues[0].message
@@ -1,6 +1,8 @@
-from ck3_mod_manager.database.launcher_db import LauncherDB
+from ck3_mod_manager.database.launcher_db import LauncherDB, ConcurrentModificationError
 import pytest
 import os
+import sqlite3
+import threading
 
 # Skip if DB doesn't exist (e.g. CI environment), but here we know it exists.
 # We will use the actual DB for read tests, but avoid writing to it to not mess up user's data.
@@ -25,3 +27,95 @@ def test_launcher_db_read():
         assert isinstance(mods, list)
     
     db.close()
+
+
+def test_set_active_playset(launcher_db_path):
+    db = LauncherDB(launcher_db_path)
+    db.connect()
+
+    assert db.set_active_playset("other") is True
+    assert db.get_active_playset()['id'] == "other"
+    assert db.set_active_playset("missing") is False
+    assert db.get_active_playset()['id'] == "other"
+    db.close()
+
+
+def test_update_playset_mods_detects_concurrent_changes(launcher_db_path):
+    db = LauncherDB(launcher_db_path)
+    db.connect()
+    snapshot = db.get_playset_snapshot("main")
+
+    db.update_playset_mods("main", [{'mod_id': 'b', 'enabled': 1}, {'mod_id': 'a', 'enabled': 1},
+                                    {'mod_id': 'c', 'enabled': 1}], expected=snapshot)
+    assert [m['mod_id'] for m in db.get_mods_for_playset("main")] == ["b", "a", "c"]
+
+    # The launcher changes the playset behind our back
+    conn = sqlite3.connect(launcher_db_path)
+    conn.execute("INSERT INTO mods (id, name) VALUES ('d', 'Mod D')")
+    conn.commit()
+    conn.close()
+    other = LauncherDB(launcher_db_path)
+    other.connect()
+    other.add_mod_to_playset("main", "d")
+    other.close()
+
+    stale = db.get_playset_snapshot("main")[:3]
+    with pytest.raises(ConcurrentModificationError):
+        db.update_playset_mods("main", [{'mod_id': 'a', 'enabled': 0}], expected=stale)
+    assert db.get_mods_for_playset("main")[1]['enabled'] == 1
+    db.close()
+
+
+def test_orphan_rows_do_not_block_saves(launcher_db_path):
+    # The launcher removed mod 'x' from the library but left its playset row behind
+    conn = sqlite3.connect(launcher_db_path)
+    conn.execute("INSERT INTO playsets_mods VALUES ('main', 'x', 1, 3)")
+    conn.commit()
+    conn.close()
+
+    db = LauncherDB(launcher_db_path)
+    db.connect()
+    mods = db.get_mods_for_playset("main")
+    # What the editor keeps when it loads the playset
+    loaded = sorted(((m.mod_id, m.enabled, m.position) for m in mods), key=lambda row: (row[2], row[0]))
+    assert db.get_playset_snapshot("main") == loaded
+
+    db.update_playset_mods("main", [{'mod_id': 'b', 'enabled': 1}, {'mod_id': 'a', 'enabled': 1},
+                                    {'mod_id': 'c', 'enabled': 0}], expected=loaded)
+    assert [m.mod_id for m in db.get_mods_for_playset("main")] == ["b", "a", "c"]
+    db.close()
+
+
+def test_writes_wait_for_the_launcher_lock(launcher_db_path, monkeypatch):
+    import ck3_mod_manager.database.launcher_db as launcher_db
+    monkeypatch.setattr(launcher_db, "BUSY_TIMEOUT_MS", 50)
+
+    launcher = sqlite3.connect(launcher_db_path, isolation_level=None, check_same_thread=False)
+    launcher.execute("BEGIN IMMEDIATE")
+    timer = threading.Timer(0.2, launcher.execute, ("COMMIT",))
+    timer.start()
+
+    db = LauncherDB(launcher_db_path)
+    db.connect()
+    # First attempts hit the busy timeout; a retry succeeds once the launcher commits
+    assert db.add_mod_to_playset("other", "a") is True
+    timer.join()
+    launcher.close()
+    db.close()
+
+
+def test_writes_give_up_eventually(launcher_db_path, monkeypatch):
+    import ck3_mod_manager.database.launcher_db as launcher_db
+    monkeypatch.setattr(launcher_db, "BUSY_TIMEOUT_MS", 10)
+    monkeypatch.setattr(launcher_db, "WRITE_RETRIES", 2)
+
+    launcher = sqlite3.connect(launcher_db_path, isolation_level=None)
+    launcher.execute("BEGIN IMMEDIATE")
+    db = LauncherDB(launcher_db_path)
+    db.connect()
+    with pytest.raises(sqlite3.OperationalError):
+        db.set_active_playset("other")
+    assert not db.conn.in_transaction
+    launcher.execute("ROLLBACK")
+    launcher.close()
+    db.close()
@@ -0,0 +1,62 @@
+import zipfile
+
+import pytest
+
+from ck3_mod_manager.manifest import ModReader, scan_mod
+
+
+def test_scan_directory_and_archive(tmp_path):
+    mod_dir = tmp_path / "mod"
+    (mod_dir / "common" / "traits").mkdir(parents=True)
+    (mod_dir / "common" / "traits" / "00_traits.txt").write_text("loose")
+    (mod_dir / "descriptor.mod").write_text('name="Test"')
+    (mod_dir / ".DS_Store").write_text("")
+
+    archive = tmp_path / "mod.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("common\\traits\\00_traits.txt", "zipped")
+        zf.writestr("events/birth.txt", "event")
+        zf.writestr("gfx/", "")
+        zf.writestr(".DS_Store", "")
+        zf.writestr("__MACOSX/events/.birth.txt", "")
+
+    manifest = scan_mod({'dirPath': str(mod_dir), 'archivePath': str(archive)})
+
+    assert sorted(manifest) == ["common/traits/00_traits.txt", "events/birth.txt"]
+    # Loose files override archive members
+    assert manifest["common/traits/00_traits.txt"].crc is None
+    assert manifest["common/traits/00_traits.txt"].size == 5
+    assert manifest["events/birth.txt"].crc == zipfile.crc32(b"event")
+
+
+def test_symlinked_directories_are_not_followed(tmp_path):
+    mod_dir = tmp_path / "mod"
+    (mod_dir / "events").mkdir(parents=True)
+    (mod_dir / "events" / "birth.txt").write_text("event")
+    (mod_dir / "shared.txt").write_text("shared")
+    try:
+        (mod_dir / "events" / "loop").symlink_to(mod_dir, target_is_directory=True)
+        (mod_dir / "linked.txt").symlink_to(mod_dir / "shared.txt")
+    except OSError:
+        pytest.skip("symlinks not supported here")
+
+    assert sorted(scan_mod({'dirPath': str(mod_dir)})) == ["events/birth.txt", "linked.txt", "shared.txt"]
+
+
+def test_missing_paths_give_empty_manifest(tmp_path):
+    assert scan_mod({'dirPath': str(tmp_path / "gone"), 'archivePath': str(tmp_path / "gone.zip")}) == {}
+
+
+def test_reader_opens_both_sources(tmp_path):
+    mod_dir = tmp_path / "mod"
+    mod_dir.mkdir()
+    (mod_dir / "a.txt").write_text("from dir")
+    archive = tmp_path / "mod.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("sub\\b.txt", "from zip")
+
+    with ModReader({'dirPath': str(mod_dir), 'archivePath': str(archive)}) as reader:
+        with reader.open("a.txt") as f:
+            assert f.read() == b"from dir"
+        with reader.open("sub/b.txt") as f:
+            assert f.read() == b"from zip"
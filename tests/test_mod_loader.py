@@ -32,3 +32,9 @@ def test_parse_simple_mod_file(tmp_path):
     assert result is not None
     assert result['name'] == "Simple Mod"
     # Should handle missing fields gracefully
+
+def test_replace_path_is_not_the_mod_path():
+    from ck3_mod_manager.loader.mod_loader import parse_descriptor
+    descriptor = parse_descriptor('name="Overhaul"\nreplace_path="history/titles"\npath="mod/overhaul"')
+    assert descriptor['path'] == "mod/overhaul"
+    assert 'path' not in parse_descriptor('name="Overhaul"\nreplace_path="common/bookmarks"')
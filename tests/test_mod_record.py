@@ -0,0 +1,53 @@
+import sqlite3
+
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.database.launcher_db import LauncherDB
+from ck3_mod_manager.database.mod_record import ModRecord, PlaysetMod, mod_label
+
+
+def test_rows_share_one_record_per_mod(launcher_db_path, mod_dirs):
+    db = LauncherDB(launcher_db_path)
+    db.connect()
+    library = {m.mod_id: m for m in db.get_all_mods()}
+    playset = db.get_mods_for_playset("main")
+
+    assert [m.record for m in playset] == [library['a'], library['b'], library['c']]
+    assert all(m.record is library[m.mod_id] for m in playset)
+    assert [(m.enabled, m.position) for m in playset] == [(1, 0), (1, 1), (0, 2)]
+
+    # A changed row replaces its record; holders of the old one see no partial update
+    conn = sqlite3.connect(launcher_db_path)
+    conn.execute("UPDATE mods SET version = '2.0', dirPath = '/moved/a' WHERE id = 'a'")
+    conn.commit()
+    conn.close()
+    reread = {m.mod_id: m for m in db.get_all_mods()}
+    assert (reread['a'].version, reread['a'].dirPath) == ("2.0", "/moved/a")
+    assert (library['a'].version, library['a'].dirPath) == ("1.0", str(mod_dirs['a']))
+    assert db.registry.get('a') is reread['a'] and db.get_mods_for_playset("main")[0].record is reread['a']
+    assert reread['b'] is library['b']
+    assert len(db.registry) == 3
+    db.close()
+
+
+def test_dict_style_access():
+    record = ModRecord("1", displayName=None, name="Mod One", dirPath="/mods/one")
+    entry = PlaysetMod(record, enabled=0, position=4)
+
+    assert record.label == mod_label(record) == "Mod One"
+    assert ModRecord("2").label == "Unknown Mod" and mod_label(ModRecord("2"), "2") == "2"
+    assert record['dirPath'] == record.get('dirPath') == "/mods/one"
+    assert record.get('enabled', 1) == 1
+    assert entry.get('enabled') == 0 and entry['position'] == 4
+    assert entry.label == "Mod One" and entry.dirPath == "/mods/one"
+    assert dict(entry) == entry.to_dict()
+    assert entry.to_dict()['mod_id'] == "1"
+
+
+def test_conflicts_by_id_with_duplicate_names(mod_dirs):
+    # Two different mods with the same display name stay distinguishable
+    mods = [ModRecord('a', "Same", dirPath=str(mod_dirs['a'])),
+            ModRecord('b', "Same", dirPath=str(mod_dirs['b']))]
+    analyzer = ModAnalyzer()
+
+    assert analyzer.analyze_conflicts_by_id(mods) == {"common/traits/00_traits.txt": ['a', 'b']}
+    assert analyzer.analyze_conflicts(mods)["common/traits/00_traits.txt"] == ["Same", "Same"]
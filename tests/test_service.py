@@ -0,0 +1,124 @@
+import socket
+import threading
+
+import pytest
+
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.database.launcher_db import LauncherDB
+from ck3_mod_manager.service import (INVALID_PARAMS, METHOD_NOT_FOUND, PARSE_ERROR, ModService, ServiceAlreadyRunning,
+                                     ServiceClient, ServiceError, ServiceServer, ServiceUnavailable)
+from ck3_mod_manager.snapshots import ManifestStore
+
+
+@pytest.fixture
+def server(launcher_db_path, tmp_path):
+    db = LauncherDB(launcher_db_path)
+    db.connect(check_same_thread=False)
+    analyzer = ModAnalyzer(ManifestStore(tmp_path / "manifests.sqlite"))
+    server = ServiceServer(ModService(db, analyzer), tmp_path / "svc.sock")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+    db.close()
+
+
+def test_operations(server):
+    with ServiceClient(server.socket_path) as client:
+        assert [p['name'] for p in client.call("list_playsets")] == ["Main", "Other"]
+        assert len(client.call("list_mods")) == 3
+        assert client.call("analyze") == {"common/traits/00_traits.txt": ["Mod A", "Mod B"]}
+        assert client.call("analyze", mod_ids=["b", "c"]) == {}
+        assert client.call("query_path", path="common\\traits\\00_traits.txt") == ["a", "b"]
+        assert client.call("ping")["cached_analyses"] == 2
+
+
+def test_cached_analyses_follow_the_files(tmp_path, server, mod_dirs, edit_mod_file):
+    with ServiceClient(server.socket_path) as client:
+        first = client.call("analyze", mod_ids=["a", "b"], by_id=True, with_versions=True)
+        assert first == {"conflicts": {"common/traits/00_traits.txt": ["a", "b"]}, "versions": {"a": 1, "b": 1}}
+
+        # Nobody calls rescan or invalidate: the next analysis still sees the edit
+        edit_mod_file(mod_dirs['b'], "common/traits/00_traits.txt", None)
+        second = client.call("analyze", mod_ids=["a", "b"], by_id=True, with_versions=True)
+        assert second == {"conflicts": {}, "versions": {"a": 1, "b": 2}}
+
+        # Another process snapshots a change first; the service's cached manifest is not reused
+        edit_mod_file(mod_dirs['b'], "common/traits/00_traits.txt", "back")
+        ModAnalyzer(ManifestStore(tmp_path / "manifests.sqlite")).rescan([{'mod_id': 'b', 'dirPath': str(mod_dirs['b'])}])
+        assert client.call("analyze", mod_ids=["a", "b"], by_id=True) == {"common/traits/00_traits.txt": ["a", "b"]}
+
+
+def test_errors(server):
+    with ServiceClient(server.socket_path) as client:
+        with pytest.raises(ServiceError) as excinfo:
+            client.call("drop_tables")
+        assert excinfo.value.code == METHOD_NOT_FOUND
+        with pytest.raises(ServiceError) as excinfo:
+            client.call("analyze", bogus=1)
+        assert excinfo.value.code == INVALID_PARAMS
+        # The connection stays usable after errors
+        assert client.call("invalidate") is True
+
+
+def test_second_server_is_refused(server, launcher_db_path):
+    with pytest.raises(ServiceAlreadyRunning):
+        ServiceServer(ModService(LauncherDB(launcher_db_path)), server.socket_path)
+    assert ServiceClient.try_connect(server.socket_path) is not None
+
+
+def test_stale_socket_is_replaced(tmp_path, launcher_db_path):
+    socket_path = tmp_path / "svc.sock"
+    socket_path.write_text("left behind by a crashed service")
+    assert ServiceClient.try_connect(socket_path) is None
+
+    server = ServiceServer(ModService(LauncherDB(launcher_db_path)), socket_path)
+    server.server_close()
+    assert not socket_path.exists()
+    with pytest.raises(ServiceUnavailable):
+        ServiceClient(socket_path)
+
+
+@pytest.fixture
+def garbled_peer(tmp_path):
+    """Something listening on the socket that does not speak JSON-RPC."""
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(tmp_path / "peer.sock"))
+    listener.listen()
+
+    def answer():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            with conn, conn.makefile('rwb') as f:
+                f.readline()
+                f.write(b"<html>not a service</html>\n")
+    threading.Thread(target=answer, daemon=True).start()
+    yield tmp_path / "peer.sock"
+    listener.close()
+
+
+def test_unusable_sockets(tmp_path, garbled_peer):
+    # Not a path a socket can be bound to: no service, rather than an OSError
+    assert ServiceClient.try_connect(tmp_path / ("x" * 200) / "svc.sock") is None
+
+    with ServiceClient(garbled_peer) as client:
+        with pytest.raises(ServiceError) as excinfo:
+            client.call("ping")
+        assert excinfo.value.code == PARSE_ERROR
+
+
+def test_conflict_worker_falls_back_to_local_analysis(mod_dirs, garbled_peer, monkeypatch):
+    pytest.importorskip("PySide6")
+    from ck3_mod_manager.analyzer import ModAnalyzer
+    from ck3_mod_manager.database.mod_record import ModRecord
+    from ck3_mod_manager.gui import main_window
+
+    monkeypatch.setattr(main_window.ServiceClient, "try_connect", classmethod(lambda cls: cls(garbled_peer)))
+    mods = [ModRecord(mod_id, dirPath=str(root)) for mod_id, root in mod_dirs.items()]
+    worker = main_window.ConflictWorker(ModAnalyzer(), mods)
+    assert worker.compute(mods) == ({"common/traits/00_traits.txt": ['a', 'b']}, None)
@@ -0,0 +1,71 @@
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.snapshots import ConflictShift, ManifestStore
+
+
+def _mods(mod_dirs):
+    return [{'mod_id': mod_id, 'name': f"Mod {mod_id.upper()}", 'dirPath': str(root)}
+            for mod_id, root in mod_dirs.items()]
+
+
+def test_rescan_reports_changes_and_skips_unchanged_mods(tmp_path, mod_dirs, edit_mod_file):
+    store = ManifestStore(tmp_path / "cache" / "manifests.sqlite")
+    analyzer = ModAnalyzer(store)
+    mods = _mods(mod_dirs)
+
+    first = analyzer.rescan(mods)
+    assert [(r.mod_id, r.old_version, r.new_version) for r in first] == [('a', None, 1), ('b', None, 1),
+                                                                       ('c', None, 1)]
+    assert analyzer.rescan(mods) == []
+
+    edit_mod_file(mod_dirs['a'], "events/a.txt", "a2")
+    edit_mod_file(mod_dirs['a'], "events/new.txt", "n")
+    edit_mod_file(mod_dirs['a'], "common/traits/00_traits.txt", None)
+    # Same size and contents, newer mtime: not a modification
+    edit_mod_file(mod_dirs['c'], "history/c.txt", "c")
+    reports = analyzer.rescan(mods)
+
+    assert len(reports) == 1
+    report = reports[0]
+    assert (report.mod_id, report.name, report.old_version, report.new_version) == ('a', "Mod A", 1, 2)
+    assert report.added == ["events/new.txt"]
+    assert report.removed == ["common/traits/00_traits.txt"]
+    assert report.modified == ["events/a.txt"]
+    assert store.versions('a') == [1, 2] and store.versions('c') == [1]
+    assert analyzer.rescan(mods) == []
+
+    # Mod A no longer contests the traits file
+    assert analyzer.conflict_shifts(mods, reports) == [
+        ConflictShift("common/traits/00_traits.txt", ['a', 'b'], ['b'], False)]
+    previous = {"common/traits/00_traits.txt": ['a', 'b']}
+    assert analyzer.update_conflicts(previous, mods, report.changed_paths) == {}
+
+
+def test_rescan_sees_edits_deep_in_a_folder_mod(tmp_path, mod_dirs, edit_mod_file):
+    analyzer = ModAnalyzer(ManifestStore(tmp_path / "manifests.sqlite"))
+    mods = _mods(mod_dirs)
+    analyzer.rescan(mods)
+
+    # Nothing at the top level of the mod changes: no new entries, same descriptor
+    edit_mod_file(mod_dirs['b'], "common/traits/00_traits.txt", "x")
+    edit_mod_file(mod_dirs['b'], "gfx/icons/new.dds", "icon")
+    reports = analyzer.rescan(mods)
+
+    assert [(r.mod_id, r.added, r.removed, r.modified) for r in reports] == [
+        ('b', ["gfx/icons/new.dds"], [], ["common/traits/00_traits.txt"])]
+
+
+def test_modified_conflict_and_pruning(tmp_path, mod_dirs, edit_mod_file):
+    store = ManifestStore(tmp_path / "manifests.sqlite", max_snapshots=2)
+    analyzer = ModAnalyzer(store)
+    mods = _mods(mod_dirs)
+    analyzer.rescan(mods)
+
+    for i in range(3):
+        edit_mod_file(mod_dirs['b'], "common/traits/00_traits.txt", f"b{i}")
+        reports = analyzer.rescan(mods)
+    assert reports[0].modified == ["common/traits/00_traits.txt"]
+    assert analyzer.conflict_shifts(mods, reports) == [
+        ConflictShift("common/traits/00_traits.txt", ['a', 'b'], ['a', 'b'], True)]
+    assert store.versions('b') == [3, 4]
+    assert store.get('b', 1) is None
+    assert store.get('b').files["common/traits/00_traits.txt"].size == 2
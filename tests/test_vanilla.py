@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from ck3_mod_manager import cli
+from ck3_mod_manager.analyzer import ModAnalyzer
+from ck3_mod_manager.database.launcher_db import LauncherDB
+from ck3_mod_manager.service import ModService
+from ck3_mod_manager.vanilla import GameNotFoundError, VanillaIndex, game_version
+
+
+def _game(tmp_path, version="1.12.5"):
+    root = tmp_path / "Crusader Kings III"
+    (root / "game" / "common" / "traits").mkdir(parents=True)
+    (root / "game" / "common" / "traits" / "00_traits.txt").write_text("vanilla traits")
+    (root / "game" / "events").mkdir()
+    (root / "game" / "events" / "a.txt").write_text("a")
+    (root / "launcher").mkdir()
+    (root / "launcher" / "launcher-settings.json").write_text(json.dumps({"rawVersion": version}))
+    return root
+
+
+def test_overrides_and_rebuild_on_new_version(tmp_path, mod_dirs, monkeypatch):
+    game = _game(tmp_path)
+    index_path = tmp_path / "cache" / "vanilla_index.sqlite"
+    index = VanillaIndex(index_path)
+    assert game_version(game / "game") == "1.12.5"
+    assert index.ensure(game) == "1.12.5"
+
+    mod = {'mod_id': 'a', 'dirPath': str(mod_dirs['a'])}
+    overrides = index.overrides(mod, "1.12.5")
+    assert [o.path for o in overrides] == ["common/traits/00_traits.txt", "events/a.txt"]
+    assert overrides[0].vanilla_size == len("vanilla traits") and overrides[0].mod_size == 1
+    # events/a.txt is byte-identical to vanilla ("a")
+    assert [o.identical for o in index.overrides(mod, "1.12.5", verify=True)] == [False, True]
+
+    # A fresh index reads the persisted baseline instead of rebuilding
+    builds = []
+    monkeypatch.setattr(VanillaIndex, "build", lambda self, *args: builds.append(args))
+    reopened = VanillaIndex(index_path)
+    assert reopened.ensure(game) == "1.12.5" and builds == []
+    assert len(reopened.files("1.12.5")) == 2
+
+    (game / "launcher" / "launcher-settings.json").write_text(json.dumps({"rawVersion": "1.13.0"}))
+    reopened.ensure(game)
+    assert len(builds) == 1
+
+
+def test_new_version_replaces_old_baseline(tmp_path):
+    game = _game(tmp_path)
+    index = VanillaIndex(tmp_path / "index.sqlite")
+    index.ensure(game)
+    (game / "launcher" / "launcher-settings.json").write_text(json.dumps({"rawVersion": "1.13.0"}))
+    (game / "game" / "events" / "b.txt").write_text("b")
+    index.ensure(game)
+
+    assert VanillaIndex(tmp_path / "index.sqlite").versions() == ["1.13.0"]
+    assert "events/b.txt" in VanillaIndex(tmp_path / "index.sqlite").files("1.13.0")
+
+
+def test_bad_game_path(tmp_path):
+    with pytest.raises(GameNotFoundError):
+        game_version(tmp_path / "not installed")
+    # Reported by the CLI like its other errors, without a traceback
+    for extra in ([], ["--rebuild"]):
+        with pytest.raises(SystemExit) as excinfo:
+            cli.main(["vanilla", "--game", str(tmp_path / "not installed"), *extra])
+        assert "No Crusader Kings III installation found" in str(excinfo.value)
+
+
+def test_version_without_launcher_settings(tmp_path, edit_mod_file):
+    game = _game(tmp_path)
+    (game / "launcher" / "launcher-settings.json").unlink()
+
+    # Without an executable, files added two levels down still change the version
+    version = game_version(game)
+    assert version.startswith("unknown-") and game_version(game) == version
+    edit_mod_file(game / "game", "common/traits/01_more_traits.txt", "new")
+    assert game_version(game) != version
+
+    # The executable's stat results take over where it exists
+    (game / "binaries").mkdir()
+    (game / "binaries" / "ck3").write_bytes(b"build 1")
+    version = game_version(game)
+    edit_mod_file(game / "game", "common/traits/02_more_traits.txt", "new")
+    assert game_version(game) == version
+    edit_mod_file(game, "binaries/ck3", "build 2")
+    assert game_version(game) != version
+
+
+def test_override_counts_use_an_existing_baseline_only(tmp_path, launcher_db_path, monkeypatch):
+    game = _game(tmp_path)
+    index = VanillaIndex(tmp_path / "index.sqlite")
+    db = LauncherDB(launcher_db_path)
+    db.connect()
+    service = ModService(db, vanilla=index, game_path=game)
+    params = {"mod_ids": ["a", "b"], "by_id": True, "with_vanilla": True}
+
+    monkeypatch.setattr(VanillaIndex, "build", lambda self, *args: pytest.fail("built from a scan"))
+    result = service.dispatch("analyze", params)
+    assert result == {"conflicts": {"common/traits/00_traits.txt": ["a", "b"]},
+                      "vanilla": {"version": None, "overrides": {}}}
+    monkeypatch.undo()
+
+    index.ensure(game)
+    # a replaces 00_traits.txt and events/a.txt, b only 00_traits.txt
+    assert service.dispatch("analyze", params)["vanilla"] == {"version": "1.12.5", "overrides": {"a": 2, "b": 1}}
+    mods = db.get_mods_for_playset("main")
+    assert index.override_counts(mods, ModAnalyzer(), game) == ("1.12.5", {"a": 2, "b": 1})
+    db.close()
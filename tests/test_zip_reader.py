@@ -0,0 +1,100 @@
+import zipfile
+
+import pytest
+
+from ck3_mod_manager.utils.zip_reader import read_zip_entries, read_zip_member
+
+
+def _make_zip(path, members, comment=b""):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+        zf.comment = comment
+    return path
+
+
+def _as_zipfile_sees_it(path):
+    with zipfile.ZipFile(path) as zf:
+        return [(i.filename, i.file_size, i.compress_size, i.CRC, i.header_offset)
+                for i in zf.infolist()]
+
+
+def test_matches_zipfile(tmp_path):
+    archive = _make_zip(tmp_path / "mod.zip", {
+        "descriptor.mod": 'name="Test"',
+        "common/traits/00_traits.txt": "trait = {}\n" * 100,
+        "gfx/": "",
+        "localization/english/한국어_l_english.yml": "l_english:\n",
+    }, comment=b"workshop build")
+
+    entries = read_zip_entries(archive)
+
+    assert [(e.name, e.size, e.compressed_size, e.crc, e.header_offset) for e in entries] \
+        == _as_zipfile_sees_it(archive)
+
+
+def test_not_a_zip(tmp_path):
+    bogus = tmp_path / "bogus.zip"
+    bogus.write_bytes(b"definitely not an archive")
+    empty = tmp_path / "empty.zip"
+    empty.write_bytes(b"")
+
+    with pytest.raises(zipfile.BadZipFile):
+        read_zip_entries(bogus)
+    with pytest.raises(zipfile.BadZipFile):
+        read_zip_entries(empty)
+
+
+def test_truncated_archive(tmp_path):
+    archive = _make_zip(tmp_path / "mod.zip", {f"events/{i}.txt": "x" for i in range(20)})
+    data = archive.read_bytes()
+    # Cut the archive in the middle of the central directory, keeping the EOCD
+    eocd = data.rfind(b"PK\x05\x06")
+    archive.write_bytes(data[:eocd - 40] + data[eocd:])
+
+    with pytest.raises(zipfile.BadZipFile):
+        read_zip_entries(archive)
+
+
+def test_prepended_data_falls_back(tmp_path):
+    archive = _make_zip(tmp_path / "mod.zip", {"common/a.txt": "a", "common/b.txt": "b"})
+    shifted = tmp_path / "shifted.zip"
+    shifted.write_bytes(b"\0" * 128 + archive.read_bytes())
+
+    names = [e.name for e in read_zip_entries(shifted)]
+
+    assert names == ["common/a.txt", "common/b.txt"]
+
+
+def test_legacy_encoding_falls_back(tmp_path):
+    archive = tmp_path / "legacy.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("gfx/café.dds", "x")
+    # Clear the utf-8 flag so the name bytes have to be read as cp437
+    data = bytearray(archive.read_bytes())
+    for signature, flags_offset in ((b"PK\x03\x04", 6), (b"PK\x01\x02", 8)):
+        pos = data.find(signature) + flags_offset
+        data[pos + 1] &= ~0x08
+    archive.write_bytes(bytes(data))
+
+    entries = read_zip_entries(archive)
+
+    assert [e.name for e in entries] == [n for n, *_ in _as_zipfile_sees_it(archive)]
+    assert entries[0].name != "gfx/café.dds"
+
+
+def test_read_member(tmp_path):
+    path = _make_zip(tmp_path / "a.zip", {"descriptor.mod": 'name="A"', "common/big.txt": "x" * 5000})
+    with zipfile.ZipFile(path, "a", zipfile.ZIP_STORED) as zf:
+        zf.writestr("stored.txt", "plain")
+    data = {entry.name: read_zip_member(path, entry) for entry in read_zip_entries(path)}
+    assert data == {"descriptor.mod": b'name="A"', "common/big.txt": b"x" * 5000, "stored.txt": b"plain"}
+
+    entry = read_zip_entries(path)[0]
+    with pytest.raises(zipfile.BadZipFile):
+        read_zip_member(path, entry._replace(header_offset=entry.header_offset + 1))
+    # A flipped byte in a stored member keeps every size right: only the CRC catches it
+    path.write_bytes(path.read_bytes().replace(b"plain", b"plaim"))
+    stored = next(e for e in read_zip_entries(path) if e.name == "stored.txt")
+    with pytest.raises(zipfile.BadZipFile):
+        read_zip_member(path, stored)